@@ -1,20 +1,23 @@
-import os
+import sys
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
 from reportlab.lib import colors
 
-def generate_pdf():
-    os.makedirs("reports", exist_ok=True)
-    doc = SimpleDocTemplate("reports/final_report.pdf", pagesize=letter,
-                            leftMargin=50, rightMargin=50, topMargin=40, bottomMargin=40)
-    styles = getSampleStyleSheet()
+from src.pdf_report import stylesheet
+from src.reports import atomic_path
 
-    # Custom styles
-    styles.add(ParagraphStyle(name='Justify', alignment=TA_JUSTIFY, fontSize=10, spaceAfter=6, leading=14))
-    styles.add(ParagraphStyle(name='BulletItem', alignment=TA_LEFT, fontSize=10, spaceAfter=4, leftIndent=20, leading=13))
-    styles.add(ParagraphStyle(name='SmallNote', alignment=TA_LEFT, fontSize=9, spaceAfter=4, textColor='#555555', leading=12))
+DEFAULT_OUTPUT = "reports/final_report.pdf"
+
+def generate_pdf(output_path: str = DEFAULT_OUTPUT):
+    """Our own architecture report (static content). Audit reports: ``python -m src.pdf_report``."""
+    with atomic_path(output_path) as tmp:
+        doc = SimpleDocTemplate(tmp, pagesize=letter,
+                                leftMargin=50, rightMargin=50, topMargin=40, bottomMargin=40)
+        doc.build(_story(stylesheet()))
+    print(f"PDF generated: {output_path}")
+
+def _story(styles):
+    # Justify, BulletItem and SmallNote come with the shared stylesheet
 
     Story = []
 
@@ -393,8 +396,7 @@ def generate_pdf():
     Story.append(Paragraph("<b>Score Impact:</b> Minor improvement (0.5-1 point) to Safe Tool Engineering "
         "by demonstrating centralized, validated configuration management.", styles['BulletItem']))
 
-    doc.build(Story)
-    print("PDF generated: reports/final_report.pdf")
+    return Story
 
 if __name__ == "__main__":
-    generate_pdf()
+    generate_pdf(*sys.argv[1:2])
@@ -0,0 +1,164 @@
+"""Batch audit mode: run a manifest of (repo, pdf) pairs against one compiled graph.
+
+The graph is compiled once and shared by a thread pool. Clone, PDF extraction
+and LLM concurrency are bounded separately through :mod:`src.concurrency`, so
+``--max-audits`` controls how many audits are in flight while the stage limits
+protect the network, the CPU and the LLM rate limit respectively.
+"""
+
+import csv
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from src.concurrency import configure_limits
+
+
+class ManifestEntry(BaseModel):
+    """One submission to audit."""
+
+    repo: str = Field(..., description="Repository URL")
+    pdf: str = Field(..., description="Path to the PDF architecture report")
+    output: Optional[str] = Field(None, description="Report path; derived from the repo when omitted")
+    audit_id: Optional[str] = Field(None, description="Checkpoint key; derived from repo and pdf when omitted")
+
+
+class BatchResult(BaseModel):
+    """Outcome of a single audit within a batch run."""
+
+    repo: str
+    output: str
+    status: Literal["ok", "failed", "error"] = Field(
+        ..., description="ok = judged, failed = error_handler path, error = exception"
+    )
+    overall_score: Optional[float] = None
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+
+def load_manifest(path) -> List[ManifestEntry]:
+    """Load a manifest from JSON (list), JSON lines or CSV (``repo,pdf[,output]`` header).
+
+    Relative PDF and output paths are resolved against the manifest's directory.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".csv":
+        rows = list(csv.DictReader(text.splitlines()))
+    elif path.suffix.lower() == ".json":
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    entries = []
+    for row in rows:
+        entry = ManifestEntry(**{k: v for k, v in row.items() if v not in (None, "")})
+        if not Path(entry.pdf).is_absolute():
+            entry.pdf = str(path.parent / entry.pdf)
+        if entry.output and not Path(entry.output).is_absolute():
+            entry.output = str(path.parent / entry.output)
+        entries.append(entry)
+    return entries
+
+
+def default_output_path(output_dir: str, index: int, repo_url: str) -> str:
+    """``<output_dir>/<index>-<owner>_<repo>.md`` so concurrent audits never share a file."""
+    slug = "_".join(repo_url.rstrip("/").removesuffix(".git").split("/")[-2:])
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", slug).strip("-") or "repo"
+    return str(Path(output_dir) / f"{index:03d}-{slug}.md")
+
+
+def _run_one(graph, entry: ManifestEntry, output: str, resume: bool = False, incremental: bool = False,
+             time_budget: Optional[float] = None) -> BatchResult:
+    from src.graph import initial_state
+    from src.incremental import finalize_record, load_record, previous_audit, record_path
+    from src.results import save_result
+
+    start = time.perf_counter()
+    try:
+        previous_record = load_record(record_path(output)) if incremental else None
+        state = initial_state(entry.repo, entry.pdf, output, previous_audit(previous_record, entry.repo), time_budget)
+        if getattr(graph, "checkpointer", None):
+            from src.checkpoint import default_audit_id, invoke_checkpointed
+
+            audit_id = entry.audit_id or default_audit_id(entry.repo, entry.pdf)
+            final_state = invoke_checkpointed(graph, state, audit_id, resume=resume)
+        else:
+            final_state = graph.invoke(state, {"recursion_limit": 50})
+        finalize_record(final_state, output, previous_record)
+        save_result(final_state, output)
+    except Exception as exc:
+        return result_from_error(entry, output, exc, start)
+    return result_from_state(entry, output, final_state, start)
+
+
+def result_from_state(entry: ManifestEntry, output: str, final_state, start: float) -> BatchResult:
+    report = (final_state or {}).get("final_report")
+    return BatchResult(
+        repo=entry.repo,
+        output=output,
+        status="ok" if report is not None and report.criteria else "failed",
+        overall_score=report.overall_score if report is not None else None,
+        duration_s=time.perf_counter() - start,
+    )
+
+
+def result_from_error(entry: ManifestEntry, output: str, exc: BaseException, start: float) -> BatchResult:
+    return BatchResult(
+        repo=entry.repo, output=output, status="error",
+        duration_s=time.perf_counter() - start, error=str(exc),
+    )
+
+
+def run_manifest(
+    entries: List[ManifestEntry],
+    graph=None,
+    output_dir: str = "audit/batch",
+    max_audits: int = 4,
+    clone_concurrency: Optional[int] = 4,
+    extract_concurrency: Optional[int] = 2,
+    judge_concurrency: Optional[int] = 3,
+    checkpointer=None,
+    resume: bool = False,
+    incremental: bool = False,
+    time_budget: Optional[float] = None,
+) -> List[BatchResult]:
+    """Audit every manifest entry and return results in manifest order.
+
+    With a ``checkpointer`` every audit is checkpointed under its audit id and
+    ``resume=True`` finishes a previously interrupted cohort run, skipping
+    audits that already completed. ``incremental=True`` re-judges only the
+    dimensions whose evidence changed since each entry's previous record.
+    ``time_budget`` gives every audit its own deadline from when it starts.
+    """
+    if graph is None:
+        from src.graph import build_auditor_graph
+
+        graph = build_auditor_graph().compile(checkpointer=checkpointer)
+
+    configure_limits(clone=clone_concurrency, extract=extract_concurrency, judge=judge_concurrency)
+    outputs = [e.output or default_output_path(output_dir, i + 1, e.repo) for i, e in enumerate(entries)]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_audits), thread_name_prefix="audit") as pool:
+        futures = [pool.submit(_run_one, graph, e, out, resume, incremental, time_budget) for e, out in zip(entries, outputs)]
+        return [f.result() for f in futures]
+
+
+def format_summary(results: List[BatchResult]) -> str:
+    """Render batch results as a Markdown table followed by a success count."""
+    lines = [
+        "| # | Repository | Status | Score | Time (s) | Report |",
+        "|---|------------|--------|-------|----------|--------|",
+    ]
+    for i, r in enumerate(results, 1):
+        score = f"{r.overall_score:.2f}" if r.overall_score is not None else "-"
+        status = r.status if not r.error else f"{r.status}: {r.error[:60]}"
+        lines.append(f"| {i} | {r.repo} | {status} | {score} | {r.duration_s:.1f} | {r.output} |")
+    ok = sum(1 for r in results if r.status == "ok")
+    lines.append(f"\n{ok}/{len(results)} audits judged successfully.")
+    return "\n".join(lines)
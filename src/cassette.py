@@ -0,0 +1,272 @@
+"""Record/replay cassettes for everything an audit asks the outside world.
+
+A cassette is one file holding, per call, a request key and the response (or
+the error message) of:
+
+- every LLM call of the judges and VisionInspector (kind ``llm``);
+- every checkout, i.e. a clone or an opened local source (kind ``checkout``).
+  Only the files the detectors read (``src/**/*.py``) are kept;
+- every ``git log`` (kind ``git.log``), keyed by the URL or source the
+  checkout came from;
+- every PDF extraction (kind ``pdf``), keyed by the PDF's content hash and
+  including the extracted images.
+
+In ``record`` mode the calls run live and are appended to the cassette. In
+``replay`` mode they are served from it, with no network, no git and no PDF
+parsing. Audits then replay in milliseconds and deterministically, whatever
+the LLM's temperature. A request that is not on the cassette raises
+:class:`CassetteMiss` instead of going live. Requests are keyed by a hash of
+their JSON with temporary directories masked, so a fresh clone directory does
+not change the key. Identical requests are served in recorded order, the last
+response repeating once they run out.
+
+The file is a sequence of gzip members, one JSON line each. A record is a
+single ``O_APPEND`` write, so threads and worker processes can record into
+the same cassette, and a run that dies keeps everything recorded before.
+
+Cassettes are opt-in: pass ``--record``/``--replay`` to ``src/graph.py`` or
+set ``CASSETTE`` (and ``CASSETTE_MODE=record``, default ``replay``).
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+MODES = ("record", "replay")
+
+T = TypeVar("T")
+
+# temp clone/extraction directories, also inside JSON-escaped strings
+_TEMP_PATH_RE = re.compile(re.escape(tempfile.gettempdir()) + r"/[^/\s\"\\]+")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request the cassette has no recording of."""
+
+
+class ReplayedError(RuntimeError):
+    """A recorded call's failure, raised again on replay with the original message."""
+
+
+def request_key(kind: str, request: Any) -> str:
+    text = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(f"{kind}\0{_TEMP_PATH_RE.sub('<tmp>', text)}".encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """One cassette file, opened for recording or replay."""
+
+    def __init__(self, path: str, mode: str = "replay") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], List[Dict]] = {}
+        self._served: Dict[Tuple[str, str], int] = {}
+        self._origins: Dict[str, str] = {}
+        if mode == "replay":
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No cassette at {self.path}; record one with --record")
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    entry = json.loads(line)
+                    self._entries.setdefault((entry["kind"], entry["key"]), []).append(entry)
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            pass  # the recording run died mid-write: keep what came before
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def take(self, kind: str, request: Any) -> Any:
+        """The recorded response to ``request``; raises the recorded error, or :class:`CassetteMiss`."""
+        key = (kind, request_key(kind, request))
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"{self.path} has no recorded {kind} call for this request")
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        entry = entries[min(served, len(entries) - 1)]
+        if "error" in entry:
+            raise ReplayedError(entry["error"])
+        return entry["response"]
+
+    def put(self, kind: str, request: Any, response: Any = None, error: Optional[str] = None) -> None:
+        entry = {"kind": kind, "key": request_key(kind, request)}
+        if error is not None:
+            entry["error"] = error
+        else:
+            entry["response"] = response
+        data = gzip.compress((json.dumps(entry) + "\n").encode("utf-8"))
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+    def origin(self, path: Path) -> str:
+        """The URL or source a checkout at ``path`` was made from (``path`` itself if unknown)."""
+        return self._origins.get(str(path), str(path))
+
+    def checkout(self, source: str, make: Callable[[], T], root: Callable[[T], Path],
+                 replayed: Callable[[Path], T]) -> T:
+        """Check ``source`` out with ``make()``, or restore the recorded snapshot.
+
+        ``root`` picks the checkout directory out of ``make()``'s result, and
+        ``replayed`` builds that result around a restored snapshot.
+        """
+        request = {"source": source}
+        if self.replaying:
+            result = replayed(restore_tree(self.take("checkout", request)))
+        else:
+            try:
+                result = make()
+            except Exception as exc:
+                self.put("checkout", request, error=str(exc))
+                raise
+            self.put("checkout", request, snapshot_tree(root(result)))
+        with self._lock:
+            self._origins[str(root(result))] = source
+        return result
+
+
+def snapshot_tree(root: Path) -> Dict[str, str]:
+    """``{relative path: text}`` of the files the detectors read under ``root``."""
+    from src.fingerprint import RELEVANT_PATTERNS
+
+    files = sorted({p for pattern in RELEVANT_PATTERNS for p in root.glob(pattern)
+                    if p.is_file() and ".git" not in p.parts})
+    # surrogateescape: undecodable bytes survive the round trip unchanged
+    return {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8", errors="surrogateescape") for p in files}
+
+
+def restore_tree(files: Dict[str, str]) -> Path:
+    """Write a :func:`snapshot_tree` into a new temporary directory; the caller removes it."""
+    root = Path(tempfile.mkdtemp(prefix="audit-replay-"))
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8", errors="surrogateescape")
+    return root
+
+
+def encode_bytes(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def decode_bytes(text: str) -> bytes:
+    return base64.b64decode(text)
+
+
+def _dump(value: Any) -> Any:
+    return value.model_dump(mode="json") if hasattr(value, "model_dump") else value
+
+
+def through(kind: str, request: Any, call: Callable[[], T], encode: Callable[[T], Any] = _dump,
+            decode: Optional[Callable[[Any], T]] = None) -> T:
+    """``call()``, recorded to or replayed from the active cassette (just called when there is none).
+
+    Failures are recorded too and raised again on replay as :class:`ReplayedError`.
+    """
+    cassette = active_cassette()
+    if cassette is None:
+        return call()
+    if cassette.replaying:
+        value = cassette.take(kind, request)
+        return decode(value) if decode is not None else value
+    try:
+        result = call()
+    except Exception as exc:
+        cassette.put(kind, request, error=str(exc))
+        raise
+    cassette.put(kind, request, encode(result))
+    return result
+
+
+def origin(path: Path) -> str:
+    """See :meth:`Cassette.origin`; ``path`` itself when no cassette is active."""
+    cassette = active_cassette()
+    return cassette.origin(path) if cassette is not None else str(path)
+
+
+class RecordedLLM:
+    """Stand-in for a chat model whose ``invoke`` goes through the active cassette.
+
+    The real model is built by ``factory`` on the first live call, so a replay
+    needs neither API keys nor the provider package.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], decode: Callable[[Any], Any]) -> None:
+        self.name = name
+        self._factory = factory
+        self._decode = decode
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _live(self):
+        with self._lock:
+            if self._model is None:
+                self._model = self._factory()
+            return self._model
+
+    def invoke(self, messages: List[Any], config: Optional[Dict] = None) -> Any:
+        request = {"model": self.name,
+                   "messages": [{"role": getattr(m, "type", ""), "content": getattr(m, "content", m)}
+                                for m in messages]}
+        return through("llm", request, lambda: self._live().invoke(messages, config=config), decode=self._decode)
+
+
+_configured: Optional[Cassette] = None
+_cassettes: Dict[Tuple[str, str], Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def configure(path: Optional[str], mode: str = "replay", append: bool = False) -> Optional[Cassette]:
+    """Record to or replay from ``path`` in this process (``None`` falls back to ``CASSETTE``).
+
+    Recording starts a new cassette: an existing file at ``path`` is replaced,
+    unless ``append`` (a worker process joining its parent's recording).
+    """
+    global _configured
+    if path is None:
+        _configured = None
+        return None
+    if mode == "record" and not append and os.path.exists(path):
+        os.remove(path)
+    _configured = Cassette(path, mode)
+    return _configured
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The configured cassette, or ``None`` when calls go live unrecorded.
+
+    Without :func:`configure`, ``CASSETTE``/``CASSETTE_MODE`` are used; a
+    process (a pool worker) opening a cassette this way appends to it.
+    """
+    if _configured is not None:
+        return _configured
+    path = os.getenv("CASSETTE")
+    if not path:
+        return None
+    mode = os.getenv("CASSETTE_MODE", "replay").strip().lower()
+    with _cassettes_lock:
+        if (path, mode) not in _cassettes:
+            _cassettes[(path, mode)] = Cassette(path, mode)
+        return _cassettes[(path, mode)]
@@ -0,0 +1,119 @@
+"""SQLite-backed checkpointing so interrupted audits can be resumed.
+
+Each audit is a LangGraph thread keyed by its audit id. After every super-step
+the state is persisted, and writes of nodes that finished inside a failed
+super-step (e.g. two judges done, one rate-limited to death) are kept as
+pending writes, so ``--resume`` re-runs only what did not complete.
+"""
+
+import hashlib
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.deadline import restarted
+
+DEFAULT_CHECKPOINT_DB = ".cache/checkpoints.sqlite"
+
+# Payloads below this size are stored as-is; compressing them is not worth it.
+COMPRESS_THRESHOLD = 512
+
+# State types the deserializer may rebuild from msgpack.
+STATE_TYPES = [
+    ("src.state", "Evidence"),
+    ("src.state", "JudicialOpinion"),
+    ("src.state", "CriterionResult"),
+    ("src.state", "AuditReport"),
+    ("src.rubric", "Rubric"),
+    ("src.rubric", "Dimension"),
+    ("src.rubric", "SynthesisParameters"),
+]
+
+
+class CompactSerializer(SerializerProtocol):
+    """msgpack serialization (``JsonPlusSerializer``) plus zlib for large blobs.
+
+    Evidence and opinion lists are mostly repetitive English text, which
+    compresses several-fold; compressed payloads are tagged ``z:<type>``.
+    """
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+        self._inner = JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self._inner.dumps_typed(obj)
+        if len(data) >= COMPRESS_THRESHOLD:
+            return f"z:{type_}", zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith("z:"):
+            return self._inner.loads_typed((type_[2:], zlib.decompress(payload)))
+        return self._inner.loads_typed(data)
+
+
+def open_checkpointer(db_path: str = DEFAULT_CHECKPOINT_DB) -> SqliteSaver:
+    """Open (creating if needed) a thread-safe SQLite checkpointer."""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    saver = SqliteSaver(conn, serde=CompactSerializer())
+    saver.setup()
+    return saver
+
+
+def default_audit_id(repo_url: str, pdf_path: str) -> str:
+    """Stable id so re-running the same (repo, pdf) pair finds its checkpoint."""
+    digest = hashlib.sha256(f"{repo_url}\0{Path(pdf_path).resolve()}".encode()).hexdigest()
+    return f"audit-{digest[:16]}"
+
+
+def invoke_checkpointed(
+    graph,
+    state: Dict,
+    audit_id: str,
+    resume: bool = False,
+    recursion_limit: int = 50,
+) -> Optional[Dict]:
+    """Run ``graph`` (compiled with a checkpointer) as thread ``audit_id``.
+
+    With ``resume=True`` an unfinished checkpoint is continued from the last
+    completed node and a finished one is returned as-is; without a checkpoint
+    the audit simply starts. With ``resume=False`` any previous checkpoint for
+    the id is discarded first.
+
+    A resumed audit gets the budget of ``state["deadline"]`` (computed now),
+    not the deadline stored when it first started.
+    """
+    config = {"configurable": {"thread_id": audit_id}, "recursion_limit": recursion_limit}
+    snapshot = graph.get_state(config)
+    has_checkpoint = bool(snapshot.values) or bool(snapshot.next)
+
+    if resume and has_checkpoint:
+        if not snapshot.next:
+            return snapshot.values
+        with restarted(state.get("deadline")):
+            return graph.invoke(None, config)
+
+    if has_checkpoint:
+        graph.checkpointer.delete_thread(audit_id)
+    return graph.invoke(state, config)
+
+
+def resume_status(graph, audit_id: str) -> Dict[str, Any]:
+    """Summarize a stored checkpoint: pending nodes and opinions collected so far."""
+    snapshot = graph.get_state({"configurable": {"thread_id": audit_id}})
+    values = snapshot.values or {}
+    return {
+        "exists": bool(values),
+        "next": list(snapshot.next),
+        "opinions": len(values.get("opinions", [])),
+        "evidence_keys": sorted(values.get("evidences", {})),
+        "complete": bool(values) and not snapshot.next,
+    }
@@ -0,0 +1,80 @@
+"""Process-wide concurrency limits for the expensive audit stages.
+
+Nodes wrap their clone, PDF extraction and LLM calls in :func:`stage_slot`.
+Calls that may be abandoned on a timeout take their slot with
+:func:`acquire_slot` instead (see :func:`src.deadline.call_with_timeout`),
+so the slot is only freed when the call has really ended.
+Limits are unbounded until :func:`configure_limits` is called (e.g. by the
+batch runner), so a single audit behaves exactly as before.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# "judge" covers every LLM call, including the VisionInspector request.
+STAGES = ("clone", "extract", "judge")
+
+_lock = threading.Lock()
+_semaphores: Dict[str, Optional[threading.BoundedSemaphore]] = {s: None for s in STAGES}
+_limits: Dict[str, Optional[int]] = {s: None for s in STAGES}
+_active: Dict[str, int] = {s: 0 for s in STAGES}
+_waiting: Dict[str, int] = {s: 0 for s in STAGES}
+
+
+def configure_limits(**limits: Optional[int]) -> None:
+    """Set the maximum number of concurrent calls per stage (``None`` = unbounded)."""
+    with _lock:
+        for stage, limit in limits.items():
+            if stage not in STAGES:
+                raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGES}")
+            if limit is not None and limit < 1:
+                raise ValueError(f"Concurrency limit for {stage!r} must be >= 1")
+            _limits[stage] = limit
+            _semaphores[stage] = threading.BoundedSemaphore(limit) if limit else None
+
+
+def acquire_slot(stage: str) -> Callable[[], None]:
+    """Take one slot of ``stage``; returns the function that gives it back (once)."""
+    sem = _semaphores[stage]
+    with _lock:
+        _waiting[stage] += 1
+    try:
+        if sem is not None:
+            sem.acquire()
+    finally:
+        with _lock:
+            _waiting[stage] -= 1
+    with _lock:
+        _active[stage] += 1
+    released = threading.Event()
+
+    def release() -> None:
+        with _lock:
+            if released.is_set():
+                return
+            released.set()
+            _active[stage] -= 1
+        if sem is not None:
+            sem.release()
+
+    return release
+
+
+@contextmanager
+def stage_slot(stage: str) -> Iterator[None]:
+    """Hold one slot of ``stage`` for the duration of the block."""
+    release = acquire_slot(stage)
+    try:
+        yield
+    finally:
+        release()
+
+
+def stage_stats() -> Dict[str, Dict[str, Optional[int]]]:
+    """Snapshot of ``limit``/``active``/``waiting`` counts for every stage."""
+    with _lock:
+        return {
+            s: {"limit": _limits[s], "active": _active[s], "waiting": _waiting[s]}
+            for s in STAGES
+        }
@@ -0,0 +1,79 @@
+"""Environment loading and validation.
+
+Nothing here runs at import time: entry points call :func:`load_environment`
+once at startup, so ``--help``, unit tests and short-lived workers neither read
+``.env`` nor print key warnings.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+class ConfigError(ValueError):
+    """Raised when an environment variable has an unusable value."""
+
+
+# name -> minimum value
+INT_VARS: Dict[str, int] = {
+    "GIT_CLONE_TIMEOUT": 1,
+    "GIT_MAX_CLONES": 1,
+    "ARCHIVE_MAX_BYTES": 1,
+    "LLM_TIMEOUT": 1,
+    "AUDIT_TIME_BUDGET": 1,
+    "BUDGET_VISION_MIN_S": 0,
+    "BUDGET_JUDGE_BATCH_S": 0,
+    "BUDGET_JUDGE_MIN_S": 0,
+    "VISION_MAX_IMAGES": 1,
+    "VISION_MAX_SIDE": 16,
+    "VISION_CACHE_MAX_DISTANCE": 0,
+}
+
+CHOICE_VARS: Dict[str, Tuple[str, ...]] = {
+    "VISION_MODE": ("single", "batch"),
+    "VISION_CACHE_HASH": ("dhash", "phash"),
+    "CASSETTE_MODE": ("record", "replay"),
+}
+
+
+def validate_environment(env: Optional[Dict[str, str]] = None) -> List[str]:
+    """Check ``env`` (default ``os.environ``) and return warnings.
+
+    Missing API keys only produce warnings, since the affected nodes degrade on
+    their own; malformed settings raise :class:`ConfigError` listing all of them.
+    """
+    env = os.environ if env is None else env
+    problems = []
+    for name, minimum in INT_VARS.items():
+        value = env.get(name)
+        if value is None or value == "":
+            continue
+        try:
+            ok = int(value) >= minimum
+        except ValueError:
+            ok = False
+        if not ok:
+            problems.append(f"{name}={value!r} must be an integer >= {minimum}")
+    for name, choices in CHOICE_VARS.items():
+        value = env.get(name)
+        if value and value.strip().lower() not in choices:
+            problems.append(f"{name}={value!r} must be one of {', '.join(choices)}")
+    if problems:
+        raise ConfigError("Invalid configuration: " + "; ".join(problems))
+
+    warnings = []
+    if not env.get("GROQ_API_KEY"):
+        warnings.append("Missing GROQ_API_KEY in .env → judges cannot call the LLM")
+    if not env.get("OPENAI_API_KEY"):
+        warnings.append("Missing OPENAI_API_KEY in .env → VisionInspector cannot classify diagrams")
+    if not env.get("LANGCHAIN_API_KEY") and env.get("LANGCHAIN_TRACING_V2") == "true":
+        warnings.append("LANGCHAIN_API_KEY missing → tracing disabled")
+    return warnings
+
+
+def load_environment(dotenv: bool = True) -> List[str]:
+    """Startup step for CLI entry points: load ``.env`` and validate it."""
+    if dotenv:
+        from dotenv import load_dotenv
+
+        load_dotenv()  # loads .env automatically
+    return validate_environment()
@@ -0,0 +1,196 @@
+"""Per-audit time budget and graceful degradation.
+
+An audit started with a time budget (``--time-budget`` or ``AUDIT_TIME_BUDGET``)
+carries an absolute ``deadline`` (epoch seconds, so it survives checkpointing
+and resuming) in its state, and every node derives its timeouts from what is
+left instead of running open-ended:
+
+- ``git clone`` / ``git log`` time out after ``GIT_CLONE_TIMEOUT`` seconds or
+  the remaining budget, whichever is shorter;
+- LLM calls are abandoned when the budget runs out (clients also get an
+  ``LLM_TIMEOUT`` request timeout), and rate-limit back-off never sleeps past
+  the deadline.
+
+As the budget shrinks the audit degrades in steps rather than failing:
+
+===========================  ==============================================
+remaining budget below       degradation
+===========================  ==============================================
+``BUDGET_VISION_MIN_S``      VisionInspector is skipped
+``BUDGET_JUDGE_BATCH_S``     each judge scores every dimension in one call
+``BUDGET_JUDGE_MIN_S``       judges score deterministically from evidence
+===========================  ==============================================
+
+Each degradation is appended to ``state["degradations"]`` and listed in the
+final report. Without a deadline none of this applies.
+
+A checkpointed audit that is resumed gets a fresh budget: the resumed run
+executes inside :func:`restarted`, which replaces the stored deadline, also
+the copies already handed to pending judge tasks.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, Mapping, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+# seconds; every entry can be overridden by the environment variable of the same name
+DEFAULTS: Dict[str, int] = {
+    "GIT_CLONE_TIMEOUT": 300,
+    "LLM_TIMEOUT": 60,
+    "BUDGET_VISION_MIN_S": 180,
+    "BUDGET_JUDGE_BATCH_S": 120,
+    "BUDGET_JUDGE_MIN_S": 20,
+}
+
+
+# seconds, or a function returning them once the call may start (see call_with_timeout)
+Timeout = Union[Optional[float], Callable[[], Optional[float]]]
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an audit's deadline has passed or a bounded call ran out of time."""
+
+
+def setting(name: str) -> int:
+    """Value of a :data:`DEFAULTS` entry, honouring its environment variable."""
+    value = os.getenv(name)
+    return int(value) if value else DEFAULTS[name]
+
+
+def deadline_after(budget_s: Optional[float]) -> Optional[float]:
+    """Absolute deadline for a budget of ``budget_s`` seconds from now.
+
+    ``None`` falls back to ``AUDIT_TIME_BUDGET``; no budget at all means no deadline.
+    """
+    if budget_s is None:
+        budget_s = float(os.getenv("AUDIT_TIME_BUDGET") or 0) or None
+    return None if budget_s is None else time.time() + budget_s
+
+
+_UNSET = object()
+_restarted: contextvars.ContextVar = contextvars.ContextVar("restarted_deadline", default=_UNSET)
+
+
+@contextmanager
+def restarted(deadline: Optional[float]) -> Iterator[None]:
+    """Within the block, ``deadline`` replaces every state's stored deadline (a resumed audit)."""
+    token = _restarted.set(deadline)
+    try:
+        yield
+    finally:
+        _restarted.reset(token)
+
+
+def remaining(state: Mapping) -> Optional[float]:
+    """Seconds left until the state's deadline (negative once passed), or ``None``."""
+    deadline = _restarted.get()
+    if deadline is _UNSET:
+        deadline = state.get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+
+def expired(state: Mapping) -> bool:
+    left = remaining(state)
+    return left is not None and left <= 0
+
+
+def below(state: Mapping, name: str) -> bool:
+    """True when a deadline is set and less than ``setting(name)`` seconds remain."""
+    left = remaining(state)
+    return left is not None and left < setting(name)
+
+
+def timeout_for(state: Mapping, name: Optional[str] = None) -> Optional[float]:
+    """Timeout for one blocking call: ``setting(name)`` capped by the remaining budget.
+
+    ``None`` means unbounded (no deadline and no ``name``). Raises
+    :class:`DeadlineExceeded` if the deadline has already passed.
+    """
+    cap = float(setting(name)) if name else None
+    left = remaining(state)
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded("audit deadline passed")
+    return left if cap is None else min(cap, left)
+
+
+def judge_mode(state: Mapping) -> str:
+    """``"full"``, ``"batched"`` or ``"deterministic"`` for the budget left."""
+    if below(state, "BUDGET_JUDGE_MIN_S"):
+        return "deterministic"
+    if below(state, "BUDGET_JUDGE_BATCH_S"):
+        return "batched"
+    return "full"
+
+
+def sleep_within(state: Mapping, seconds: float) -> bool:
+    """Sleep ``seconds`` unless that would overrun the deadline; returns whether it slept."""
+    left = remaining(state)
+    if left is not None and left < seconds:
+        return False
+    time.sleep(seconds)
+    return True
+
+
+def note(state: Mapping, what: str) -> str:
+    """Degradation entry for the report: ``what`` plus the budget left."""
+    left = remaining(state)
+    return what if left is None else f"{what} ({max(left, 0):.0f}s of budget left)"
+
+
+def call_with_timeout(fn: Callable[[], T], timeout: Timeout, stage: Optional[str] = None) -> T:
+    """Run ``fn()`` and give up after ``timeout`` seconds (``None``: call inline).
+
+    The call runs on its own thread with the caller's context variables, so
+    tracing callbacks still attach to the right audit. A call that times out is
+    abandoned, not interrupted; the client's own request timeout ends it.
+
+    With ``stage``, the call holds a :mod:`src.concurrency` slot of that stage
+    until it actually ends, abandoned or not, so abandoned calls cannot push
+    the stage past its limit. ``timeout`` may then be a function evaluated
+    once the slot is held, so that queueing counts against the budget.
+    """
+    from src.concurrency import acquire_slot
+
+    release = acquire_slot(stage) if stage is not None else None
+    started = False
+    try:
+        if callable(timeout):
+            timeout = timeout()
+        if timeout is None:
+            return fn()
+        future: Future = Future()
+        threading.Thread(target=_run_into, args=(future, contextvars.copy_context(), fn, release),
+                         name="bounded-call", daemon=True).start()
+        started = True
+    finally:
+        # once started, the call's own thread gives the slot back when it ends
+        if release is not None and not started:
+            release()
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise DeadlineExceeded(f"call did not finish within {timeout:.0f}s") from None
+
+
+def _run_into(future: Future, context: contextvars.Context, fn: Callable[[], T],
+              release: Optional[Callable[[], None]]) -> None:
+    result, error = None, None
+    try:
+        result = context.run(fn)
+    except BaseException as exc:
+        error = exc
+    if release is not None:
+        release()  # before the caller can see the outcome and take the slot again
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
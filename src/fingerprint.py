@@ -0,0 +1,203 @@
+"""Content fingerprints that let duplicate submissions reuse earlier audits.
+
+Students submit the same commit under several URLs, or unchanged forks. After
+the clone, :func:`tree_hash` computes a Merkle hash over the files the
+detectors read (``RELEVANT_PATTERNS``) and the commit ids of the cloned
+history. The PDF gets a plain content digest, salted with the rubric
+dimensions that target it. Both are kept in ``state["fingerprints"]``.
+
+With dedupe enabled (``--dedupe`` or ``AUDIT_DEDUPE=true``), a
+:class:`DedupeStore` keeps, under ``AUDIT_DEDUPE_PATH`` (default
+``.cache/dedupe``):
+
+- ``repo/<tree hash>.json``: RepoInvestigator's evidence;
+- ``pdf/<digest>.json`` and ``vision/<digest>.json``: DocAnalyst's and
+  VisionInspector's evidence;
+- ``audit/<key>.json``: an :class:`src.incremental.AuditRecord` for the whole
+  audit, keyed by repo hash + PDF digest + rubric.
+
+On a hit the detectors return the stored evidence and the judges reuse the
+stored opinions through the ``previous_audit`` mechanism of incremental
+re-audits. A duplicate submission then costs one clone. The report is still
+issued for the new URL and names the audit it duplicates. Audits that ran
+degraded are not remembered.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from src.state import Evidence
+
+# bump when a detector changes what it reports, so stale evidence is not reused
+DETECTOR_VERSION = "1"
+RELEVANT_PATTERNS = ("src/**/*.py",)
+DEFAULT_DEDUPE_PATH = ".cache/dedupe"
+
+
+class StoredEvidence(BaseModel):
+    """A detector's cached output for one fingerprint."""
+
+    repo_url: str = ""
+    evidences: Dict[str, List[Evidence]] = Field(default_factory=dict)
+    commit: Optional[str] = None
+
+
+def _blob(content: bytes) -> str:
+    return hashlib.sha256(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _node(entries: Iterable[tuple]) -> str:
+    h = hashlib.sha256(b"tree\0")
+    for name, kind, digest in sorted(entries):
+        h.update(f"{kind} {digest} {name}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def tree_hashes(root: Path, patterns: Sequence[str] = RELEVANT_PATTERNS) -> Dict[str, str]:
+    """Merkle hash of every directory holding a relevant file (``""`` is the root)."""
+    root = Path(root)
+    files = sorted({p for pattern in patterns for p in root.glob(pattern) if p.is_file() and ".git" not in p.parts})
+    children: Dict[str, Dict[str, tuple]] = {"": {}}
+    for path in files:
+        parts = path.relative_to(root).parts
+        for depth in range(1, len(parts)):
+            children.setdefault("/".join(parts[:depth]), {})
+        children["/".join(parts[:-1])][parts[-1]] = (parts[-1], "blob", _blob(path.read_bytes()))
+    hashes: Dict[str, str] = {}
+    # deepest directories first, so every child hash exists before its parent's
+    for directory in sorted(children, key=lambda d: d.count("/") + bool(d), reverse=True):
+        hashes[directory] = _node(children[directory].values())
+        if directory:
+            parent, _, name = directory.rpartition("/")
+            children[parent][name] = (name, "tree", hashes[directory])
+    return hashes
+
+
+def tree_hash(root: Path, commits: Sequence[str] = (), patterns: Sequence[str] = RELEVANT_PATTERNS) -> str:
+    """Fingerprint of a clone: relevant files plus the commit ids the detectors saw."""
+    history = hashlib.sha256("\n".join(commits).encode("utf-8")).hexdigest()
+    return _node([("", "tree", tree_hashes(root, patterns)[""]), ("history", "log", history),
+                  ("detectors", "version", DETECTOR_VERSION)])
+
+
+def file_digest(path: Path, salt: str = "") -> str:
+    h = hashlib.sha256(f"{DETECTOR_VERSION}\0{salt}\0".encode("utf-8"))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dimensions_digest(dimensions: Sequence[Mapping]) -> str:
+    return hashlib.sha256(json.dumps(list(dimensions), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def audit_key(state: Mapping) -> Optional[str]:
+    """Key of the whole audit: repo hash + PDF digest + judged rubric; ``None`` if either is unknown."""
+    from src.rubric import state_dimensions
+
+    prints = state.get("fingerprints") or {}
+    if not prints.get("repo") or not prints.get("pdf"):
+        return None
+    payload = f"{prints['repo']}\0{prints['pdf']}\0{dimensions_digest(state_dimensions(state))}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DedupeStore:
+    """Directory of JSON documents keyed by (kind, fingerprint); writes are atomic."""
+
+    def __init__(self, path: str = DEFAULT_DEDUPE_PATH) -> None:
+        self.path = Path(path)
+
+    def _file(self, kind: str, key: str) -> Path:
+        return self.path / kind / f"{key}.json"
+
+    def get(self, kind: str, key: Optional[str], model=StoredEvidence):
+        if not key:
+            return None
+        path = self._file(kind, key)
+        try:
+            return model.model_validate_json(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            return None  # corrupt or from an older schema: treat as a miss
+
+    def has(self, kind: str, key: Optional[str]) -> bool:
+        return bool(key) and self._file(kind, key).is_file()
+
+    def put(self, kind: str, key: Optional[str], value: BaseModel) -> None:
+        if not key:
+            return
+        from src.reports import atomic_write
+
+        atomic_write(str(self._file(kind, key)), [value.model_dump_json()])
+
+
+_configured: Optional[bool] = None
+_stores: Dict[str, DedupeStore] = {}
+_stores_lock = threading.Lock()
+
+
+def configure(enabled: Optional[bool]) -> None:
+    """Turn dedupe on or off for this process (``None`` falls back to ``AUDIT_DEDUPE``)."""
+    global _configured
+    _configured = enabled
+
+
+def active_store() -> Optional[DedupeStore]:
+    """The configured store, or ``None`` when dedupe is off."""
+    enabled = _configured
+    if enabled is None:
+        enabled = os.getenv("AUDIT_DEDUPE", "false").strip().lower() in ("1", "true", "yes")
+    if not enabled:
+        return None
+    path = os.getenv("AUDIT_DEDUPE_PATH", DEFAULT_DEDUPE_PATH)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = DedupeStore(path)
+        return _stores[path]
+
+
+def previous_for(state: Mapping) -> Optional[Dict]:
+    """``previous_audit`` value from a stored identical audit, if any."""
+    from src.incremental import AuditRecord, previous_audit
+
+    store = active_store()
+    if store is None:
+        return None
+    record = store.get("audit", audit_key(state), AuditRecord)
+    return previous_audit(record, record.repo_url) if record is not None else None
+
+
+def duplicate_of(state: Mapping) -> Optional[str]:
+    """URL of the stored audit this one duplicates (possibly the same URL), if any."""
+    from src.incremental import AuditRecord
+
+    store = active_store()
+    record = store.get("audit", audit_key(state), AuditRecord) if store is not None else None
+    return record.repo_url if record is not None else None
+
+
+def remember_audit(state: Mapping, report) -> None:
+    """Store a finished audit under its key, unless one is stored already.
+
+    Audits that ran degraded or fell back to neutral opinions after LLM errors
+    are not stored, so a duplicate gets a proper audit instead.
+    """
+    from src.incremental import build_record
+    from src.nodes.judges import is_fallback
+
+    store = active_store()
+    key = audit_key(state) if store is not None else None
+    if key is None or state.get("degradations") or store.has("audit", key):
+        return
+    record = build_record(dict(state, final_report=report))
+    if record is not None and not any(is_fallback(op) for op in record.opinions):
+        store.put("audit", key, record)
@@ -1,20 +1,14 @@
 import os
 import argparse
-from dotenv import load_dotenv
-
-load_dotenv()  # loads .env automatically
-
-if not os.getenv("OPENAI_API_KEY"):
-    print("Warning: Missing OPENAI_API_KEY in .env")
-if not os.getenv("LANGCHAIN_API_KEY") and os.getenv("LANGCHAIN_TRACING_V2") == "true":
-    print("Warning: LANGCHAIN_API_KEY missing → tracing disabled")
-
-from langgraph.graph import StateGraph, START, END
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+from src.instrumentation import instrument_node
+from src.profiling import profile_node
 from src.state import AgentState, AuditReport
-from src.nodes.detectives import RepoInvestigator, DocAnalyst, VisionInspector
-from src.nodes.judges import Prosecutor, Defense, TechLead
-from src.nodes.justice import ChiefJusticeNode
+from src.nodes.justice import DEFAULT_REPORT_PATH
+
+if TYPE_CHECKING:  # langgraph and the node modules are imported by build_auditor_graph()
+    from langgraph.graph import StateGraph
 
 def _cleanup_node(state: AgentState):
     """Cleanup temporary PDF directory if it exists."""
@@ -26,11 +20,15 @@ def _cleanup_node(state: AgentState):
             cleanup_pdf_temp_dir(temp_dir)
         except ImportError:
             pass
-    return state
+    return {}
 
 def EvidenceAggregator(state: AgentState):
-    """Synchronization node (fan-in) before judges."""
-    return state
+    """Synchronization node (fan-in) before judges.
+
+    Returns an empty update: echoing the state back would re-run the
+    ``evidences``/``opinions`` reducers over everything already merged.
+    """
+    return {}
 
 def error_handler(state: AgentState):
     """Output a basic failed report."""
@@ -41,11 +39,10 @@ def error_handler(state: AgentState):
         criteria=[],
         remediation_plan="Ensure the repository is accessible and the PDF is successfully parsed."
     )
-    # Output file
-    import os
-    os.makedirs("audit", exist_ok=True)
-    with open("audit/report.md", "w") as f:
-        f.write("# Failed Audit\n\n" + rep.executive_summary)
+    # Output file (rendered as a failed audit: the report has no criteria)
+    from src.reports import write_report
+
+    write_report(rep, state.get("output_path") or DEFAULT_REPORT_PATH, state.get("report_formats"))
     return {"final_report": rep}
 
 def check_missing_evidence(state: AgentState):
@@ -56,47 +53,64 @@ def check_missing_evidence(state: AgentState):
     return "judges"
 
 def JudgesBranchNode(state: AgentState):
-    """Pass-through node to fan-out to Judges."""
-    return state
+    """Pass-through node to fan-out to Judges (empty update, see EvidenceAggregator)."""
+    return {}
+
+def _node(name: str, fn):
+    """Node wrapped for instrumentation and profiling (both no-ops unless enabled)."""
+    return profile_node(name, instrument_node(name, fn))
+
+def build_auditor_graph(include_detectives: bool = True) -> "StateGraph":
+    """Create the full StateGraph with parallel detective and judge nodes.
+
+    With ``include_detectives=False`` the graph starts at ``EvidenceAggregator``
+    and expects ``evidences`` to be supplied in the input state; the pipelined
+    scheduler uses this to run the detectives in its own worker pools.
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    from src.nodes.detectives import RepoInvestigator, DocAnalyst, VisionInspector
+    from src.nodes.judges import JudgeCriterion, fan_out_judges
+    from src.nodes.justice import ChiefJusticeNode
 
-def build_auditor_graph() -> StateGraph:
-    """Create the full StateGraph with parallel detective and judge nodes."""
     builder = StateGraph(AgentState)
     
     # Detectives Layer
-    builder.add_node("RepoInvestigator", RepoInvestigator)
-    builder.add_node("DocAnalyst", DocAnalyst)
-    builder.add_node("VisionInspector", VisionInspector)
+    if include_detectives:
+        builder.add_node("RepoInvestigator", _node("RepoInvestigator", RepoInvestigator))
+        builder.add_node("DocAnalyst", _node("DocAnalyst", DocAnalyst))
+        builder.add_node("VisionInspector", _node("VisionInspector", VisionInspector))
     
     # Synchronization
-    builder.add_node("EvidenceAggregator", EvidenceAggregator)
+    builder.add_node("EvidenceAggregator", _node("EvidenceAggregator", EvidenceAggregator))
     
     # Error Handler
-    builder.add_node("error_handler", error_handler)
+    builder.add_node("error_handler", _node("error_handler", error_handler))
     
     # Branching node for Judges fan-out
-    builder.add_node("JudgesBranchNode", JudgesBranchNode)
+    builder.add_node("JudgesBranchNode", _node("JudgesBranchNode", JudgesBranchNode))
     
-    # Judicial Layer
-    builder.add_node("Prosecutor", Prosecutor)
-    builder.add_node("Defense", Defense)
-    builder.add_node("TechLead", TechLead)
+    # Judicial Layer: one task per (judge, dimension), see fan_out_judges
+    builder.add_node("JudgeCriterion", _node("JudgeCriterion", JudgeCriterion))
     
     # Supreme Court
-    builder.add_node("ChiefJustice", ChiefJusticeNode)
+    builder.add_node("ChiefJustice", _node("ChiefJustice", ChiefJusticeNode))
     
     # Cleanup Node
-    builder.add_node("Cleanup", _cleanup_node)
+    builder.add_node("Cleanup", _node("Cleanup", _cleanup_node))
     
-    # Detectives Fan-Out
-    builder.add_edge(START, "RepoInvestigator")
-    builder.add_edge(START, "DocAnalyst")
-    builder.add_edge(START, "VisionInspector")
-    
-    # Detectives Fan-In
-    builder.add_edge("RepoInvestigator", "EvidenceAggregator")
-    builder.add_edge("DocAnalyst", "EvidenceAggregator")
-    builder.add_edge("VisionInspector", "EvidenceAggregator")
+    if include_detectives:
+        # Detectives Fan-Out
+        builder.add_edge(START, "RepoInvestigator")
+        builder.add_edge(START, "DocAnalyst")
+        builder.add_edge(START, "VisionInspector")
+        
+        # Detectives Fan-In
+        builder.add_edge("RepoInvestigator", "EvidenceAggregator")
+        builder.add_edge("DocAnalyst", "EvidenceAggregator")
+        builder.add_edge("VisionInspector", "EvidenceAggregator")
+    else:
+        builder.add_edge(START, "EvidenceAggregator")
     
     # Conditional Edge
     builder.add_conditional_edges(
@@ -111,15 +125,11 @@ def build_auditor_graph() -> StateGraph:
     # Error path
     builder.add_edge("error_handler", "Cleanup")
     
-    # Judges Fan-Out
-    builder.add_edge("JudgesBranchNode", "Prosecutor")
-    builder.add_edge("JudgesBranchNode", "Defense")
-    builder.add_edge("JudgesBranchNode", "TechLead")
+    # Judges Fan-Out (Send per judge x dimension)
+    builder.add_conditional_edges("JudgesBranchNode", fan_out_judges, ["JudgeCriterion"])
     
     # Judges Fan-In
-    builder.add_edge("Prosecutor", "ChiefJustice")
-    builder.add_edge("Defense", "ChiefJustice")
-    builder.add_edge("TechLead", "ChiefJustice")
+    builder.add_edge("JudgeCriterion", "ChiefJustice")
     
     # Final Output
     builder.add_edge("ChiefJustice", "Cleanup")
@@ -127,36 +137,260 @@ def build_auditor_graph() -> StateGraph:
     
     return builder
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run the Automaton Auditor")
-    parser.add_argument("--repo", type=str, required=True, help="GitHub repository URL")
-    parser.add_argument("--pdf", type=str, required=True, help="Path to the PDF architecture report")
-    parser.add_argument("--output", type=str, default="audit/report.md", help="Output path for the Markdown report")
-    args = parser.parse_args()
-    
-    print(f"Starting audit for {args.repo} ...")
-    graph = build_auditor_graph().compile()
-    
-    initial_state = {
-        "repo_url": args.repo,
-        "pdf_path": args.pdf,
-        "rubric_dimensions": [], 
+def initial_state(repo_url: str, pdf_path: str, output_path: str = DEFAULT_REPORT_PATH,
+                  previous_audit: Optional[Dict] = None, time_budget: Optional[float] = None,
+                  rubric=None, report_formats: Optional[List[str]] = None) -> AgentState:
+    """Initial graph input for auditing one (repo, pdf) pair.
+
+    ``time_budget`` (seconds, default ``AUDIT_TIME_BUDGET``) starts the audit's
+    deadline clock; see :mod:`src.deadline`. ``rubric`` defaults to the cached
+    :func:`src.rubric.load_rubric`. ``report_formats`` are written next to
+    ``output_path`` (default: ``--format``/``REPORT_FORMATS``, see :mod:`src.reports`).
+    """
+    from src.deadline import deadline_after
+    from src.reports import resolve_formats
+    from src.rubric import load_rubric
+
+    return {
+        "repo_url": repo_url,
+        "pdf_path": pdf_path,
+        "rubric": rubric or load_rubric(),
+        "rubric_dimensions": [],
         "evidences": {},
-        "opinions": []
+        "opinions": [],
+        "commit": None,
+        "fingerprints": {},
+        "repo_path": None,
+        "git_history": None,
+        "output_path": output_path,
+        "report_formats": resolve_formats(report_formats),
+        "previous_audit": previous_audit,
+        "deadline": deadline_after(time_budget),
+        "degradations": [],
     }
-    
-    # Output file path generation logic is handled inside ChiefJusticeNode using hardcoded 'audit' dir.
-    # To use args.output, you could add it to state or just overwrite after.
-    # Here we just execute the graph.
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Automaton Auditor")
+    parser.add_argument("--repo", type=str, help="GitHub repository URL, or a local checkout, bare repository or .zip/.tar.gz export")
+    parser.add_argument("--local-sources", type=str, metavar="ROOT",
+                        help="Allow --repo values that are local paths (or file:// URLs) under ROOT "
+                             "(default: LOCAL_SOURCES_ROOT; unset = URLs only)")
+    parser.add_argument("--pdf", type=str, help="Path to the PDF architecture report")
+    parser.add_argument("--output", type=str, default=DEFAULT_REPORT_PATH,
+                        help="Report path; .md, .json or .html selects the format")
+    parser.add_argument("--format", type=str, action="append", metavar="FMT",
+                        help="Also write the report as FMT (md, json, html; repeatable or comma-separated) "
+                             "next to each output (default: REPORT_FORMATS)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-judge only dimensions whose evidence changed since the last audit written to --output")
+    parser.add_argument("--results-db", type=str,
+                        help="Store every finished audit in this SQLite file for querying with "
+                             "python -m src.results (default: RESULTS_DB; unset = not stored)")
+    parser.add_argument("--similarity-db", type=str,
+                        help="Check each submission's graph and node files against earlier ones in this index "
+                             "and record matches as evidence (default: SIMILARITY_DB; unset = off)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Reuse evidence and opinions of earlier audits with identical repo content and PDF "
+                             "(store: AUDIT_DEDUPE_PATH; default: AUDIT_DEDUPE)")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="Per-audit deadline; nodes degrade (skip vision, batch or skip judge calls) "
+                             "instead of overrunning it (default: AUDIT_TIME_BUDGET)")
+    tape = parser.add_argument_group("record/replay").add_mutually_exclusive_group()
+    tape.add_argument("--record", type=str, metavar="CASSETTE",
+                      help="Record every LLM call, checkout, git log and PDF extraction of this run to CASSETTE")
+    tape.add_argument("--replay", type=str, metavar="CASSETTE",
+                      help="Serve those calls from CASSETTE: no network, no git, deterministic "
+                           "(default: CASSETTE/CASSETTE_MODE; unset = live)")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--manifest", type=str, help="JSON/JSONL/CSV file of (repo, pdf[, output]) audits to run")
+    batch.add_argument("--output-dir", type=str, default="audit/batch", help="Directory for per-audit reports in batch mode")
+    batch.add_argument("--max-audits", type=int, default=4, help="Audits in flight at once")
+    batch.add_argument("--clone-concurrency", type=int, default=4, help="Concurrent git clones")
+    batch.add_argument("--extract-concurrency", type=int, default=2, help="Concurrent PDF extractions")
+    batch.add_argument("--judge-concurrency", type=int, default=3,
+                       help="Concurrent LLM calls (also bounds the judge fan-out of a single audit)")
+    batch.add_argument("--pipeline", action="store_true",
+                       help="Overlap clone/extract/judge stages across audits with per-stage worker pools")
+    batch.add_argument("--prefetch", type=int, default=4,
+                       help="Pipeline mode: audits detected ahead of the judges")
+    batch.add_argument("--async-git", action="store_true",
+                       help="Pipeline mode: run clones on one asyncio event loop instead of an io thread each")
+    batch.add_argument("--max-clones", type=int,
+                       help="Pipeline --async-git mode: clones in flight (default: GIT_MAX_CLONES or 8)")
+    ckpt = parser.add_argument_group("checkpointing")
+    ckpt.add_argument("--checkpoint-db", type=str, help="SQLite file to checkpoint audits into")
+    ckpt.add_argument("--audit-id", type=str, help="Checkpoint key (default: derived from --repo and --pdf)")
+    ckpt.add_argument("--resume", action="store_true",
+                      help="Continue an interrupted audit from its last completed node")
+    obs = parser.add_argument_group("instrumentation")
+    obs.add_argument("--trace", type=str, help="Append per-node/per-call spans to this JSON-lines file")
+    obs.add_argument("--metrics", type=str, help="Write a Prometheus text-format snapshot to this file")
+    obs.add_argument("--state-report", action="store_true",
+                     help="Single audit: print state size and reducer merge cost per super-step")
+    obs.add_argument("--profile", type=str, nargs="?", const="audit/profile", metavar="DIR",
+                     help="Profile each node; writes <node>.pstats and flamegraph-ready <node>.collapsed files to DIR")
+    args = parser.parse_args(argv)
+
+    from src.config import ConfigError, load_environment
+
+    try:
+        for warning in load_environment():
+            print(f"Warning: {warning}")
+    except ConfigError as exc:
+        parser.error(str(exc))
+
+    if args.results_db:
+        from src import results
+
+        results.configure(args.results_db)
+    if args.similarity_db:
+        from src import similarity
+
+        similarity.configure(args.similarity_db)
+    if args.dedupe:
+        from src import fingerprint
+
+        fingerprint.configure(True)
+    if args.local_sources:
+        from src.tools import repo_tools
+
+        repo_tools.configure_local_sources(args.local_sources)
+    if args.record or args.replay:
+        from src import cassette
+
+        try:
+            cassette.configure(args.record or args.replay, "record" if args.record else "replay")
+        except FileNotFoundError as exc:
+            parser.error(str(exc))
+    if args.format:
+        from src import reports
+
+        try:
+            reports.configure(args.format)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if not (args.trace or args.metrics or args.profile):
+        return _run(args, parser)
+
+    from src import instrumentation, profiling
+
+    if args.trace or args.metrics:
+        instrumentation.configure(trace_path=args.trace)
+    if args.profile:
+        profiling.enable(args.profile)
+    try:
+        return _run(args, parser)
+    finally:
+        profiler = profiling.disable()
+        if profiler is not None:
+            profiler.write()
+            print(profiler.summary())
+            print(f"Profiles written to {profiler.out_dir}/ (*.pstats, *.collapsed)")
+        if instrumentation.RECORDER.enabled:
+            if args.metrics:
+                instrumentation.write_prometheus(args.metrics)
+            print(instrumentation.summary_table())
+            instrumentation.disable()
+
+def _run(args, parser):
+    checkpointer = None
+    if args.state_report and (args.manifest or args.checkpoint_db or args.resume):
+        parser.error("--state-report applies to a single audit without checkpointing")
+    if args.incremental and args.pipeline:
+        parser.error("--incremental is not supported with --pipeline")
+    if (args.async_git or args.max_clones is not None) and not args.pipeline:
+        parser.error("--async-git/--max-clones require --pipeline")
+    if args.checkpoint_db or args.resume:
+        if args.pipeline:
+            parser.error("--checkpoint-db/--resume are not supported with --pipeline")
+        from src.checkpoint import DEFAULT_CHECKPOINT_DB, open_checkpointer
+
+        checkpointer = open_checkpointer(args.checkpoint_db or DEFAULT_CHECKPOINT_DB)
+
+    if args.manifest:
+        from src.batch import format_summary, load_manifest, run_manifest
+
+        entries = load_manifest(args.manifest)
+        print(f"Starting batch audit of {len(entries)} submissions from {args.manifest} ...")
+        if args.pipeline:
+            from src.scheduler import format_depths, run_pipelined
+
+            results = run_pipelined(
+                entries,
+                output_dir=args.output_dir,
+                io_workers=args.clone_concurrency,
+                cpu_workers=args.extract_concurrency,
+                llm_workers=args.max_audits,
+                prefetch=args.prefetch,
+                time_budget=args.time_budget,
+                judge_concurrency=args.judge_concurrency,
+                async_git=args.async_git,
+                max_clones=args.max_clones,
+                on_progress=lambda sched: print(f"  [pipeline] {format_depths(sched.stage_depths())}"),
+            )
+            print(format_summary(results))
+            return results
+        results = run_manifest(
+            entries,
+            output_dir=args.output_dir,
+            max_audits=args.max_audits,
+            clone_concurrency=args.clone_concurrency,
+            extract_concurrency=args.extract_concurrency,
+            judge_concurrency=args.judge_concurrency,
+            checkpointer=checkpointer,
+            resume=args.resume,
+            incremental=args.incremental,
+            time_budget=args.time_budget,
+        )
+        print(format_summary(results))
+        return results
+
+    if not args.repo or not args.pdf:
+        parser.error("--repo and --pdf are required unless --manifest is given")
+
+    print(f"Starting audit for {args.repo} ...")
+    from src.concurrency import configure_limits
+
+    configure_limits(judge=args.judge_concurrency)
+    graph = build_auditor_graph().compile(checkpointer=checkpointer)
+    from src.incremental import finalize_record, load_record, previous_audit, record_path
+
+    previous_record = load_record(record_path(args.output)) if args.incremental else None
+    state = initial_state(args.repo, args.pdf, args.output, previous_audit(previous_record, args.repo),
+                          time_budget=args.time_budget)
     
     try:
-        final_state = graph.invoke(initial_state, {"recursion_limit": 50})
-        print(f"Audit complete. Report generated at audit/report.md")
+        if checkpointer is not None:
+            from src.checkpoint import default_audit_id, invoke_checkpointed
+
+            audit_id = args.audit_id or default_audit_id(args.repo, args.pdf)
+            print(f"{'Resuming' if args.resume else 'Checkpointing'} audit {audit_id}")
+            final_state = invoke_checkpointed(graph, state, audit_id, resume=args.resume)
+        elif args.state_report:
+            from src.state_accounting import format_steps, run_with_accounting
+
+            final_state, steps = run_with_accounting(graph, state, {"recursion_limit": 50})
+            print(format_steps(steps))
+        else:
+            final_state = graph.invoke(state, {"recursion_limit": 50})
+        print(f"Audit complete. Report generated at {args.output}")
+        rejudged = finalize_record(final_state, args.output, previous_record)
+        from src.results import save_result
+
+        save_result(final_state, args.output)
+        if args.incremental and rejudged is not None:
+            print(f"Incremental audit: re-judged {len(rejudged)} dimension(s): {', '.join(rejudged) or 'none'}")
         if final_state:
              print("Final State keys:", final_state.keys())
              if "final_report" in final_state:
                  print("Final report exists:", final_state["final_report"] is not None)
+        return final_state
     except Exception as e:
         import traceback
         traceback.print_exc()
         print(f"Audit execution encountered an error: {e}")
+        if checkpointer is not None:
+            print("Completed nodes were checkpointed; re-run with --resume to continue.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Incremental re-audits.
+
+Every completed audit leaves an :class:`AuditRecord` next to its report: the
+evidence, the judges' opinions and a content hash per rubric dimension (see
+:func:`src.nodes.judges.evidence_fingerprint`). When the same submission is
+re-audited with ``--incremental``, the record is passed to the graph as
+``previous_audit`` and the judges only call the LLM for dimensions whose hash
+changed; the Chief Justice then synthesizes the report as usual.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.nodes.judges import evidence_fingerprint, rubric_dimensions
+from src.state import Evidence, JudicialOpinion
+
+
+class AuditRecord(BaseModel):
+    """Persisted inputs and outputs of one audit, used as the incremental baseline."""
+
+    repo_url: str = Field(..., description="URL of the audited repository")
+    evidences: Dict[str, List[Evidence]] = Field(default_factory=dict)
+    opinions: List[JudicialOpinion] = Field(default_factory=list)
+    dimension_hashes: Dict[str, str] = Field(
+        default_factory=dict, description="criterion_id -> evidence_fingerprint"
+    )
+
+
+def record_path(output_path: str) -> str:
+    """Sidecar location of the record for a report, e.g. ``report.record.json``."""
+    return str(Path(output_path).with_suffix(".record.json"))
+
+
+def dimension_hashes(state: Dict) -> Dict[str, str]:
+    state = dict(state, evidences=state.get("evidences") or {})
+    return {dim["id"]: evidence_fingerprint(dim, state) for dim in rubric_dimensions(state)}
+
+
+def build_record(final_state: Dict) -> Optional[AuditRecord]:
+    """Build a record from a finished graph state; ``None`` if the audit was not judged."""
+    report = final_state.get("final_report")
+    if report is None or not report.criteria:
+        return None
+    # take opinions from the report: exactly the set the Chief Justice synthesized
+    opinions = [op for cr in report.criteria for op in cr.judge_opinions]
+    return AuditRecord(
+        repo_url=final_state.get("repo_url", report.repo_url),
+        evidences=final_state.get("evidences", {}),
+        opinions=opinions,
+        dimension_hashes=dimension_hashes(final_state),
+    )
+
+
+def save_record(path: str, record: AuditRecord) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(record.model_dump_json(), encoding="utf-8")
+
+
+def load_record(path: str) -> Optional[AuditRecord]:
+    if not Path(path).is_file():
+        return None
+    return AuditRecord.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+
+def previous_audit(record: Optional[AuditRecord], repo_url: str) -> Optional[Dict]:
+    """State value for ``previous_audit``; ignores records of a different repository."""
+    if record is None or record.repo_url != repo_url:
+        return None
+    return {"dimension_hashes": record.dimension_hashes, "opinions": record.opinions}
+
+
+def changed_dimensions(record: Optional[AuditRecord], new_record: AuditRecord) -> List[str]:
+    """Dimensions whose evidence hash differs from (or is missing in) ``record``."""
+    old = record.dimension_hashes if record else {}
+    return [dim for dim, h in new_record.dimension_hashes.items() if old.get(dim) != h]
+
+
+def finalize_record(final_state: Optional[Dict], output_path: str, previous: Optional[AuditRecord] = None) -> Optional[List[str]]:
+    """Save the record for a finished audit and return the re-judged dimensions."""
+    record = build_record(final_state or {})
+    if record is None:
+        return None
+    save_record(record_path(output_path), record)
+    return changed_dimensions(previous, record)
@@ -0,0 +1,269 @@
+"""Per-node and per-call instrumentation.
+
+Every graph node (see ``build_auditor_graph``) and every LLM, git and PDF call
+runs inside a :func:`span`. When instrumentation is enabled with
+:func:`configure`, each finished span records wall time, CPU time of the
+calling thread, traced-memory growth, retries, prompt/completion tokens and
+cache hits; spans are appended to a JSON-lines trace file and aggregated into a
+Prometheus text-format snapshot plus a summary table. When disabled (the
+default) spans cost a couple of attribute lookups.
+"""
+
+import contextvars
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_current_audit: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("audit", default=None)
+
+
+@functools.lru_cache(maxsize=None)
+def _usage_callback_class():
+    # defined lazily so importing this module does not pull in langchain_core
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class _UsageCallback(BaseCallbackHandler):
+        """Copies token usage of LLM responses into a span's attributes."""
+
+        def __init__(self, attrs: Dict[str, Any]) -> None:
+            self.attrs = attrs
+
+        def on_llm_end(self, response, **kwargs: Any) -> None:
+            prompt = completion = 0
+            for generations in response.generations:
+                for gen in generations:
+                    usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                    prompt += usage.get("input_tokens", 0)
+                    completion += usage.get("output_tokens", 0)
+            if not (prompt or completion):
+                usage = (response.llm_output or {}).get("token_usage") or {}
+                prompt = usage.get("prompt_tokens", 0)
+                completion = usage.get("completion_tokens", 0)
+            self.attrs["prompt_tokens"] = self.attrs.get("prompt_tokens", 0) + prompt
+            self.attrs["completion_tokens"] = self.attrs.get("completion_tokens", 0) + completion
+
+    return _UsageCallback
+
+
+class Recorder:
+    """Thread-safe sink for finished spans and counters."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_memory = False
+        self.trace_path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._spans: List[Dict[str, Any]] = []
+        self._counters: Dict[tuple, float] = defaultdict(float)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._spans.append(entry)
+            if self.trace_path is not None:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    @property
+    def counters(self) -> Dict[tuple, float]:
+        with self._lock:
+            return dict(self._counters)
+
+
+RECORDER = Recorder()
+
+
+def configure(trace_path: Optional[str] = None, trace_memory: bool = True) -> Recorder:
+    """Enable instrumentation, optionally streaming spans to ``trace_path`` (JSON lines)."""
+    RECORDER.reset()
+    RECORDER.enabled = True
+    RECORDER.trace_memory = trace_memory
+    RECORDER.trace_path = Path(trace_path) if trace_path else None
+    if RECORDER.trace_path is not None:
+        RECORDER.trace_path.parent.mkdir(parents=True, exist_ok=True)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return RECORDER
+
+
+def disable() -> None:
+    RECORDER.enabled = False
+    RECORDER.trace_path = None
+    if RECORDER.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time a block. Callers may add ``retries``, ``cache_hit`` etc. to the yielded dict.
+
+    ``memory_delta_bytes`` is how much traced memory grew between entering and
+    leaving the span. tracemalloc is process-wide, so the delta includes
+    allocations of concurrent spans. ``process_peak_bytes`` is the process's
+    traced peak so far. The peak is never reset: resetting it per span would
+    wipe the peaks of enclosing and parallel spans.
+    """
+    if not RECORDER.enabled:
+        yield attrs
+        return
+    attrs.setdefault("audit", _current_audit.get())
+    tracing = RECORDER.trace_memory and tracemalloc.is_tracing()
+    mem0 = tracemalloc.get_traced_memory()[0] if tracing else 0
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        entry = {
+            "ts": time.time(),
+            "kind": kind,
+            "name": name,
+            "status": status,
+            "wall_s": time.perf_counter() - wall0,
+            "cpu_s": time.thread_time() - cpu0,
+            "thread": threading.current_thread().name,
+        }
+        if tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            entry["memory_delta_bytes"] = current - mem0
+            entry["process_peak_bytes"] = peak
+        entry.update(attrs)
+        RECORDER.record(entry)
+
+
+def count(name: str, value: float = 1, **labels: str) -> None:
+    """Increment a counter such as ``cache_hits`` (no-op when disabled)."""
+    if RECORDER.enabled:
+        RECORDER.count(name, value, **labels)
+
+
+def llm_config(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    """Runnable config that records token usage into a span's attrs."""
+    if not RECORDER.enabled:
+        return {}
+    return {"callbacks": [_usage_callback_class()(attrs)]}
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node so each execution is recorded as a ``node`` span."""
+
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        if not RECORDER.enabled:
+            return fn(state, *args, **kwargs)
+        token = _current_audit.set(state.get("repo_url") if isinstance(state, dict) else None)
+        try:
+            with span("node", name):
+                return fn(state, *args, **kwargs)
+        finally:
+            _current_audit.reset(token)
+
+    return wrapper
+
+
+def _aggregate(spans: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, float]]:
+    agg: Dict[tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for s in spans:
+        a = agg[(s["kind"], s["name"])]
+        a["count"] += 1
+        a["errors"] += s["status"] == "error"
+        a["wall_s"] += s["wall_s"]
+        a["cpu_s"] += s["cpu_s"]
+        a["retries"] += s.get("retries", 0)
+        a["prompt_tokens"] += s.get("prompt_tokens", 0)
+        a["completion_tokens"] += s.get("completion_tokens", 0)
+        a["cache_hits"] += bool(s.get("cache_hit"))
+        a["memory_delta_bytes"] = max(a["memory_delta_bytes"], s.get("memory_delta_bytes", 0))
+    return agg
+
+
+def _process_peak(spans: List[Dict[str, Any]]) -> Optional[int]:
+    peaks = [s["process_peak_bytes"] for s in spans if "process_peak_bytes" in s]
+    return max(peaks) if peaks else None
+
+
+def prometheus_snapshot(recorder: Recorder = RECORDER) -> str:
+    """Render aggregated spans and counters in Prometheus text exposition format."""
+    agg = _aggregate(recorder.spans)
+    metrics = [
+        ("auditor_span_seconds_sum", "counter", "Wall time spent in spans", "wall_s"),
+        ("auditor_span_cpu_seconds_sum", "counter", "Thread CPU time spent in spans", "cpu_s"),
+        ("auditor_span_count", "counter", "Number of finished spans", "count"),
+        ("auditor_span_errors_total", "counter", "Spans that raised", "errors"),
+        ("auditor_span_retries_total", "counter", "Retries inside spans", "retries"),
+        ("auditor_llm_prompt_tokens_total", "counter", "Prompt tokens sent", "prompt_tokens"),
+        ("auditor_llm_completion_tokens_total", "counter", "Completion tokens received", "completion_tokens"),
+        ("auditor_span_cache_hits_total", "counter", "Spans served from a cache", "cache_hits"),
+        ("auditor_span_memory_delta_bytes", "gauge",
+         "Max traced-memory growth across a span (process-wide, includes concurrent spans)", "memory_delta_bytes"),
+    ]
+    lines = []
+    for metric, mtype, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {mtype}")
+        for (kind, name), values in sorted(agg.items()):
+            lines.append(f'{metric}{{kind="{kind}",name="{name}"}} {values[field]:g}')
+    peak = _process_peak(recorder.spans)
+    if peak is not None:
+        lines.append("# HELP auditor_process_peak_memory_bytes Peak traced memory of the process")
+        lines.append("# TYPE auditor_process_peak_memory_bytes gauge")
+        lines.append(f"auditor_process_peak_memory_bytes {peak:g}")
+    counters = recorder.counters
+    if counters:
+        lines.append("# HELP auditor_events_total Named event counters (cache hits, reused opinions, ...)")
+        lines.append("# TYPE auditor_events_total counter")
+        for (name, labels), value in sorted(counters.items()):
+            label_str = ",".join([f'event="{name}"'] + [f'{k}="{v}"' for k, v in labels])
+            lines.append(f"auditor_events_total{{{label_str}}} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, recorder: Recorder = RECORDER) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(prometheus_snapshot(recorder), encoding="utf-8")
+
+
+def summary_table(recorder: Recorder = RECORDER) -> str:
+    """Markdown table of spans ordered by total wall time."""
+    agg = _aggregate(recorder.spans)
+    lines = [
+        "| Kind | Name | Calls | Wall (s) | Mean (s) | CPU (s) | Max mem +MB | Retries | Tokens in/out | Cache hits |",
+        "|------|------|-------|----------|----------|---------|---------|---------|---------------|------------|",
+    ]
+    for (kind, name), v in sorted(agg.items(), key=lambda kv: -kv[1]["wall_s"]):
+        lines.append(
+            f"| {kind} | {name} | {v['count']:.0f} | {v['wall_s']:.2f} | {v['wall_s'] / v['count']:.2f} "
+            f"| {v['cpu_s']:.2f} | {v['memory_delta_bytes'] / 1e6:.1f} | {v['retries']:.0f} "
+            f"| {v['prompt_tokens']:.0f}/{v['completion_tokens']:.0f} | {v['cache_hits']:.0f} |"
+        )
+    peak = _process_peak(recorder.spans)
+    if peak is not None:
+        lines.append(f"\nProcess peak traced memory: {peak / 1e6:.1f} MB")
+    for (name, labels), value in sorted(recorder.counters.items()):
+        label_str = ", ".join(f"{k}={v}" for k, v in labels)
+        lines.append(f"\n{name}{f' ({label_str})' if label_str else ''}: {value:g}")
+    return "\n".join(lines)
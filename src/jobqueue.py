@@ -0,0 +1,440 @@
+"""Durable audit job queue backed by SQLite, for horizontally scaled workers.
+
+Producers ``enqueue`` manifest entries; any number of worker processes (on one
+host, or on several hosts sharing the database file) ``lease`` jobs, keep the
+lease alive with ``heartbeat`` while the audit runs and report the outcome:
+
+- a lease that is not renewed before ``lease_expires`` is reclaimed by the next
+  worker (the original worker crashed or lost its host). A worker whose
+  heartbeat finds the lease gone stops its audit after the current graph step
+  and records nothing, leaving the report to the new owner;
+- failed attempts are retried with exponential backoff up to ``max_attempts``,
+  after which the job is dead-lettered (``status = 'dead'``) for inspection and
+  ``retry-dead``.
+
+Every state transition is a single ``BEGIN IMMEDIATE`` transaction, so two
+workers can never lease the same job. On network filesystems this relies on
+the filesystem's POSIX locks; WAL mode is deliberately not used.
+
+CLI::
+
+    python -m src.jobqueue enqueue cohort.csv
+    python -m src.jobqueue worker --threads 2
+    python -m src.jobqueue status
+    python -m src.jobqueue retry-dead
+"""
+
+import argparse
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from src.batch import BatchResult, ManifestEntry, default_output_path
+
+DEFAULT_QUEUE_DB = ".cache/jobs.sqlite"
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    repo           TEXT NOT NULL,
+    pdf            TEXT NOT NULL,
+    output         TEXT,
+    audit_id       TEXT,
+    status         TEXT NOT NULL DEFAULT 'queued',
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    max_attempts   INTEGER NOT NULL DEFAULT 3,
+    available_at   REAL NOT NULL,
+    enqueued_at    REAL NOT NULL,
+    lease_owner    TEXT,
+    lease_expires  REAL,
+    heartbeat_at   REAL,
+    started_at     REAL,
+    finished_at    REAL,
+    result_status  TEXT,
+    overall_score  REAL,
+    duration_s     REAL,
+    last_error     TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+"""
+
+
+class QueuedJob(BaseModel):
+    """A row of the ``jobs`` table."""
+
+    id: int
+    repo: str
+    pdf: str
+    output: Optional[str] = None
+    audit_id: Optional[str] = None
+    status: Literal["queued", "leased", "done", "dead"]
+    attempts: int
+    max_attempts: int
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    result_status: Optional[str] = None
+    overall_score: Optional[float] = None
+    duration_s: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def entry(self) -> ManifestEntry:
+        return ManifestEntry(repo=self.repo, pdf=self.pdf, output=self.output, audit_id=self.audit_id)
+
+
+class JobQueue:
+    """SQLite job queue. Opens a short-lived connection per operation, so one
+    instance may be shared by threads and many instances by processes."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_DB, clock: Callable[[], float] = time.time,
+                 backoff_s: float = 30.0) -> None:
+        self.path = path
+        self.clock = clock
+        self.backoff_s = backoff_s
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def enqueue(self, entries: List[ManifestEntry], max_attempts: int = 3) -> List[int]:
+        now = self.clock()
+        with self._tx() as conn:
+            return [
+                conn.execute(
+                    "INSERT INTO jobs (repo, pdf, output, audit_id, max_attempts, available_at, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (e.repo, e.pdf, e.output, e.audit_id, max_attempts, now, now),
+                ).lastrowid
+                for e in entries
+            ]
+
+    def lease(self, worker_id: str, lease_s: float = 300.0) -> Optional[QueuedJob]:
+        """Claim the oldest runnable job (queued, or leased with an expired lease)."""
+        now = self.clock()
+        with self._tx() as conn:
+            # expired leases that used up their attempts go to the dead letter
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', finished_at = ?, lease_owner = NULL, "
+                "last_error = COALESCE(last_error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, heartbeat_at = ?, started_at = ? WHERE id = ?",
+                (worker_id, now + lease_s, now, now, row["id"]),
+            )
+            return self._get(conn, row["id"])
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_s: float = 300.0) -> bool:
+        """Extend a lease; ``False`` means it was lost to another worker."""
+        now = self.clock()
+        with self._tx() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + lease_s, now, job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: BatchResult) -> bool:
+        """Record a finished audit (``ok`` or the deterministic ``failed`` path)."""
+        with self._tx() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, lease_owner = NULL, output = ?, "
+                "result_status = ?, overall_score = ?, duration_s = ?, last_error = NULL "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (self.clock(), result.output, result.status, result.overall_score, result.duration_s,
+                 job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> Optional[str]:
+        """Schedule a retry with exponential backoff, or dead-letter the job.
+
+        Returns the new status, or ``None`` if the lease had already been lost.
+        """
+        now = self.clock()
+        with self._tx() as conn:
+            job = self._get(conn, job_id)
+            if job is None or job.status != "leased" or job.lease_owner != worker_id:
+                return None
+            if job.attempts >= job.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'dead', finished_at = ?, lease_owner = NULL, last_error = ? "
+                    "WHERE id = ?",
+                    (now, error, job_id),
+                )
+                return "dead"
+            delay = self.backoff_s * 2 ** (job.attempts - 1)
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, lease_owner = NULL, "
+                "lease_expires = NULL, last_error = ? WHERE id = ?",
+                (now + delay, error, job_id),
+            )
+            return "queued"
+
+    def retry_dead(self, job_ids: Optional[List[int]] = None) -> int:
+        """Move dead-lettered jobs back to the queue with fresh attempts."""
+        query = "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, finished_at = NULL WHERE status = 'dead'"
+        params: list = [self.clock()]
+        if job_ids:
+            query += f" AND id IN ({','.join('?' * len(job_ids))})"
+            params += list(job_ids)
+        with self._tx() as conn:
+            return conn.execute(query, params).rowcount
+
+    def get(self, job_id: int) -> Optional[QueuedJob]:
+        with self._tx() as conn:
+            return self._get(conn, job_id)
+
+    def jobs(self, status: Optional[str] = None) -> List[QueuedJob]:
+        with self._tx() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs" + (" WHERE status = ?" if status else "") + " ORDER BY id",
+                (status,) if status else (),
+            ).fetchall()
+        return [QueuedJob(**{k: row[k] for k in QueuedJob.model_fields}) for row in rows]
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, job_id: int) -> Optional[QueuedJob]:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return QueuedJob(**{k: row[k] for k in QueuedJob.model_fields}) if row else None
+
+    def stats(self, window_s: float = 600.0) -> Dict:
+        """Backlog, throughput over the last ``window_s`` seconds and active workers."""
+        now = self.clock()
+        with self._tx() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            recent, mean_duration = conn.execute(
+                "SELECT COUNT(*), AVG(duration_s) FROM jobs WHERE status = 'done' AND finished_at >= ?",
+                (now - window_s,),
+            ).fetchone()
+            oldest = conn.execute(
+                "SELECT MIN(enqueued_at) FROM jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+            workers = conn.execute(
+                "SELECT COUNT(DISTINCT lease_owner) FROM jobs WHERE status = 'leased' AND lease_expires >= ?",
+                (now,),
+            ).fetchone()[0]
+        return {
+            "counts": {s: counts.get(s, 0) for s in ("queued", "leased", "done", "dead")},
+            "backlog": counts.get("queued", 0) + counts.get("leased", 0),
+            "throughput_per_min": recent * 60.0 / window_s,
+            "mean_duration_s": mean_duration,
+            "oldest_queued_age_s": now - oldest if oldest is not None else None,
+            "active_workers": workers,
+        }
+
+
+class LeaseLost(RuntimeError):
+    """The job's lease was taken over by another worker while its audit ran."""
+
+
+class _LeasedGraph:
+    """Runs ``graph`` one step at a time, stopping once ``lost`` is set."""
+
+    def __init__(self, graph, lost: threading.Event):
+        self.graph = graph
+        self.lost = lost
+
+    def invoke(self, state, config):
+        final_state = None
+        for final_state in self.graph.stream(state, config, stream_mode="values"):
+            if self.lost.is_set():
+                raise LeaseLost("the job's lease was lost to another worker")
+        return final_state
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(
+    queue: JobQueue,
+    graph=None,
+    worker_id: Optional[str] = None,
+    output_dir: str = "audit/queue",
+    lease_s: float = 300.0,
+    heartbeat_s: float = 60.0,
+    poll_s: float = 2.0,
+    max_jobs: Optional[int] = None,
+    exit_when_idle: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Lease and run audits until stopped; returns the number of jobs processed.
+
+    While an audit runs, a heartbeat thread renews the lease every
+    ``heartbeat_s`` seconds. If the lease is lost, the audit stops after its
+    current graph step and neither its report nor its outcome is recorded.
+    Audits that raise are retried via :meth:`JobQueue.fail`.
+    """
+    from src.batch import _run_one
+
+    if graph is None:
+        from src.graph import build_auditor_graph
+
+        graph = build_auditor_graph().compile()
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    processed = 0
+
+    while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+        job = queue.lease(worker_id, lease_s)
+        if job is None:
+            if exit_when_idle:
+                break
+            stop.wait(poll_s)
+            continue
+
+        done, lost = threading.Event(), threading.Event()
+
+        def beat(job_id=job.id):
+            while not done.wait(heartbeat_s):
+                if not queue.heartbeat(job_id, worker_id, lease_s):
+                    logger.warning(f"Worker {worker_id} lost the lease on job #{job_id}; abandoning its audit")
+                    lost.set()
+                    return
+
+        heartbeat = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        heartbeat.start()
+        output = job.output or default_output_path(output_dir, job.id, job.repo)
+        try:
+            result = _run_one(_LeasedGraph(graph, lost), job.entry(), output)
+        finally:
+            done.set()
+            heartbeat.join()
+        if lost.is_set():
+            pass  # the worker now holding the lease records the outcome
+        elif result.status == "error":
+            queue.fail(job.id, worker_id, result.error or "unknown error")
+        else:
+            queue.complete(job.id, worker_id, result)
+        processed += 1
+    return processed
+
+
+def format_status(stats: Dict, dead: List[QueuedJob]) -> str:
+    c = stats["counts"]
+    lines = [
+        f"queued: {c['queued']}  leased: {c['leased']}  done: {c['done']}  dead: {c['dead']}",
+        f"backlog: {stats['backlog']}  active workers: {stats['active_workers']}",
+        f"throughput: {stats['throughput_per_min']:.2f} audits/min"
+        + (f"  (mean {stats['mean_duration_s']:.1f}s per audit)" if stats["mean_duration_s"] else ""),
+    ]
+    if stats["oldest_queued_age_s"] is not None:
+        lines.append(f"oldest queued job waiting {stats['oldest_queued_age_s']:.0f}s")
+    for job in dead:
+        lines.append(f"  dead #{job.id} {job.repo} after {job.attempts} attempt(s): {(job.last_error or '')[:80]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Durable audit job queue")
+    parser.add_argument("--db", default=DEFAULT_QUEUE_DB, help="SQLite queue file (share it between hosts)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enq = sub.add_parser("enqueue", help="Add the audits of a manifest to the queue")
+    enq.add_argument("manifest", help="JSON/JSONL/CSV manifest (same format as --manifest)")
+    enq.add_argument("--max-attempts", type=int, default=3)
+
+    work = sub.add_parser("worker", help="Run audits from the queue")
+    work.add_argument("--threads", type=int, default=1, help="Worker loops in this process (sharing one graph)")
+    work.add_argument("--output-dir", default="audit/queue", help="Directory for reports of jobs without an output")
+    work.add_argument("--lease", type=float, default=300.0, help="Lease length in seconds")
+    work.add_argument("--heartbeat", type=float, default=60.0, help="Lease renewal interval in seconds")
+    work.add_argument("--poll", type=float, default=2.0, help="Idle polling interval in seconds")
+    work.add_argument("--max-jobs", type=int, help="Exit after this many jobs (per thread)")
+    work.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty")
+    work.add_argument("--judge-concurrency", type=int, default=3, help="Concurrent LLM calls in this process")
+
+    sub.add_parser("status", help="Show backlog, throughput and dead-lettered jobs")
+    retry = sub.add_parser("retry-dead", help="Re-queue dead-lettered jobs")
+    retry.add_argument("ids", nargs="*", type=int)
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    if args.command == "enqueue":
+        from src.batch import load_manifest
+
+        ids = queue.enqueue(load_manifest(args.manifest), max_attempts=args.max_attempts)
+        print(f"Enqueued {len(ids)} audit(s) into {args.db}")
+    elif args.command == "status":
+        print(format_status(queue.stats(), queue.jobs("dead")))
+    elif args.command == "retry-dead":
+        print(f"Re-queued {queue.retry_dead(args.ids or None)} dead job(s)")
+    else:
+        from src.concurrency import configure_limits
+        from src.config import ConfigError, load_environment
+        from src.graph import build_auditor_graph
+
+        try:
+            for warning in load_environment():
+                print(f"Warning: {warning}")
+        except ConfigError as exc:
+            parser.error(str(exc))
+        configure_limits(judge=args.judge_concurrency)
+        graph = build_auditor_graph().compile()
+        worker_id = default_worker_id()
+        stop = threading.Event()
+        print(f"Worker {worker_id} polling {args.db} with {args.threads} thread(s)")
+        threads = [
+            threading.Thread(
+                target=run_worker,
+                kwargs=dict(
+                    queue=queue, graph=graph, worker_id=f"{worker_id}/{i}", output_dir=args.output_dir,
+                    lease_s=args.lease, heartbeat_s=args.heartbeat, poll_s=args.poll,
+                    max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle, stop=stop,
+                ),
+                name=f"worker-{i}",
+            )
+            for i in range(max(1, args.threads))
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        except KeyboardInterrupt:
+            print("Stopping after the current audit(s); unfinished leases expire and are retried.")
+            stop.set()
+            for t in threads:
+                t.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,16 @@
 # nodes package
-from .detectives import RepoInvestigator, DocAnalyst, VisionInspector
+# Detectives are resolved on first access so that importing a light submodule
+# (e.g. src.nodes.justice) does not load the PDF/vision tooling.
+_DETECTIVES = ("RepoInvestigator", "DocAnalyst", "VisionInspector")
+
+__all__ = list(_DETECTIVES)
+
+
+def __getattr__(name):
+    if name in _DETECTIVES:
+        from . import detectives
+
+        return getattr(detectives, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # later we will also export judge and justice components here
@@ -1,26 +1,84 @@
 from __future__ import annotations
 
 import json
-import re
+import os
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from src import cassette, deadline, fingerprint, instrumentation, similarity
+from src.concurrency import stage_slot
+from src.rubric import rubric_from_state
 from src.state import AgentState, Evidence
-from src.tools import repo_tools, doc_tools
+from src.tools import repo_tools, doc_tools, vision_cache, vision_tools
 
 
-def load_rubric() -> Dict:
-    """Load rubric.json."""
+# evidence about this submission relative to the cohort: never reused for a duplicate
+_PER_SUBMISSION = ("code_similarity", "report_similarity")
+_MAX_SIMILAR = {"code_similarity": 10, "report_similarity": 3}
+
+
+def _dedupe_lookup(kind: str, key: str) -> Optional[fingerprint.StoredEvidence]:
+    """Evidence stored for ``key`` by an earlier audit (dedupe on, see :mod:`src.fingerprint`)."""
+    store = fingerprint.active_store()
+    stored = store.get(kind, key) if store is not None else None
+    if stored is None:
+        return None
+    instrumentation.count("dedupe_hits", kind=kind)
+    return stored
+
+
+def _dedupe_remember(kind: str, key: Optional[str], state: AgentState, evidences: Dict[str, List[Evidence]],
+                     commit: Optional[str] = None) -> None:
+    store = fingerprint.active_store()
+    if store is not None and key:
+        evidences = {dim: evs for dim, evs in evidences.items() if dim not in _PER_SUBMISSION}
+        store.put(kind, key, fingerprint.StoredEvidence(repo_url=state.get("repo_url", ""), evidences=evidences,
+                                                        commit=commit))
+
+
+def _pdf_digest(state: AgentState, pdf_path: Path, artifacts, salt: str = "") -> Optional[str]:
+    if fingerprint.active_store() is None:
+        return None
+    dims = [d.as_dict() for d in rubric_from_state(state).for_artifact(*artifacts)]
+    return fingerprint.file_digest(pdf_path, fingerprint.dimensions_digest(dims) + salt)
+
+
+def _similarity_evidence(key: str, goal: str, location: str, check, nothing: str,
+                         found: str) -> Dict[str, List[Evidence]]:
+    """``key`` evidence from the cohort index (on with ``SIMILARITY_DB``, see :mod:`src.similarity`).
+
+    ``check(index)`` looks the submission up and indexes it; the closest
+    matches are listed with their Jaccard similarity and overlap.
+    """
+    index = similarity.active_index()
+    if index is None:
+        return {}
     try:
-        with open("rubric.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        raise RuntimeError(f"Cannot load rubric.json: {e}")
+        with instrumentation.span("similarity", key):
+            matches = check(index)
+    except Exception as exc:
+        return {key: [Evidence(
+            goal=goal,
+            found=False,
+            location=location,
+            rationale=f"Similarity check failed: {exc}",
+            confidence=0.0
+        )]}
+    return {key: [Evidence(
+        goal=goal,
+        found=bool(matches),
+        content="\n".join(f"{m.path} ~ {m.other_repo}:{m.other_path} (Jaccard {m.similarity:.2f}, "
+                          f"overlap {m.overlap:.0%})" for m in matches[:_MAX_SIMILAR[key]]) or None,
+        location=location,
+        rationale=found.format(n=len(matches)) if matches else nothing,
+        confidence=0.9
+    )]}
 
 
-def RepoInvestigator(state: AgentState) -> Dict[str, List[Evidence]]:
-    """Repo detective – returns dict of criterion_id → [Evidence]."""
-    evidences: Dict[str, List[Evidence]] = {}
+def RepoInvestigator(state: AgentState) -> Dict[str, Dict[str, List[Evidence]]]:
+    """Repo detective – returns an ``evidences`` update of criterion_id → [Evidence]."""
     repo_url = state.get("repo_url", "")
 
     if not repo_url:
@@ -31,32 +89,77 @@ def RepoInvestigator(state: AgentState) -> Dict[str, List[Evidence]]:
             rationale="repo_url missing",
             confidence=0.0
         )
-        return {"general": [ev]}
+        return {"evidences": {"general": [ev]}}
+
+    if state.get("repo_path"):
+        # checked out by the caller (e.g. cloned ahead on the async git loop), which also removes it
+        return _investigate(state, repo_url, Path(state["repo_path"]))
+
+    if repo_tools.is_local_source(repo_url):
+        # CI checkouts and offline exports: no network, and a directory is audited in place
+        try:
+            with instrumentation.span("git", "open"):
+                timeout = deadline.timeout_for(state, "GIT_CLONE_TIMEOUT")
+                repo_path, cleanup = repo_tools.open_local_repo(repo_url, timeout=timeout)
+        except Exception as exc:
+            return clone_failure(state, exc)
+        try:
+            return _investigate(state, repo_url, repo_path)
+        finally:
+            if cleanup is not None:
+                shutil.rmtree(cleanup, ignore_errors=True)
 
     try:
-        repo_path, success = repo_tools.safe_clone_repo(repo_url)
+        with stage_slot("clone"), instrumentation.span("git", "clone"):
+            timeout = deadline.timeout_for(state, "GIT_CLONE_TIMEOUT")
+            repo_path, success = repo_tools.safe_clone_repo(repo_url, timeout=timeout)
     except Exception as exc:
-        ev = Evidence(
-            goal="Repository cloning",
-            found=False,
-            location=repo_url,
-            rationale=f"Clone failed: {exc}",
-            confidence=0.0
-        )
-        return {"general": [ev]}
+        return clone_failure(state, exc)
+
+    try:
+        if not success:
+            return {"evidences": {"general": [Evidence(
+                goal="Repository cloning",
+                found=False,
+                location=repo_url,
+                rationale="Clone reported failure",
+                confidence=0.0
+            )]}}
+        return _investigate(state, repo_url, repo_path)
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
 
-    if not success:
-        return {"general": [Evidence(
-            goal="Repository cloning",
-            found=False,
-            location=repo_url,
-            rationale="Clone reported failure",
-            confidence=0.0
-        )]}
+
+def clone_failure(state: AgentState, exc: BaseException) -> Dict:
+    """RepoInvestigator's update when the repository could not be cloned."""
+    ev = Evidence(
+        goal="Repository cloning",
+        found=False,
+        location=state.get("repo_url", ""),
+        rationale=f"Clone failed: {exc}",
+        confidence=0.0
+    )
+    update = {"evidences": {"general": [ev]}}
+    if deadline.expired(state):
+        update["degradations"] = [deadline.note(state, "Repository not analyzed: clone cut off by the deadline")]
+    return update
+
+
+def _investigate(state: AgentState, repo_url: str, repo_path: Path) -> Dict:
+    """Evidence from a checkout of ``repo_url`` at ``repo_path``."""
+    evidences: Dict[str, List[Evidence]] = {}
 
     # Git history evidence (expand for other repo dimensions later)
+    update: Dict = {"evidences": evidences}
+    commits: List[Dict] = []
     try:
-        count, commits = repo_tools.extract_git_history(repo_path)
+        if state.get("git_history") is not None:
+            # read by the async git loop together with the clone
+            count, commits = len(state["git_history"]), state["git_history"]
+        else:
+            with instrumentation.span("git", "log"):
+                timeout = deadline.timeout_for(state, "GIT_CLONE_TIMEOUT")
+                count, commits = repo_tools.extract_git_history(repo_path, timeout=timeout)
         summary = f"{count} commits. Example: {commits[0]['message'] if commits else 'none'}"
         ev = Evidence(
             goal="Git Forensic Analysis",
@@ -67,6 +170,8 @@ def RepoInvestigator(state: AgentState) -> Dict[str, List[Evidence]]:
             confidence=0.9 if count > 3 else 0.5
         )
         evidences["git_forensic_analysis"] = [ev]
+        if commits:
+            update["commit"] = commits[-1]["hash"]  # history is oldest first
     except Exception as exc:
         evidences["git_forensic_analysis"] = [Evidence(
             goal="Git history",
@@ -76,6 +181,24 @@ def RepoInvestigator(state: AgentState) -> Dict[str, List[Evidence]]:
             confidence=0.2
         )]
 
+    similar = _similarity_evidence(
+        "code_similarity", "Cross-submission code similarity", repo_url,
+        lambda index: index.index_repo(repo_url, repo_path),
+        nothing="No indexed submission has similar graph or node files",
+        found="{n} file match(es) with earlier submissions after identifier normalization",
+    )
+    evidences.update(similar)
+
+    # Duplicate submission (same files and history as an earlier audit): reuse its evidence
+    repo_key = None
+    if fingerprint.active_store() is not None:
+        repo_key = fingerprint.tree_hash(repo_path, [c["hash"] for c in commits])
+        update["fingerprints"] = {"repo": repo_key}
+        stored = _dedupe_lookup("repo", repo_key)
+        if stored is not None:
+            update["evidences"] = {**stored.evidences, **similar}
+            return update
+
     # AST-based checks
     
     # 1. State Management Rigor (src/state.py)
@@ -188,10 +311,11 @@ def RepoInvestigator(state: AgentState) -> Dict[str, List[Evidence]]:
             confidence=1.0
         )]
 
-    return evidences
+    _dedupe_remember("repo", repo_key, state, evidences, update.get("commit"))
+    return update
 
 
-def DocAnalyst(state: AgentState) -> Dict[str, List[Evidence]]:
+def DocAnalyst(state: AgentState) -> Dict[str, Dict[str, List[Evidence]]]:
     """PDF detective – analyzes rubric dimensions targeting PDF."""
     evidences: Dict[str, List[Evidence]] = {}
     pdf_path_str = state.get("pdf_path", "")
@@ -204,10 +328,28 @@ def DocAnalyst(state: AgentState) -> Dict[str, List[Evidence]]:
             rationale="pdf_path missing or invalid",
             confidence=0.0
         )
-        return {"general": [ev]}
+        return {"evidences": {"general": [ev]}}
 
     pdf_path = Path(pdf_path_str)
-    pdf_data = doc_tools.extract_pdf_content(pdf_path)
+    repo_url = state.get("repo_url") or pdf_path_str  # identifies the submission in the similarity index
+    digest = _pdf_digest(state, pdf_path, ("pdf_report", "pdf_images"))
+    prints = {"fingerprints": {"pdf": digest}} if digest else {}
+    stored = _dedupe_lookup("pdf", digest) if digest else None
+    if stored is not None:
+        evidences = dict(stored.evidences)
+        if stored.repo_url != repo_url and similarity.active_index() is not None:
+            evidences["report_similarity"] = [Evidence(
+                goal="Cross-submission report similarity",
+                found=True,
+                content=f"{pdf_path.name} ~ {stored.repo_url} (identical file)",
+                location=str(pdf_path),
+                rationale="The PDF is byte-identical to a report submitted earlier",
+                confidence=1.0
+            )]
+        return {"evidences": evidences, **prints}
+
+    with stage_slot("extract"), instrumentation.span("pdf", "extract", caller="DocAnalyst"):
+        pdf_data = doc_tools.extract_pdf_content(pdf_path)
 
     if not pdf_data["success"]:
         ev = Evidence(
@@ -217,43 +359,40 @@ def DocAnalyst(state: AgentState) -> Dict[str, List[Evidence]]:
             rationale=" → ".join(pdf_data["errors"]),
             confidence=0.1
         )
-        return {"general": [ev]}
+        return {"evidences": {"general": [ev]}, **prints}
 
     chunks = pdf_data["chunks"]
     image_count = len(pdf_data["image_paths"])
 
-    rubric = load_rubric()
-    pdf_dims = [d for d in rubric["dimensions"] if d["target_artifact"] in ("pdf_report", "pdf_images")]
-
-    for dim in pdf_dims:
-        dim_id = dim["id"]
+    text = "\n".join(c["text"] for c in chunks)
+    evidences.update(_similarity_evidence(
+        "report_similarity", "Cross-submission report similarity", str(pdf_path),
+        lambda index: index.index_report(repo_url, pdf_path.name, text),
+        nothing="No indexed report shares substantial text with this one",
+        found="{n} earlier report(s) share most of their text with this one",
+    ))
+    for dim in rubric_from_state(state).for_artifact("pdf_report", "pdf_images"):
+        dim_id = dim.id
 
         if dim_id == "theoretical_depth":
-            keywords = ["Dialectical Synthesis", "Fan-In / Fan-Out", "Metacognition", "State Synchronization"]
-            found_kws = []
-            for kw in keywords:
-                for chunk in chunks:
-                    if kw.lower() in chunk["text"].lower():
-                        found_kws.append(kw)
-                        break
-            found = len(found_kws) >= 2
+            found_kws = dim.matched_keywords(text)
+            found = len(found_kws) >= dim.min_keywords
             ev = Evidence(
-                goal=dim["name"],
+                goal=dim.name,
                 found=found,
                 content=f"Keywords found: {', '.join(found_kws)}",
                 location=str(pdf_path),
-                rationale=f"{len(found_kws)}/{len(keywords)} architectural terms detected",
+                rationale=f"{len(found_kws)}/{len(dim.keywords)} architectural terms detected",
                 confidence=0.80 if found else 0.40
             )
             evidences[dim_id] = [ev]
 
         elif dim_id == "report_accuracy":
             # Detect mentioned file paths
-            mentioned = re.findall(r'(src/[\w/\-]+\.(py|json|md|toml))', "\n".join(c["text"] for c in chunks))
-            unique_files = sorted(set(m[0] for m in mentioned))
+            unique_files = dim.find_paths(text)
             found = len(unique_files) > 0
             ev = Evidence(
-                goal=dim["name"],
+                goal=dim.name,
                 found=found,
                 content="\n".join(unique_files[:6]) if unique_files else "No paths found",
                 location=str(pdf_path),
@@ -265,7 +404,7 @@ def DocAnalyst(state: AgentState) -> Dict[str, List[Evidence]]:
         elif dim_id == "swarm_visual":
             found = image_count > 0
             ev = Evidence(
-                goal=dim["name"],
+                goal=dim.name,
                 found=found,
                 content=f"{image_count} images extracted",
                 location=str(pdf_path),
@@ -274,66 +413,208 @@ def DocAnalyst(state: AgentState) -> Dict[str, List[Evidence]]:
             )
             evidences[dim_id] = [ev]
 
-    return evidences
+    _dedupe_remember("pdf", digest, state, evidences)
+    return {"evidences": evidences, **prints}
+
+
+def _vision_config() -> Dict:
+    """Read VisionInspector settings from the environment."""
+    return {
+        "mode": os.getenv("VISION_MODE", "single").strip().lower(),
+        "max_images": max(1, int(os.getenv("VISION_MAX_IMAGES", "3"))),
+        "contact_sheet": os.getenv("VISION_CONTACT_SHEET", "true").strip().lower() in ("1", "true", "yes"),
+        "max_side": int(os.getenv("VISION_MAX_SIDE", "768")),
+    }
 
 
-def VisionInspector(state: AgentState) -> Dict[str, List[Evidence]]:
-    """Multimodal detective – visualizes workflow diagrams."""
+@lru_cache(maxsize=1)
+def _vision_llm():
+    def live():
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(model="gpt-4o", temperature=0.0, timeout=deadline.setting("LLM_TIMEOUT"))
+
+    def replayed(data):
+        from langchain_core.messages import AIMessage
+
+        return AIMessage.model_validate(data)
+
+    return cassette.RecordedLLM("vision", live, replayed)
+
+
+def _cache_lookup(cache, image_path: Path):
+    """Return ``(fingerprint, cached_value)``; hashing failures count as misses."""
+    if cache is None:
+        return None, None
+    with instrumentation.span("cache", "vision.lookup") as sp:
+        try:
+            fingerprint = cache.fingerprint(image_path)
+        except Exception:
+            return None, None
+        cached = cache.lookup(image_path, fingerprint)
+        sp["cache_hit"] = cached is not None
+    instrumentation.count("cache_hits" if cached else "cache_misses", cache="vision")
+    return fingerprint, cached
+
+
+def _cache_store(cache, image_path: Path, result: Dict, fingerprint: Optional[int]) -> None:
+    """Cache a classification, unless hashing failed or the model gave none (``UNKNOWN``)."""
+    if fingerprint is not None and result["classification"] != "UNKNOWN":
+        cache.store(image_path, result, fingerprint)
+
+
+def _inspect_single_image(pdf_path: Path, images: List[Path], timeout: deadline.Timeout = None) -> List[Evidence]:
+    """Classify the first extracted image with one vision call (bounded by ``timeout``, see
+    :func:`src.deadline.call_with_timeout`)."""
+    from langchain_core.messages import HumanMessage
+
+    # Take the first image (usually the architecture diagram if there are few)
+    target_img = images[0]
+    cache = vision_cache.get_vision_cache()
+    fingerprint, cached = _cache_lookup(cache, target_img)
+    if cached:
+        content_str = f"CLASSIFICATION: {cached['classification']}. FLOW: {cached['flow']}"
+        rationale = f"Served from perceptual-hash cache (distance {cached['distance']})"
+    else:
+        msg = HumanMessage(
+            content=[
+                {"type": "text", "text": vision_tools.SINGLE_IMAGE_PROMPT},
+                {"type": "image_url", "image_url": {"url": vision_tools.to_data_url(target_img.read_bytes())}}
+            ]
+        )
+
+        with instrumentation.span("llm", "vision.single") as sp:
+            response = deadline.call_with_timeout(
+                lambda: _vision_llm().invoke([msg], config=instrumentation.llm_config(sp)), timeout, stage="judge")
+        content_str = str(response.content)
+        rationale = "Vision model analyzed the diagram for parallel fan-out architecture"
+        _cache_store(cache, target_img, vision_tools.parse_single_classification(content_str), fingerprint)
+
+    is_parallel = "parallel" in content_str.lower() or "stategraph" in content_str.lower()
+
+    return [Evidence(
+        goal="Architectural Diagram Analysis",
+        found=is_parallel,
+        content=content_str,
+        location=str(pdf_path) + " (Image 1)",
+        rationale=rationale,
+        confidence=0.9
+    )]
+
+
+def _inspect_image_batch(pdf_path: Path, images: List[Path], config: Dict,
+                         timeout: deadline.Timeout = None) -> List[Evidence]:
+    """Classify the top-ranked images with a single multimodal vision call.
+
+    Figures found in the perceptual-hash cache are not sent to the model. Returns
+    a summary ``Evidence`` followed by one ``Evidence`` per image whose location
+    points back to the PDF page the figure was extracted from. The vision call
+    is abandoned after ``timeout`` seconds (a callable is evaluated once the LLM slot is held).
+    """
+    from langchain_core.messages import HumanMessage
+
+    selected = vision_tools.rank_images(images, top_k=config["max_images"]) or images[:config["max_images"]]
+    cache = vision_cache.get_vision_cache()
+
+    results: List[Dict] = []
+    fingerprints = []
+    for idx, img_path in enumerate(selected):
+        fingerprint, cached = _cache_lookup(cache, img_path)
+        fingerprints.append(fingerprint)
+        results.append(None if not cached else {
+            "index": idx + 1,
+            "classification": cached["classification"],
+            "flow": cached["flow"],
+            "is_parallel": vision_tools.is_parallel_classification(cached["classification"]),
+            "cached": True,
+        })
+
+    pending = [i for i, res in enumerate(results) if res is None]
+    if pending:
+        content = vision_tools.build_batch_content(
+            [selected[i] for i in pending], contact_sheet=config["contact_sheet"], max_side=config["max_side"]
+        )
+        with instrumentation.span("llm", "vision.batch", images=len(pending)) as sp:
+            response = deadline.call_with_timeout(
+                lambda: _vision_llm().invoke([HumanMessage(content=content)], config=instrumentation.llm_config(sp)),
+                timeout, stage="judge")
+        parsed = vision_tools.parse_batch_classification(str(response.content), len(pending))
+        for i, res in zip(pending, parsed):
+            results[i] = dict(res, index=i + 1, cached=False)
+            _cache_store(cache, selected[i], res, fingerprints[i])
+
+    per_image = []
+    parallel_pages = []
+    for img_path, res in zip(selected, results):
+        page = vision_tools.image_page(img_path)
+        where = f"page {page}" if page is not None else img_path.name
+        if res["is_parallel"]:
+            parallel_pages.append(where)
+        per_image.append(Evidence(
+            goal=f"Diagram Classification (figure {res['index']}, {where})",
+            found=res["classification"] != "UNKNOWN",
+            content=f"CLASSIFICATION: {res['classification']}. FLOW: {res['flow']}",
+            location=f"{pdf_path} ({where})",
+            rationale=("Served from perceptual-hash cache" if res["cached"]
+                       else "Per-figure result from a batched vision call"),
+            confidence=0.85 if res["classification"] != "UNKNOWN" else 0.2
+        ))
+
+    found = bool(parallel_pages)
+    summary = Evidence(
+        goal="Architectural Diagram Analysis",
+        found=found,
+        content=(f"Parallel StateGraph diagram on {', '.join(parallel_pages)}" if found
+                 else f"None of {len(selected)} figures shows a parallel StateGraph"),
+        location=str(pdf_path),
+        rationale=(f"Vision model classified {len(selected)} of {len(images)} extracted images "
+                   f"in one call ({len(selected) - len(pending)} from cache)"),
+        confidence=0.9
+    )
+    return [summary] + per_image
+
+
+def VisionInspector(state: AgentState) -> Dict[str, Dict[str, List[Evidence]]]:
+    """Multimodal detective – visualizes workflow diagrams.
+
+    ``VISION_MODE=batch`` packs the top ``VISION_MAX_IMAGES`` figures
+    (optionally tiled into one contact sheet) into a single request instead of
+    only looking at the first image. Skipped when less than
+    ``BUDGET_VISION_MIN_S`` of the audit's time budget remains; DocAnalyst's
+    image count then stands in for the diagram analysis.
+    """
     evidences: Dict[str, List[Evidence]] = {}
-    
-    # We first see if DocAnalyst extracted any images
-    gen_evs = state.get("evidences", {}).get("swarm_visual", [])
-    has_images = False
-    
-    if gen_evs:
-        for ev in gen_evs:
-            if "images extracted" in str(ev.content):
-                has_images = True
-                break
-                
+    if deadline.below(state, "BUDGET_VISION_MIN_S"):
+        return {"degradations": [deadline.note(state, "VisionInspector skipped: diagrams not classified")]}
+
     pdf_path_str = state.get("pdf_path", "")
     pdf_path = Path(pdf_path_str) if pdf_path_str else None
     
-    # This is slightly redundant but DocAnalyst cleans up its temp_dir. 
-    # We will re-extract here specifically for the VisionInspector to send.
-    if pdf_path and pdf_path.exists() and has_images:
-        pdf_data = doc_tools.extract_pdf_content(pdf_path)
+    # VisionInspector runs in parallel with DocAnalyst, so it cannot rely on
+    # DocAnalyst's evidence; extract the images here specifically.
+    digest = None
+    if pdf_path and pdf_path.is_file():
+        digest = _pdf_digest(state, pdf_path, ("pdf_images",), salt=json.dumps(_vision_config(), sort_keys=True))
+        stored = _dedupe_lookup("vision", digest) if digest else None
+        if stored is not None:
+            return {"evidences": stored.evidences}
+
+        with stage_slot("extract"), instrumentation.span("pdf", "extract", caller="VisionInspector"):
+            pdf_data = doc_tools.extract_pdf_content(pdf_path)
         images = pdf_data.get("image_paths", [])
         
         if images:
             try:
-                import base64
-                from langchain_core.messages import HumanMessage
-                from langchain_openai import ChatOpenAI
-                
-                llm = ChatOpenAI(model="gpt-4o", temperature=0.0)
-                
-                # Take the first image (usually the architecture diagram if there are few)
-                target_img = images[0]
-                with open(target_img, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                    
-                msg = HumanMessage(
-                    content=[
-                        {"type": "text", "text": "Analyze this architectural diagram. Is it a LangGraph State Machine diagram showing parallel branching for Detectives and Judges (with EvidenceAggregator in between), or just a generic flowchart? Reply ONLY with 'CLASSIFICATION: [classification]. FLOW: [brief description]'."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{encoded_string}"}}
-                    ]
-                )
-                
-                response = llm.invoke([msg])
-                content_str = str(response.content)
-                
-                is_parallel = "parallel" in content_str.lower() or "stategraph" in content_str.lower()
-                
-                evidences["swarm_visual"] = [Evidence(
-                    goal="Architectural Diagram Analysis",
-                    found=is_parallel,
-                    content=content_str,
-                    location=str(pdf_path) + " (Image 1)",
-                    rationale="Vision model analyzed the diagram for parallel fan-out architecture",
-                    confidence=0.9
-                )]
+                config = _vision_config()
+                # the timeout is measured once the LLM slot is held: waiting behind the judges counts against the budget
+                if config["mode"] == "batch":
+                    evidences["swarm_visual"] = _inspect_image_batch(pdf_path, images, config, lambda: deadline.timeout_for(state))
+                else:
+                    evidences["swarm_visual"] = _inspect_single_image(pdf_path, images, lambda: deadline.timeout_for(state))
+            except deadline.DeadlineExceeded:
+                return {"degradations": [deadline.note(state, "VisionInspector cut off by the deadline: diagrams not classified")]}
             except Exception as e:
+                digest = None  # transient failure: do not remember it
                 evidences["swarm_visual"] = [Evidence(
                     goal="Architectural Diagram Analysis",
                     found=False,
@@ -344,7 +625,8 @@ def VisionInspector(state: AgentState) -> Dict[str, List[Evidence]]:
             finally:
                 doc_tools.cleanup_pdf_temp_dir(pdf_data.get("temp_dir"))
         else:
-             evidences["swarm_visual"] = [Evidence(
+            doc_tools.cleanup_pdf_temp_dir(pdf_data.get("temp_dir"))
+            evidences["swarm_visual"] = [Evidence(
                 goal="Architectural Diagram Analysis",
                 found=False,
                 location=str(pdf_path),
@@ -360,4 +642,5 @@ def VisionInspector(state: AgentState) -> Dict[str, List[Evidence]]:
             confidence=1.0
         )]
 
-    return evidences
\ No newline at end of file
+    _dedupe_remember("vision", digest, state, evidences)
+    return {"evidences": evidences}
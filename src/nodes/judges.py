@@ -1,14 +1,19 @@
+import hashlib
 import json
 import os
-import time
-from typing import Dict, List, Any
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 # from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, Field
 
+from src import cassette, deadline
+from src.instrumentation import count, llm_config, span
+from src.rubric import state_dimensions
 from src.state import AgentState, JudicialOpinion, Evidence
-
 PROSECUTOR_SYS_PROMPT = """You are the Prosecutor in a Digital Courtroom.
 Core Philosophy: "Trust No One. Assume Vibe Coding."
 Objective: Scrutinize the evidence for gaps, security flaws, and laziness.
@@ -58,30 +63,148 @@ def _format_evidence(dim_id: str, state: AgentState) -> str:
             lines.append(f"  Content snippet: {ev.content[:500]}...")
     return "\n".join(lines)
 
-def _run_judge(state: AgentState, role_name: str, sys_prompt: str) -> Dict[str, List[JudicialOpinion]]:
-    llm = ChatGroq(
+_TEMP_PATH_RE = re.compile(re.escape(tempfile.gettempdir()) + r"/[^/\s]+")
+
+def evidence_fingerprint(dim: Dict, state: AgentState) -> str:
+    """Content hash of everything a judge is shown for ``dim``.
+
+    Covers the rubric dimension itself and the formatted evidence. Temporary
+    clone/extraction directories are masked, so re-auditing identical content
+    from a fresh temp dir hashes the same.
+    """
+    evidence_text = _TEMP_PATH_RE.sub("<tmp>", _format_evidence(dim["id"], state))
+    payload = json.dumps(dim, sort_keys=True) + "\n" + evidence_text
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def rubric_dimensions(state: AgentState) -> List[Dict]:
+    """Dimensions to judge (see :func:`src.rubric.state_dimensions`)."""
+    return state_dimensions(state)
+
+@lru_cache(maxsize=1)
+def _chat_model():
+    # one client per process: keeps the HTTP connection pool warm across audits
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
         model="llama-3.3-70b-versatile",   # Currently active Groq model
         temperature=0.6,
         max_tokens=1000,
+        timeout=deadline.setting("LLM_TIMEOUT"),
         api_key=os.getenv("GROQ_API_KEY")  # reads from .env
-    ).with_structured_output(JudicialOpinion)
-    
-    rubric_dims = state.get("rubric_dimensions", [])
-    if not rubric_dims:
-        # Load fallback if not in state
-        try:
-            with open("rubric.json", "r", encoding="utf-8") as f:
-                rubric_dims = json.load(f).get("dimensions", [])
-        except Exception:
-            pass
-            
-    opinions = []
-    for dim in rubric_dims:
-        dim_id = dim["id"]
-        evidence_text = _format_evidence(dim_id, state)
-        
-        user_msg = f"""
-Criterion: {dim['name']} ({dim_id})
+    )
+
+@lru_cache(maxsize=1)
+def _judge_llm():
+    # the client is only built for a live call, never on a cassette replay
+    return cassette.RecordedLLM("judge", lambda: _chat_model().with_structured_output(JudicialOpinion),
+                                JudicialOpinion.model_validate)
+
+class JudgeBatch(BaseModel):
+    """Structured output of a batched call: one opinion per requested dimension."""
+
+    opinions: List[JudicialOpinion] = Field(default_factory=list)
+
+@lru_cache(maxsize=1)
+def _judge_batch_llm():
+    return cassette.RecordedLLM("judge.batch", lambda: _chat_model().with_structured_output(JudgeBatch),
+                                JudgeBatch.model_validate)
+
+JUDGE_PROMPTS = {
+    "Prosecutor": PROSECUTOR_SYS_PROMPT,
+    "Defense": DEFENSE_SYS_PROMPT,
+    "TechLead": TECHLEAD_SYS_PROMPT,
+}
+
+# Opinions for (judge, evidence_fingerprint) already obtained in this process.
+# Identical evidence (a re-submission, a service re-run) skips the LLM call;
+# fallback opinions produced after errors are never cached.
+_OPINION_CACHE_SIZE = 1024
+_opinion_cache: "OrderedDict[tuple, JudicialOpinion]" = OrderedDict()
+_opinion_cache_lock = threading.Lock()
+
+
+def _cached_opinion(key: tuple) -> Optional[JudicialOpinion]:
+    """A copy of the cached opinion: callers adjust fields in place, and audits must not share them."""
+    if os.getenv("JUDGE_CACHE", "true").strip().lower() not in ("1", "true", "yes"):
+        return None
+    with _opinion_cache_lock:
+        op = _opinion_cache.get(key)
+        if op is not None:
+            _opinion_cache.move_to_end(key)
+    return op.model_copy(deep=True) if op is not None else None
+
+
+def _store_opinion(key: tuple, op: JudicialOpinion) -> None:
+    with _opinion_cache_lock:
+        _opinion_cache[key] = op.model_copy(deep=True)
+        while len(_opinion_cache) > _OPINION_CACHE_SIZE:
+            _opinion_cache.popitem(last=False)
+
+
+def clear_opinion_cache() -> None:
+    with _opinion_cache_lock:
+        _opinion_cache.clear()
+
+
+DETERMINISTIC_PREFIX = "Deterministic score"
+
+
+def deterministic_opinion(state: AgentState, role_name: str, dim: Dict) -> JudicialOpinion:
+    """Evidence-only opinion used when the time budget leaves no room for an LLM call.
+
+    The confidence-weighted share of evidence that was found maps linearly onto
+    1-5. Every judge gives the same score, so no dissent rule fires.
+    """
+    evidences = state.get("evidences") or {}
+    items = evidences.get("general", []) + evidences.get(dim["id"], [])
+    weight = sum(ev.confidence for ev in items)
+    ratio = sum(ev.confidence for ev in items if ev.found) / weight if weight else 0.0
+    found = [ev for ev in items if ev.found]
+    return JudicialOpinion(
+        judge=role_name,  # type: ignore
+        criterion_id=dim["id"],
+        score=1 + round(4 * ratio),
+        argument=(f"{DETERMINISTIC_PREFIX} (time budget exhausted, no LLM call): "
+                  f"{len(found)}/{len(items)} evidence items found, {ratio:.0%} by confidence."),
+        cited_evidence=[ev.goal for ev in found],
+    )
+
+
+def is_deterministic(op: JudicialOpinion) -> bool:
+    return op.argument.startswith(DETERMINISTIC_PREFIX)
+
+
+# arguments of the neutral opinions judge_criterion falls back to after LLM errors
+FALLBACK_PREFIXES = ("Rate limit exceeded after", "Failed to generate opinion")
+
+
+def is_fallback(op: JudicialOpinion) -> bool:
+    return op.argument.startswith(FALLBACK_PREFIXES)
+
+
+def _reused_opinion(state: AgentState, role_name: str, dim: Dict, fingerprint: str) -> Optional[JudicialOpinion]:
+    """Opinion from the previous audit or the in-process cache, if the evidence is unchanged."""
+    dim_id = dim["id"]
+    # Incremental re-audit: reuse opinions for dimensions whose evidence is unchanged.
+    # Fallbacks and budget-forced deterministic scores are asked for again.
+    previous = state.get("previous_audit") or {}
+    if previous.get("dimension_hashes", {}).get(dim_id) == fingerprint:
+        for op in previous.get("opinions", []):
+            if is_fallback(op) or is_deterministic(op):
+                continue
+            if (op.judge, op.criterion_id) == (role_name, dim_id):
+                count("opinions_reused", judge=role_name)
+                return op
+
+    cached = _cached_opinion((role_name, fingerprint))
+    if cached is not None:
+        count("opinions_cached", judge=role_name)
+    return cached
+
+
+def _criterion_block(state: AgentState, dim: Dict) -> str:
+    return f"""
+Criterion: {dim['name']} ({dim['id']})
 Target Artifact: {dim.get('target_artifact', 'unknown')}
 Instruction used by Detectives: {dim.get('forensic_instruction', 'None')}
 
@@ -89,59 +212,168 @@ Success Pattern: {dim.get('success_pattern', 'None')}
 Failure Pattern: {dim.get('failure_pattern', 'None')}
 
 Evidence Collected:
-{evidence_text}
+{_format_evidence(dim['id'], state)}
+"""
+
+
+def judge_criterion(state: AgentState, role_name: str, sys_prompt: str, dim: Dict) -> Tuple[JudicialOpinion, bool]:
+    """One judge's opinion on one rubric dimension.
+
+    Returns ``(opinion, called_llm)``. Opinions are reused from the previous
+    audit or the in-process cache when the dimension's evidence is unchanged;
+    otherwise the LLM is called with up to three attempts (backing off on rate
+    limits) before falling back to a neutral score. Calls and back-off are
+    bounded by the audit's deadline; once it is (nearly) reached the opinion is
+    scored deterministically instead.
+    """
+    dim_id = dim["id"]
+    fingerprint = evidence_fingerprint(dim, state)
+    reused = _reused_opinion(state, role_name, dim, fingerprint)
+    if reused is not None:
+        return reused, False
+    if deadline.judge_mode(state) == "deterministic":
+        return deterministic_opinion(state, role_name, dim), False
+
+    from langchain_core.messages import HumanMessage, SystemMessage
 
+    llm = _judge_llm()
+    user_msg = _criterion_block(state, dim) + f"""
 Submit your JudicialOpinion for this criterion. Ensure your score is between 1 and 5.
 Your 'judge' field MUST be '{role_name}'.
 Your 'criterion_id' field MUST be '{dim_id}'.
 """
-        
-        # Retry with exponential backoff for rate limits
+    messages = [SystemMessage(content=sys_prompt), HumanMessage(content=user_msg)]
+
+    # Retry with exponential backoff for rate limits
+    with span("llm", f"judge.{role_name}", criterion=dim_id) as sp:
         max_retries = 3
         for attempt in range(max_retries):
+            sp["retries"] = attempt
             try:
-                op = llm.invoke([
-                    SystemMessage(content=sys_prompt),
-                    HumanMessage(content=user_msg)
-                ])
+                # the timeout is taken once the slot is held: queueing counts against the budget
+                op = deadline.call_with_timeout(
+                    lambda: llm.invoke(messages, config=llm_config(sp)), lambda: deadline.timeout_for(state),
+                    stage="judge")
                 # Enforce the correct literal name and criterion id
                 op.judge = role_name
                 op.criterion_id = dim_id
-                opinions.append(op)
-                break
+                _store_opinion((role_name, fingerprint), op)
+                return op, True
+            except deadline.DeadlineExceeded:
+                return deterministic_opinion(state, role_name, dim), True
             except Exception as e:
                 err_str = str(e)
                 if "rate_limit" in err_str or "429" in err_str:
                     wait_time = 10 * (attempt + 1)  # 10s, 20s, 30s
                     print(f"  [{role_name}] Rate limited on {dim_id}, waiting {wait_time}s...")
-                    time.sleep(wait_time)
+                    if not deadline.sleep_within(state, wait_time):
+                        return deterministic_opinion(state, role_name, dim), True
                     if attempt == max_retries - 1:
-                        opinions.append(JudicialOpinion(
+                        return JudicialOpinion(
                             judge=role_name, # type: ignore
                             criterion_id=dim_id,
                             score=3,
                             argument=f"Rate limit exceeded after {max_retries} retries: {e}",
                             cited_evidence=[]
-                        ))
+                        ), True
                 else:
                     if attempt == max_retries - 1:
-                        opinions.append(JudicialOpinion(
+                        return JudicialOpinion(
                             judge=role_name, # type: ignore
                             criterion_id=dim_id,
                             score=3,
                             argument=f"Failed to generate opinion: {e}",
                             cited_evidence=[]
-                        ))
-        # Throttle between dimensions to avoid rate limits
-        time.sleep(5)
-                    
-    return {"opinions": opinions}
+                        ), True
+
+def judge_dimensions(state: AgentState, role_name: str, sys_prompt: str, dims: List[Dict]) -> List[JudicialOpinion]:
+    """One judge's opinions on several dimensions from a single LLM call.
+
+    The low-budget variant of :func:`judge_criterion`: reused and cached
+    opinions are taken as usual, the rest are requested together in one
+    attempt. Dimensions the call leaves out, or all of them if it fails or the
+    budget is exhausted, are scored deterministically.
+    """
+    opinions: Dict[str, JudicialOpinion] = {}
+    pending = []
+    for dim in dims:
+        fingerprint = evidence_fingerprint(dim, state)
+        reused = _reused_opinion(state, role_name, dim, fingerprint)
+        if reused is not None:
+            opinions[dim["id"]] = reused
+        else:
+            pending.append((dim, fingerprint))
+
+    if pending and deadline.judge_mode(state) != "deterministic":
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        ids = ", ".join(dim["id"] for dim, _ in pending)
+        user_msg = "".join(_criterion_block(state, dim) for dim, _ in pending) + f"""
+Submit one JudicialOpinion per criterion above ({ids}). Ensure every score is between 1 and 5.
+Every 'judge' field MUST be '{role_name}'.
+"""
+        messages = [SystemMessage(content=sys_prompt), HumanMessage(content=user_msg)]
+        returned: Dict[str, JudicialOpinion] = {}
+        with span("llm", f"judge.{role_name}.batch", criteria=len(pending)) as sp:
+            try:
+                batch = deadline.call_with_timeout(
+                    lambda: _judge_batch_llm().invoke(messages, config=llm_config(sp)),
+                    lambda: deadline.timeout_for(state), stage="judge")
+                returned = {op.criterion_id: op for op in batch.opinions}
+            except Exception as e:
+                print(f"  [{role_name}] Batched judgement failed, scoring from evidence: {e}")
+        for dim, fingerprint in pending:
+            op = returned.get(dim["id"])
+            if op is not None:
+                op.judge = role_name
+                _store_opinion((role_name, fingerprint), op)
+                opinions[dim["id"]] = op
+
+    return [opinions.get(dim["id"]) or deterministic_opinion(state, role_name, dim) for dim in dims]
+
+def fan_out_judges(state: AgentState) -> list:
+    """One ``JudgeCriterion`` task per (judge, dimension) pair (``Send`` objects).
+
+    When the audit's time budget is low, each judge instead gets a single task
+    covering every dimension (see :func:`judge_dimensions`). LangGraph inspects
+    this return annotation, so it must not name ``Send``, which is imported
+    lazily to keep module import cheap.
+    """
+    from langgraph.types import Send
+
+    from src.fingerprint import previous_for
 
-def Prosecutor(state: AgentState) -> Dict[str, List[JudicialOpinion]]:
-    return _run_judge(state, "Prosecutor", PROSECUTOR_SYS_PROMPT)
+    task_state = {
+        "repo_url": state.get("repo_url"),
+        "evidences": state.get("evidences", {}),
+        # an identical earlier audit (dedupe) counts as the previous one
+        "previous_audit": state.get("previous_audit") or previous_for(state),
+        "deadline": state.get("deadline"),
+    }
+    dims = rubric_dimensions(state)
+    if deadline.judge_mode(state) != "full":
+        return [Send("JudgeCriterion", dict(task_state, judge=role_name, dimensions=dims))
+                for role_name in JUDGE_PROMPTS]
+    return [
+        Send("JudgeCriterion", dict(task_state, judge=role_name, dimension=dim))
+        for role_name in JUDGE_PROMPTS
+        for dim in dims
+    ]
 
-def Defense(state: AgentState) -> Dict[str, List[JudicialOpinion]]:
-    return _run_judge(state, "Defense", DEFENSE_SYS_PROMPT)
+def JudgeCriterion(task: Dict) -> Dict[str, List]:
+    """Send target: one judge's opinion(s), reduced into ``opinions``.
 
-def TechLead(state: AgentState) -> Dict[str, List[JudicialOpinion]]:
-    return _run_judge(state, "TechLead", TECHLEAD_SYS_PROMPT)
+    Degraded judging (batched or deterministic) is recorded in ``degradations``.
+    """
+    role_name = task["judge"]
+    if "dimensions" in task:
+        opinions = judge_dimensions(task, role_name, JUDGE_PROMPTS[role_name], task["dimensions"])
+    else:
+        opinions = [judge_criterion(task, role_name, JUDGE_PROMPTS[role_name], task["dimension"])[0]]
+    deterministic = sum(1 for op in opinions if is_deterministic(op))
+    notes = []
+    if "dimensions" in task and deterministic < len(opinions):
+        notes.append("Judges batched: one LLM call per judge covering every dimension")
+    if deterministic:
+        notes.append("Judges scored some dimensions deterministically from evidence, without an LLM call")
+    return {"opinions": opinions, "degradations": notes} if notes else {"opinions": opinions}
@@ -0,0 +1,232 @@
+"""PDF feedback reports rendered from any :class:`AuditReport`.
+
+:class:`PdfTemplate` turns a report into ReportLab flowables, one reusable
+block per part of the report (title, summary, score overview, one block per
+criterion, remediation plan). Subclass it to change the layout of a block.
+The stylesheet and table styles are built once per process and shared by
+every document.
+
+:func:`render_cohort` renders many reports on a process pool. Each worker
+builds the styles once and then renders its share of the cohort.
+
+CLI::
+
+    python -m src.pdf_report audit/batch/*.json --workers 8
+    python -m src.pdf_report audit/batch/*.record.json --out-dir audit/pdf
+
+Inputs are JSON reports (``--format json``) or incremental records; records
+are re-synthesized with the current rubric first. Each PDF is written next to
+its input unless ``--out-dir`` is given.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from src.state import AuditReport, CriterionResult
+
+SCORE_COLOURS = {1: "#c0392b", 2: "#e67e22", 3: "#f1c40f", 4: "#7cb342", 5: "#2e7d32"}
+
+
+@lru_cache(maxsize=1)
+def stylesheet():
+    """ReportLab sample stylesheet plus the project's paragraph styles (built once per process)."""
+    from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="Justify", alignment=TA_JUSTIFY, fontSize=10, spaceAfter=6, leading=14))
+    styles.add(ParagraphStyle(name="BulletItem", alignment=TA_LEFT, fontSize=10, spaceAfter=4, leftIndent=20,
+                              leading=13))
+    styles.add(ParagraphStyle(name="SmallNote", alignment=TA_LEFT, fontSize=9, spaceAfter=4, textColor="#555555",
+                              leading=12))
+    styles.add(ParagraphStyle(name="Dissent", parent=styles["Justify"], leftIndent=10, borderPadding=(4, 6, 4, 6),
+                              backColor="#fff4e5", borderColor="#e67e22", borderWidth=0.5))
+    return styles
+
+
+@lru_cache(maxsize=1)
+def _table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2c3e50")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#bdc3c7")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f4f6f7")]),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ])
+
+
+def _p(text: str, style: str):
+    from reportlab.platypus import Paragraph
+
+    return Paragraph(text, stylesheet()[style])
+
+
+def _score(score: int) -> str:
+    return f"<font color='{SCORE_COLOURS.get(score, '#000000')}'><b>{score} / 5</b></font>"
+
+
+class PdfTemplate:
+    """Flowable blocks for an audit report; override a method to restyle that block."""
+
+    pagesize = None  # letter
+    margins = dict(leftMargin=50, rightMargin=50, topMargin=40, bottomMargin=40)
+
+    def title(self, report: AuditReport) -> list:
+        from reportlab.platypus import Spacer
+
+        heading = f"Audit Report for {escape(report.repo_url)}" if report.criteria else "Failed Audit"
+        return [_p(heading, "Title"), Spacer(1, 6)]
+
+    def summary(self, report: AuditReport) -> list:
+        blocks = [_p("Executive Summary", "Heading1"), _p(escape(report.executive_summary), "Justify")]
+        if report.criteria:
+            blocks.append(_p(f"<b>Overall Score: {report.overall_score:.2f} / 5.00</b>", "Heading3"))
+        if report.degradations:
+            blocks.append(_p("The audit ran against a time budget; these steps were skipped or simplified:",
+                             "SmallNote"))
+            blocks.extend(_p(f"• {escape(d)}", "BulletItem") for d in report.degradations)
+        return blocks
+
+    def overview(self, report: AuditReport) -> list:
+        from reportlab.platypus import Spacer, Table
+
+        rows = [["Criterion", "Score", "Prosecutor", "Defense", "TechLead"]]
+        for cr in report.criteria:
+            by_judge = {op.judge: str(op.score) for op in cr.judge_opinions}
+            rows.append([_p(escape(cr.dimension_name), "BodyText"), str(cr.final_score)]
+                        + [by_judge.get(j, "-") for j in ("Prosecutor", "Defense", "TechLead")])
+        table = Table(rows, colWidths=[220, 55, 65, 55, 60], repeatRows=1)
+        table.setStyle(_table_style())
+        return [_p("Score Overview", "Heading2"), table, Spacer(1, 12)]
+
+    def criterion(self, cr: CriterionResult) -> list:
+        from reportlab.platypus import KeepTogether
+
+        head = [_p(escape(cr.dimension_name), "Heading2"), _p(f"Final Score: {_score(cr.final_score)}", "Normal")]
+        blocks = [KeepTogether(head)]
+        if cr.dissent_summary:
+            blocks.append(_p(f"<b>Dissent / Conflict Notice:</b> {escape(cr.dissent_summary)}", "Dissent"))
+        if cr.judge_opinions:
+            blocks.append(_p("Judge Opinions", "Heading4"))
+            blocks.extend(_p(f"<b>{op.judge} ({op.score}):</b> {escape(op.argument)}", "BulletItem")
+                          for op in cr.judge_opinions)
+        blocks += [_p("Remediation", "Heading4"), _p(escape(cr.remediation), "Justify")]
+        return blocks
+
+    def remediation(self, report: AuditReport) -> list:
+        return [_p("Complete Remediation Plan", "Heading1"), _p(escape(report.remediation_plan), "Justify")]
+
+    def story(self, report: AuditReport) -> list:
+        story = self.title(report) + self.summary(report)
+        if not report.criteria:
+            return story
+        story += self.overview(report)
+        for cr in report.criteria:
+            story += self.criterion(cr)
+        return story + self.remediation(report)
+
+    def footer(self, canvas, doc) -> None:
+        canvas.saveState()
+        canvas.setFont("Helvetica", 8)
+        canvas.setFillColorRGB(0.4, 0.4, 0.4)
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 20, f"Page {doc.page}")
+        canvas.drawString(doc.leftMargin, 20, "Automaton Auditor")
+        canvas.restoreState()
+
+
+DEFAULT_TEMPLATE = PdfTemplate()
+
+
+def render_pdf(report: AuditReport, output_path: str, template: Optional[PdfTemplate] = None) -> str:
+    """Render ``report`` to ``output_path`` (not atomic; see :class:`src.reports.PdfWriter`)."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    template = template or DEFAULT_TEMPLATE
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    doc = SimpleDocTemplate(output_path, pagesize=template.pagesize or letter, title=f"Audit: {report.repo_url}",
+                            **template.margins)
+    doc.build(template.story(report), onFirstPage=template.footer, onLaterPages=template.footer)
+    return output_path
+
+
+def _render_one(job: Tuple[str, str]) -> str:
+    from src.reports import write_report
+
+    report_json, output = job
+    write_report(AuditReport.model_validate_json(report_json), output, [])
+    return output
+
+
+def render_cohort(jobs: Sequence[Tuple[AuditReport, str]], workers: Optional[int] = None) -> List[str]:
+    """Render ``(report, pdf_path)`` pairs across a process pool; returns the paths in order.
+
+    Reports travel to the workers as JSON. ``workers=1`` renders in this process.
+    """
+    payload = [(report.model_dump_json(), output) for report, output in jobs]
+    workers = workers or min(len(payload), os.cpu_count() or 1)
+    if workers <= 1 or len(payload) <= 1:
+        return [_render_one(job) for job in payload]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_one, payload, chunksize=max(1, len(payload) // (workers * 4))))
+
+
+def load_reports(paths: Sequence[str], rubric_path: Optional[str] = None) -> List[AuditReport]:
+    """Reports from JSON report files and/or incremental ``.record.json`` files."""
+    reports: List[Optional[AuditReport]] = [None] * len(paths)
+    record_idx = [i for i, p in enumerate(paths) if p.endswith(".record.json")]
+    for i, path in enumerate(paths):
+        if not path.endswith(".record.json"):
+            reports[i] = AuditReport.model_validate_json(Path(path).read_text(encoding="utf-8"))
+    if record_idx:
+        from src.incremental import load_record
+        from src.rubric import load_rubric
+        from src.synthesis import AuditOpinions, build_reports
+
+        rubric = load_rubric(rubric_path)
+        records = [load_record(paths[i]) for i in record_idx]
+        audits = [AuditOpinions(r.repo_url, r.opinions, r.evidences) for r in records]
+        for i, report in zip(record_idx, build_reports(audits, rubric.dimension_dicts(), rubric.synthesis_parameters)):
+            reports[i] = report
+    return reports
+
+
+def pdf_path_for(path: str, out_dir: Optional[str] = None) -> str:
+    """``x.json`` / ``x.record.json`` → ``x.pdf``, in ``out_dir`` if given."""
+    source = Path(path)
+    name = source.name.removesuffix(".record.json").removesuffix(".json") + ".pdf"
+    return str(Path(out_dir) / name if out_dir else source.with_name(name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render audit reports as PDF feedback")
+    parser.add_argument("inputs", nargs="+", help="JSON reports (<report>.json) or audit records (<report>.record.json)")
+    parser.add_argument("--out-dir", type=str, help="Directory for the PDFs (default: next to each input)")
+    parser.add_argument("--workers", type=int, help="Render processes (default: CPU count)")
+    parser.add_argument("--rubric", type=str, help="Rubric to re-synthesize records with")
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.inputs if not Path(p).is_file()]
+    if missing:
+        parser.error(f"no such file: {', '.join(missing)}")
+    start = time.perf_counter()
+    reports = load_reports(args.inputs, args.rubric)
+    outputs = render_cohort([(r, pdf_path_for(p, args.out_dir)) for r, p in zip(reports, args.inputs)], args.workers)
+    print(f"Rendered {len(outputs)} PDF report(s) in {time.perf_counter() - start:.1f}s")
+    return outputs
+
+
+if __name__ == "__main__":
+    main()
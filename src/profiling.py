@@ -0,0 +1,184 @@
+"""Per-node profiling (``--profile``).
+
+Each graph node runs under its own :class:`cProfile.Profile` while a sampler
+thread records the node's call stack every few milliseconds. Results are
+written per node as ``<node>.pstats`` (for ``pstats``/snakeviz) and
+``<node>.collapsed`` (``frame;frame;frame count`` lines for flamegraph.pl,
+speedscope or inferno), plus ``all.collapsed`` with the node as root frame.
+
+LangGraph runs parallel nodes on worker threads. ``cProfile`` cannot attribute
+those correctly (on Python 3.12+ a single profiler observes every thread and
+only one may be active at a time), so while profiling is enabled node bodies
+are serialized: each profile then contains exactly one node's work. Sampled
+stacks are taken from the thread executing the node and are cut at the node
+function, so LangGraph's executor frames never show up. Use ``--trace`` when
+the question is about concurrency rather than where CPU time goes.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_PROFILE_DIR = "audit/profile"
+DEFAULT_INTERVAL = 0.005
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    try:
+        filename = os.path.relpath(filename)
+    except ValueError:  # pragma: no cover - different drive on Windows
+        pass
+    if filename.startswith(".."):
+        # site-packages and stdlib: keep the tail, it is enough to recognize the module
+        filename = "/".join(Path(filename).parts[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return re.sub(r"[;\n]", "_", f"{name} ({filename}:{code.co_firstlineno})")
+
+
+def collapse_stack(frame, stop) -> Optional[str]:
+    """Root-to-leaf ``;``-joined labels of ``frame`` up to (excluding) ``stop``.
+
+    Returns ``None`` if ``stop`` is not on the stack (the node already returned).
+    """
+    labels: List[str] = []
+    while frame is not None and frame is not stop:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return ";".join(reversed(labels))
+
+
+class NodeProfiler:
+    """Collects a cProfile and sampled stacks per node name."""
+
+    def __init__(self, out_dir: str = DEFAULT_PROFILE_DIR, interval: float = DEFAULT_INTERVAL) -> None:
+        self.out_dir = Path(out_dir)
+        self.interval = interval
+        self.enabled = False
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.samples: Dict[str, Counter] = defaultdict(Counter)
+        self.calls: Counter = Counter()
+        self._run_lock = threading.Lock()
+        self._active: Dict[int, tuple] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.enabled = True
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self.enabled = False
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record one stack for every thread currently inside a node."""
+        frames = sys._current_frames()
+        for thread_id, (name, stop) in list(self._active.items()):
+            frame = frames.get(thread_id)
+            stack = collapse_stack(frame, stop) if frame is not None else None
+            if stack:
+                self.samples[name][stack] += 1
+
+    def run(self, name: str, fn: Callable, *args, **kwargs):
+        with self._run_lock:
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+            self.calls[name] += 1
+            self._active[threading.get_ident()] = (name, sys._getframe())
+            profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._active.pop(threading.get_ident(), None)
+
+    def write(self) -> List[Path]:
+        """Write ``.pstats`` and ``.collapsed`` files; returns the paths written."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+        combined: List[str] = []
+        for name in sorted(self.profiles):
+            safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+            pstats_path = self.out_dir / f"{safe}.pstats"
+            self.profiles[name].dump_stats(str(pstats_path))
+            written.append(pstats_path)
+
+            lines = [f"{stack} {n}" for stack, n in sorted(self.samples[name].items())]
+            collapsed_path = self.out_dir / f"{safe}.collapsed"
+            collapsed_path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+            written.append(collapsed_path)
+            combined.extend(f"{safe};{line}" for line in lines)
+
+        all_path = self.out_dir / "all.collapsed"
+        all_path.write_text("\n".join(combined) + ("\n" if combined else ""), encoding="utf-8")
+        written.append(all_path)
+        return written
+
+    def summary(self, top: int = 5) -> str:
+        """Top functions by cumulative time for each node."""
+        parts = []
+        for name in sorted(self.profiles):
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiles[name], stream=stream)
+            if not stats.stats:
+                continue
+            stats.sort_stats("cumulative").print_stats(top)
+            parts.append(
+                f"== {name} ({self.calls[name]} run(s), {stats.total_tt:.2f}s) ==\n"
+                + stream.getvalue().split("\n", 1)[-1].strip()
+            )
+        return "\n\n".join(parts)
+
+
+PROFILER: Optional[NodeProfiler] = None
+
+
+def enable(out_dir: str = DEFAULT_PROFILE_DIR, interval: float = DEFAULT_INTERVAL) -> NodeProfiler:
+    """Start profiling every node wrapped with :func:`profile_node`."""
+    global PROFILER
+    disable()
+    PROFILER = NodeProfiler(out_dir, interval)
+    PROFILER.start()
+    return PROFILER
+
+
+def disable() -> Optional[NodeProfiler]:
+    """Stop profiling and return the finished profiler (if any) for writing."""
+    global PROFILER
+    profiler, PROFILER = PROFILER, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def profile_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node so it runs under the active profiler (no-op otherwise)."""
+
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        profiler = PROFILER
+        if profiler is None or not profiler.enabled:
+            return fn(state, *args, **kwargs)
+        return profiler.run(name, fn, state, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,227 @@
+"""Report writers: Markdown, JSON, HTML and PDF renderings of an :class:`AuditReport`.
+
+Each :class:`ReportWriter` yields its output criterion by criterion, and
+:func:`write_report` streams the chunks into a temporary file next to the
+target, then renames it into place. A reader never sees a half-written
+report, and concurrent audits writing to different outputs never share a
+temporary file.
+
+The format of ``output_path`` follows its suffix (``.md``, ``.json``,
+``.html``, ``.pdf``; anything else is Markdown). Extra formats are written next
+to it with their own suffix, e.g. ``audit/report.md`` + ``json`` also writes
+``audit/report.json``. Extra formats come from ``--format``, ``REPORT_FORMATS``
+(comma-separated) or :func:`configure`. Register further writers with
+:func:`register_writer`.
+
+A report without criteria is the output of ``error_handler`` and is rendered as
+a failed audit.
+"""
+
+import html
+import json
+import os
+import secrets
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.state import AuditReport, CriterionResult
+
+
+class ReportWriter:
+    """Renders an :class:`AuditReport` as a stream of text chunks."""
+
+    format: str = ""
+    suffix: str = ""
+
+    def render(self, report: AuditReport) -> Iterator[str]:
+        raise NotImplementedError
+
+    def write(self, report: AuditReport, path: str) -> None:
+        atomic_write(path, self.render(report))
+
+
+class MarkdownWriter(ReportWriter):
+    format, suffix = "md", ".md"
+
+    def render(self, report: AuditReport) -> Iterator[str]:
+        if not report.criteria:
+            yield "# Failed Audit\n\n" + report.executive_summary
+            return
+        yield f"# Audit Report for {report.repo_url}\n"
+        yield "\n## Executive Summary\n" + report.executive_summary
+        yield f"\n\n**Overall Score: {report.overall_score:.2f} / 5.00**\n"
+        if report.degradations:
+            yield "\n## Degraded Mode\nThe audit ran against a time budget; these steps were skipped or simplified:"
+            yield "".join(f"\n- {d}" for d in report.degradations) + "\n"
+        yield "\n## Criterion Breakdown"
+        for cr in report.criteria:
+            yield self._criterion(cr)
+        yield "\n## Complete Remediation Plan\n" + report.remediation_plan
+
+    @staticmethod
+    def _criterion(cr: CriterionResult) -> str:
+        md = [f"\n### {cr.dimension_name}", f"**Final Score:** {cr.final_score} / 5"]
+        if cr.dissent_summary:
+            md.append("\n> **Dissent / Conflict Notice:**")
+            md.append(f"> {cr.dissent_summary}\n")
+        md.append("#### Judge Opinions:")
+        md.extend(f"- **{op.judge} (Score: {op.score}):** {op.argument}" for op in cr.judge_opinions)
+        md.append("\n#### Remediation:")
+        md.append(cr.remediation)
+        md.append("\n---\n")
+        return "\n".join(md)
+
+
+class JsonWriter(ReportWriter):
+    """The report's ``model_dump`` as JSON; criteria are serialized one at a time."""
+
+    format, suffix = "json", ".json"
+
+    def render(self, report: AuditReport) -> Iterator[str]:
+        head = json.dumps(report.model_dump(mode="json", exclude={"criteria"}), ensure_ascii=False)
+        yield head[:-1] + (', "criteria": [' if head != "{}" else '{"criteria": [')
+        for i, cr in enumerate(report.criteria):
+            yield ("," if i else "") + cr.model_dump_json()
+        yield "]}\n"
+
+
+class HtmlWriter(ReportWriter):
+    """A self-contained HTML page."""
+
+    format, suffix = "html", ".html"
+
+    _STYLE = ("body{font-family:system-ui,sans-serif;max-width:60rem;margin:2rem auto;padding:0 1rem}"
+              ".score{font-weight:bold}.dissent{border-left:4px solid #c60;padding-left:1rem;color:#630}")
+
+    def render(self, report: AuditReport) -> Iterator[str]:
+        e = html.escape
+        title = f"Audit Report for {report.repo_url}" if report.criteria else "Failed Audit"
+        yield (f"<!DOCTYPE html>\n<html lang=\"en\">\n<head><meta charset=\"utf-8\"><title>{e(title)}</title>"
+               f"<style>{self._STYLE}</style></head>\n<body>\n<h1>{e(title)}</h1>\n")
+        yield f"<h2>Executive Summary</h2>\n<p>{e(report.executive_summary)}</p>\n"
+        if not report.criteria:
+            yield "</body>\n</html>\n"
+            return
+        yield f"<p class=\"score\">Overall Score: {report.overall_score:.2f} / 5.00</p>\n"
+        if report.degradations:
+            items = "".join(f"<li>{e(d)}</li>" for d in report.degradations)
+            yield ("<h2>Degraded Mode</h2>\n<p>The audit ran against a time budget; these steps were skipped "
+                   f"or simplified:</p>\n<ul>{items}</ul>\n")
+        yield "<h2>Criterion Breakdown</h2>\n"
+        for cr in report.criteria:
+            parts = [f"<section id=\"{e(cr.dimension_id)}\">\n<h3>{e(cr.dimension_name)}</h3>\n"
+                     f"<p class=\"score\">Final Score: {cr.final_score} / 5</p>\n"]
+            if cr.dissent_summary:
+                parts.append(f"<p class=\"dissent\"><strong>Dissent / Conflict Notice:</strong> "
+                             f"{e(cr.dissent_summary)}</p>\n")
+            parts.append("<h4>Judge Opinions</h4>\n<ul>")
+            parts.extend(f"<li><strong>{e(op.judge)} (Score: {op.score}):</strong> {e(op.argument)}</li>"
+                         for op in cr.judge_opinions)
+            parts.append(f"</ul>\n<h4>Remediation</h4>\n<p>{e(cr.remediation)}</p>\n</section>\n")
+            yield "".join(parts)
+        yield f"<h2>Complete Remediation Plan</h2>\n<p>{e(report.remediation_plan)}</p>\n</body>\n</html>\n"
+
+
+class PdfWriter(ReportWriter):
+    """PDF via ReportLab (:mod:`src.pdf_report`); binary, so it overrides :meth:`write`."""
+
+    format, suffix = "pdf", ".pdf"
+
+    def write(self, report: AuditReport, path: str) -> None:
+        from src.pdf_report import render_pdf
+
+        with atomic_path(path) as tmp:
+            render_pdf(report, tmp)
+
+
+WRITERS: Dict[str, ReportWriter] = {}
+
+
+def register_writer(writer: ReportWriter) -> None:
+    """Make ``writer`` available under ``writer.format`` (and its suffix)."""
+    WRITERS[writer.format] = writer
+
+
+for _writer in (MarkdownWriter(), JsonWriter(), HtmlWriter(), PdfWriter()):
+    register_writer(_writer)
+
+
+def writer_for(fmt: str) -> ReportWriter:
+    try:
+        return WRITERS[fmt.strip().lower().lstrip(".")]
+    except KeyError:
+        raise ValueError(f"unknown report format {fmt!r} (known: {', '.join(WRITERS)})") from None
+
+
+def _format_of(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".htm":
+        suffix = ".html"
+    return next((w.format for w in WRITERS.values() if w.suffix == suffix), MarkdownWriter.format)
+
+
+_configured: Optional[List[str]] = None
+
+
+def configure(formats: Optional[Sequence[str]]) -> None:
+    """Extra formats written by every audit of this process (``None``: ``REPORT_FORMATS``)."""
+    global _configured
+    _configured = None if formats is None else resolve_formats(formats)
+
+
+def resolve_formats(formats: Optional[Iterable[str]] = None) -> List[str]:
+    """Validated extra formats: ``formats``, else :func:`configure`'s, else ``REPORT_FORMATS``.
+
+    Accepts a list and comma-separated entries.
+    """
+    if formats is None:
+        if _configured is not None:
+            return list(_configured)
+        formats = [os.getenv("REPORT_FORMATS") or ""]
+    names = [f.strip() for item in formats for f in item.split(",") if f.strip()]
+    return list(dict.fromkeys(writer_for(name).format for name in names))
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """Temporary sibling of ``path`` to write to; renamed onto ``path`` if the block succeeds."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        tmp = str(target.parent / f".{target.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            # 0666 minus the umask, like open(); mkstemp's 0600 would hide reports from the group
+            fd = os.open(tmp, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        break
+    try:
+        yield tmp
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write(path: str, chunks: Iterable[str]) -> None:
+    """Stream ``chunks`` into a temporary sibling of ``path`` and rename it into place."""
+    with atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def write_report(report: AuditReport, output_path: str, formats: Optional[Iterable[str]] = None) -> List[str]:
+    """Write ``report`` to ``output_path`` plus any extra formats; returns the paths written."""
+    primary = _format_of(output_path)
+    written = []
+    for fmt in dict.fromkeys([primary] + resolve_formats(formats)):
+        writer = WRITERS[fmt]
+        path = output_path if fmt == primary else str(Path(output_path).with_suffix(writer.suffix))
+        writer.write(report, path)
+        written.append(path)
+    return written
@@ -0,0 +1,527 @@
+"""Indexed store of audit results for querying and peer comparison.
+
+Every finished audit can be written to a local SQLite database: the
+:class:`AuditReport` (one ``runs`` row), its :class:`CriterionResult` rows,
+every :class:`JudicialOpinion` and every :class:`Evidence` the detectives
+collected. Tables are indexed on repository, commit, dimension, judge and run
+time, so cohort statistics are SQL queries instead of a walk over thousands of
+Markdown reports.
+
+The store is opt-in: pass ``--results-db`` to the CLI or the service, or set
+``RESULTS_DB``; :func:`save_result` is a no-op otherwise. Cohort queries count
+only judged runs (``status = 'ok'``) and, unless ``latest=False``, only the
+latest run of each repository, so re-audits do not weigh a submission twice.
+
+CLI::
+
+    python -m src.results --db audit/results.sqlite runs --repo https://github.com/u/r
+    python -m src.results stats [--dimension graph_orchestration]
+    python -m src.results rank https://github.com/u/r
+    python -m src.results bias
+    python -m src.results dist
+    python -m src.results import audit/batch/*.record.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Literal, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DB = "audit/results.sqlite"
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    repo_url          TEXT NOT NULL,
+    commit_sha        TEXT,
+    output            TEXT,
+    run_at            REAL NOT NULL,
+    status            TEXT NOT NULL,
+    overall_score     REAL NOT NULL,
+    executive_summary TEXT NOT NULL,
+    remediation_plan  TEXT NOT NULL,
+    degradations      TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS runs_repo ON runs (repo_url, run_at);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs (commit_sha);
+CREATE INDEX IF NOT EXISTS runs_run_at ON runs (run_at);
+
+CREATE TABLE IF NOT EXISTS criteria (
+    run_id          INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position        INTEGER NOT NULL,
+    dimension_id    TEXT NOT NULL,
+    dimension_name  TEXT NOT NULL,
+    final_score     INTEGER NOT NULL,
+    dissent_summary TEXT,
+    remediation     TEXT NOT NULL,
+    PRIMARY KEY (run_id, dimension_id)
+);
+CREATE INDEX IF NOT EXISTS criteria_dimension ON criteria (dimension_id, final_score);
+
+CREATE TABLE IF NOT EXISTS opinions (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id         INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    dimension_id   TEXT NOT NULL,
+    judge          TEXT NOT NULL,
+    score          INTEGER NOT NULL,
+    argument       TEXT NOT NULL,
+    cited_evidence TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS opinions_run ON opinions (run_id, dimension_id);
+CREATE INDEX IF NOT EXISTS opinions_judge ON opinions (judge, dimension_id);
+
+CREATE TABLE IF NOT EXISTS evidences (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id       INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    dimension_id TEXT NOT NULL,
+    goal         TEXT NOT NULL,
+    found        INTEGER NOT NULL,
+    content      TEXT,
+    location     TEXT NOT NULL,
+    rationale    TEXT NOT NULL,
+    confidence   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evidences_run ON evidences (run_id, dimension_id);
+"""
+
+# judged runs, optionally only the newest one per repository
+_COHORT = """
+WITH cohort AS (
+    SELECT id, repo_url, overall_score FROM (
+        SELECT id, repo_url, overall_score,
+               ROW_NUMBER() OVER (PARTITION BY repo_url ORDER BY run_at DESC, id DESC) AS newest
+        FROM runs WHERE status = 'ok' AND run_at >= ? AND run_at < ?
+    ) WHERE newest = 1 OR ?
+)
+"""
+
+
+class StoredRun(BaseModel):
+    """A row of the ``runs`` table."""
+
+    id: int
+    repo_url: str
+    commit_sha: Optional[str] = None
+    output: Optional[str] = None
+    run_at: float
+    status: Literal["ok", "failed"]
+    overall_score: float
+
+
+class ScoreStats(BaseModel):
+    """Distribution of one score (overall or one dimension) across a cohort."""
+
+    dimension: Optional[str] = None  # None = overall score
+    count: int
+    mean: Optional[float] = None
+    stdev: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    percentiles: Dict[int, float] = {}
+
+
+class JudgeBias(BaseModel):
+    """How a judge's scores compare to the Chief Justice's final scores."""
+
+    judge: str
+    dimension: Optional[str] = None  # None = all dimensions
+    opinions: int
+    mean_score: float
+    mean_delta: float  # mean of (judge score - final score); > 0 = more lenient than the verdict
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """``q``-th percentile (0-100) with linear interpolation, as numpy's default."""
+    if not sorted_values:
+        raise ValueError("percentile of an empty sequence")
+    pos = (len(sorted_values) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def score_stats(values: Sequence[float], dimension: Optional[str] = None) -> ScoreStats:
+    values = sorted(values)
+    if not values:
+        return ScoreStats(dimension=dimension, count=0)
+    mean = sum(values) / len(values)
+    return ScoreStats(
+        dimension=dimension,
+        count=len(values),
+        mean=mean,
+        stdev=math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)),
+        min=values[0],
+        max=values[-1],
+        percentiles={q: percentile(values, q) for q in PERCENTILES},
+    )
+
+
+class ResultsStore:
+    """SQLite results store. Opens a short-lived connection per operation (like
+    :class:`src.jobqueue.JobQueue`), so one instance may be shared by threads."""
+
+    def __init__(self, path: str = DEFAULT_RESULTS_DB, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # -- writing -----------------------------------------------------------
+
+    def add(self, report: AuditReport, commit: Optional[str] = None,
+            evidences: Optional[Mapping[str, List[Evidence]]] = None,
+            output: Optional[str] = None, run_at: Optional[float] = None) -> int:
+        """Store one audit and return its run id."""
+        with self._tx() as conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (repo_url, commit_sha, output, run_at, status, overall_score, "
+                "executive_summary, remediation_plan, degradations) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (report.repo_url, commit, output, self.clock() if run_at is None else run_at,
+                 "ok" if report.criteria else "failed", report.overall_score, report.executive_summary,
+                 report.remediation_plan, json.dumps(report.degradations)),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO criteria (run_id, position, dimension_id, dimension_name, final_score, "
+                "dissent_summary, remediation) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, i, cr.dimension_id, cr.dimension_name, cr.final_score, cr.dissent_summary, cr.remediation)
+                 for i, cr in enumerate(report.criteria)],
+            )
+            conn.executemany(
+                "INSERT INTO opinions (run_id, dimension_id, judge, score, argument, cited_evidence) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, cr.dimension_id, op.judge, op.score, op.argument, json.dumps(op.cited_evidence))
+                 for cr in report.criteria for op in cr.judge_opinions],
+            )
+            conn.executemany(
+                "INSERT INTO evidences (run_id, dimension_id, goal, found, content, location, rationale, "
+                "confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, dim, e.goal, e.found, e.content, e.location, e.rationale, e.confidence)
+                 for dim, evs in (evidences or {}).items() for e in evs],
+            )
+        return run_id
+
+    def add_state(self, final_state: Optional[Mapping], output: Optional[str] = None) -> Optional[int]:
+        """Store a finished graph state; ``None`` if it has no report."""
+        report = (final_state or {}).get("final_report")
+        if report is None:
+            return None
+        return self.add(report, commit=final_state.get("commit"), evidences=final_state.get("evidences"),
+                        output=output or final_state.get("output_path"))
+
+    # -- single runs -------------------------------------------------------
+
+    def runs(self, repo: Optional[str] = None, commit: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None, limit: Optional[int] = None) -> List[StoredRun]:
+        """Runs matching every given filter, newest first."""
+        where, params = [], []
+        for clause, value in (("repo_url = ?", repo), ("commit_sha = ?", commit),
+                              ("run_at >= ?", since), ("run_at < ?", until)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = "SELECT id, repo_url, commit_sha, output, run_at, status, overall_score FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY run_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [StoredRun(**dict(row)) for row in self._query(sql, params)]
+
+    def report(self, run_id: int) -> Optional[AuditReport]:
+        """Rebuild the stored :class:`AuditReport` of a run."""
+        run = self._query("SELECT * FROM runs WHERE id = ?", (run_id,))
+        if not run:
+            return None
+        opinions: Dict[str, List[JudicialOpinion]] = {}
+        for row in self._query("SELECT * FROM opinions WHERE run_id = ? ORDER BY id", (run_id,)):
+            opinions.setdefault(row["dimension_id"], []).append(JudicialOpinion(
+                judge=row["judge"], criterion_id=row["dimension_id"], score=row["score"],
+                argument=row["argument"], cited_evidence=json.loads(row["cited_evidence"]),
+            ))
+        criteria = [
+            CriterionResult(
+                dimension_id=row["dimension_id"], dimension_name=row["dimension_name"],
+                final_score=row["final_score"], judge_opinions=opinions.get(row["dimension_id"], []),
+                dissent_summary=row["dissent_summary"], remediation=row["remediation"],
+            )
+            for row in self._query("SELECT * FROM criteria WHERE run_id = ? ORDER BY position", (run_id,))
+        ]
+        run = run[0]
+        return AuditReport(
+            repo_url=run["repo_url"], executive_summary=run["executive_summary"],
+            overall_score=run["overall_score"], criteria=criteria, remediation_plan=run["remediation_plan"],
+            degradations=json.loads(run["degradations"]),
+        )
+
+    def evidences(self, run_id: int) -> Dict[str, List[Evidence]]:
+        evidences: Dict[str, List[Evidence]] = {}
+        for row in self._query("SELECT * FROM evidences WHERE run_id = ? ORDER BY id", (run_id,)):
+            evidences.setdefault(row["dimension_id"], []).append(Evidence(
+                goal=row["goal"], found=bool(row["found"]), content=row["content"], location=row["location"],
+                rationale=row["rationale"], confidence=row["confidence"],
+            ))
+        return evidences
+
+    # -- cohort queries ----------------------------------------------------
+
+    def _cohort_params(self, since: Optional[float], until: Optional[float], latest: bool) -> Tuple:
+        return (since if since is not None else -math.inf, until if until is not None else math.inf, not latest)
+
+    def _scores(self, dimension: Optional[str], since: Optional[float], until: Optional[float],
+                latest: bool) -> List[Tuple[str, float]]:
+        """(repo_url, score) over the cohort; the overall score, or that of ``dimension``."""
+        params = self._cohort_params(since, until, latest)
+        if dimension is None:
+            rows = self._query(_COHORT + "SELECT repo_url, overall_score AS score FROM cohort", params)
+        else:
+            rows = self._query(
+                _COHORT + "SELECT repo_url, final_score AS score FROM cohort "
+                "JOIN criteria ON criteria.run_id = cohort.id WHERE dimension_id = ?",
+                params + (dimension,),
+            )
+        return [(row["repo_url"], row["score"]) for row in rows]
+
+    def stats(self, dimension: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, latest: bool = True) -> ScoreStats:
+        """Mean, spread and percentiles of the overall score or of one dimension."""
+        return score_stats([score for _, score in self._scores(dimension, since, until, latest)], dimension)
+
+    def dimension_stats(self, since: Optional[float] = None, until: Optional[float] = None,
+                        latest: bool = True) -> List[ScoreStats]:
+        """:meth:`stats` for every stored dimension, in first-seen order."""
+        params = self._cohort_params(since, until, latest)
+        by_dim: Dict[str, List[float]] = {}
+        for row in self._query(
+            _COHORT + "SELECT dimension_id, final_score FROM cohort JOIN criteria ON criteria.run_id = cohort.id "
+            "ORDER BY cohort.id, position", params,
+        ):
+            by_dim.setdefault(row["dimension_id"], []).append(row["final_score"])
+        return [score_stats(values, dim) for dim, values in by_dim.items()]
+
+    def rank(self, repo: str, dimension: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None) -> Optional[float]:
+        """Percentile rank (0-100) of ``repo``'s latest score among its peers' latest scores.
+
+        Ties count half, so a cohort where everyone scores the same ranks everyone at 50.
+        """
+        scores = dict(self._scores(dimension, since, until, latest=True))
+        if repo not in scores:
+            return None
+        mine = scores[repo]
+        below = sum(1 for s in scores.values() if s < mine)
+        equal = sum(1 for s in scores.values() if s == mine)
+        return 100.0 * (below + 0.5 * equal) / len(scores)
+
+    def judge_bias(self, by_dimension: bool = False, since: Optional[float] = None,
+                   until: Optional[float] = None, latest: bool = True) -> List[JudgeBias]:
+        """Each judge's mean score and mean deviation from the final verdict."""
+        group = "opinions.judge, opinions.dimension_id" if by_dimension else "opinions.judge"
+        rows = self._query(
+            _COHORT + f"SELECT opinions.judge AS judge, {'opinions.dimension_id' if by_dimension else 'NULL'} "
+            "AS dimension, COUNT(*) AS n, AVG(opinions.score) AS mean_score, "
+            "AVG(opinions.score - criteria.final_score) AS mean_delta FROM cohort "
+            "JOIN opinions ON opinions.run_id = cohort.id "
+            "JOIN criteria ON criteria.run_id = opinions.run_id AND criteria.dimension_id = opinions.dimension_id "
+            f"GROUP BY {group} ORDER BY {group}",
+            self._cohort_params(since, until, latest),
+        )
+        return [JudgeBias(judge=row["judge"], dimension=row["dimension"], opinions=row["n"],
+                          mean_score=row["mean_score"], mean_delta=row["mean_delta"]) for row in rows]
+
+    def distribution(self, since: Optional[float] = None, until: Optional[float] = None,
+                     latest: bool = True) -> Dict[str, Dict[int, int]]:
+        """dimension_id -> {final score 1..5 -> number of runs}."""
+        dist: Dict[str, Dict[int, int]] = {}
+        for row in self._query(
+            _COHORT + "SELECT dimension_id, final_score, COUNT(*) AS n FROM cohort "
+            "JOIN criteria ON criteria.run_id = cohort.id GROUP BY dimension_id, final_score",
+            self._cohort_params(since, until, latest),
+        ):
+            dist.setdefault(row["dimension_id"], {s: 0 for s in range(1, 6)})[row["final_score"]] = row["n"]
+        return dist
+
+
+_configured: Optional[str] = None
+_stores: Dict[str, ResultsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def configure(path: Optional[str]) -> None:
+    """Store results of this process in ``path`` (``None`` falls back to ``RESULTS_DB``)."""
+    global _configured
+    _configured = path
+
+
+def active_store() -> Optional[ResultsStore]:
+    """The configured store, or ``None`` when results are not being stored."""
+    path = _configured or os.getenv("RESULTS_DB")
+    if not path:
+        return None
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResultsStore(path)
+        return _stores[path]
+
+
+def save_result(final_state: Optional[Mapping], output: Optional[str] = None) -> Optional[int]:
+    """Store a finished audit in the active store, if any; returns the run id.
+
+    A store that cannot be opened or written is logged and skipped: the audit
+    itself succeeded, and callers keep its result.
+    """
+    try:
+        store = active_store()
+        return store.add_state(final_state, output) if store is not None else None
+    except Exception as exc:
+        logger.warning(f"Could not store the audit of {(final_state or {}).get('repo_url')} in the results database: {exc}")
+        return None
+
+
+def import_records(store: ResultsStore, paths: Sequence[str], rubric_path: Optional[str] = None) -> List[int]:
+    """Store audits from incremental records, re-synthesized with the current rubric.
+
+    Records carry no commit and no run time; the record file's mtime is used.
+    """
+    from src.incremental import load_record
+    from src.rubric import load_rubric
+    from src.synthesis import AuditOpinions, build_reports, report_path_for
+
+    rubric = load_rubric(rubric_path)
+    records = [(path, load_record(path)) for path in paths]
+    records = [(path, r) for path, r in records if r is not None]
+    reports = build_reports([AuditOpinions(r.repo_url, r.opinions, r.evidences) for _, r in records],
+                            rubric.dimension_dicts(), rubric.synthesis_parameters)
+    return [
+        store.add(report, evidences=record.evidences, output=report_path_for(path), run_at=os.path.getmtime(path))
+        for (path, record), report in zip(records, reports)
+    ]
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def format_stats(stats: List[ScoreStats]) -> str:
+    head = " | ".join(f"p{q}" for q in PERCENTILES)
+    lines = [f"| Dimension | N | Mean | Stdev | Min | {head} | Max |",
+             "|-----------|---|------|-------|-----|" + "-----|" * len(PERCENTILES) + "-----|"]
+    for s in stats:
+        pcts = " | ".join(_fmt(s.percentiles.get(q)) for q in PERCENTILES)
+        lines.append(f"| {s.dimension or 'overall'} | {s.count} | {_fmt(s.mean)} | {_fmt(s.stdev)} | "
+                     f"{_fmt(s.min)} | {pcts} | {_fmt(s.max)} |")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the audit results store")
+    parser.add_argument("--db", default=None, help=f"Results database (default: RESULTS_DB or {DEFAULT_RESULTS_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    runs = sub.add_parser("runs", help="List stored runs, newest first")
+    runs.add_argument("--repo")
+    runs.add_argument("--commit")
+    runs.add_argument("--limit", type=int, default=50)
+
+    cohort_parsers = []
+    stats = sub.add_parser("stats", help="Score statistics and percentiles, overall and per dimension")
+    stats.add_argument("--dimension", help="Only this dimension")
+    rank = sub.add_parser("rank", help="Percentile rank of a repository among its peers")
+    rank.add_argument("repo")
+    rank.add_argument("--dimension", help="Rank on this dimension instead of the overall score")
+    bias = sub.add_parser("bias", help="Judge scores compared with the final verdicts")
+    bias.add_argument("--by-dimension", action="store_true")
+    dist = sub.add_parser("dist", help="Per-dimension final score distribution")
+    cohort_parsers += [stats, rank, bias, dist]
+    for p in cohort_parsers:
+        p.add_argument("--since", type=float, help="Only runs at or after this epoch time")
+        p.add_argument("--until", type=float, help="Only runs before this epoch time")
+    for p in (stats, bias, dist):
+        p.add_argument("--all-runs", action="store_true", help="Count every run, not just each repo's latest")
+
+    imp = sub.add_parser("import", help="Store audits from incremental .record.json files")
+    imp.add_argument("records", nargs="+")
+    imp.add_argument("--rubric", help="Rubric to re-synthesize the records with")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db or os.getenv("RESULTS_DB") or DEFAULT_RESULTS_DB)
+    if args.command == "runs":
+        lines = ["| Run | Repository | Commit | Run at | Status | Score |",
+                 "|-----|------------|--------|--------|--------|-------|"]
+        for r in store.runs(repo=args.repo, commit=args.commit, limit=args.limit):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r.run_at))
+            lines.append(f"| {r.id} | {r.repo_url} | {(r.commit_sha or '-')[:12]} | {when} | {r.status} | "
+                         f"{r.overall_score:.2f} |")
+        print("\n".join(lines))
+    elif args.command == "stats":
+        window = dict(since=args.since, until=args.until, latest=not args.all_runs)
+        if args.dimension:
+            print(format_stats([store.stats(args.dimension, **window)]))
+        else:
+            print(format_stats([store.stats(**window)] + store.dimension_stats(**window)))
+    elif args.command == "rank":
+        pct = store.rank(args.repo, args.dimension, since=args.since, until=args.until)
+        if pct is None:
+            parser.error(f"no judged run of {args.repo} in the store")
+        print(f"{args.repo}: percentile rank {pct:.1f} ({args.dimension or 'overall score'})")
+    elif args.command == "bias":
+        rows = store.judge_bias(args.by_dimension, since=args.since, until=args.until, latest=not args.all_runs)
+        lines = ["| Judge | Dimension | Opinions | Mean score | Mean delta vs verdict |",
+                 "|-------|-----------|----------|------------|-----------------------|"]
+        lines += [f"| {b.judge} | {b.dimension or 'all'} | {b.opinions} | {b.mean_score:.2f} | {b.mean_delta:+.2f} |"
+                  for b in rows]
+        print("\n".join(lines))
+    elif args.command == "dist":
+        lines = ["| Dimension | 1 | 2 | 3 | 4 | 5 |", "|-----------|---|---|---|---|---|"]
+        for dim, counts in store.distribution(since=args.since, until=args.until, latest=not args.all_runs).items():
+            lines.append(f"| {dim} | " + " | ".join(str(counts[s]) for s in range(1, 6)) + " |")
+        print("\n".join(lines))
+    elif args.command == "import":
+        ids = import_records(store, args.records, args.rubric)
+        print(f"Imported {len(ids)} audit(s) into {store.path}")
+    return store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""The rubric as a validated, precompiled object shared by every node.
+
+:func:`load_rubric` parses ``rubric.json`` once per (path, mtime) and returns a
+:class:`Rubric`: dimensions are validated with Pydantic, indexed by id and by
+target artifact, and carry their keyword and path matchers already compiled.
+The synthesis parameters the Chief Justice applies (score caps, thresholds,
+which dimensions a rule covers) live next to the prose ``synthesis_rules``.
+
+:func:`src.graph.initial_state` puts the rubric into ``state["rubric"]``, so
+nodes look dimensions up in memory instead of re-reading JSON from whatever the
+working directory happens to be. Without ``RUBRIC_PATH`` the file is taken
+from the working directory if present, else from the project root.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError, field_validator
+
+DEFAULT_RUBRIC = "rubric.json"
+_PROJECT_RUBRIC = Path(__file__).resolve().parents[1] / DEFAULT_RUBRIC
+
+
+class RubricError(RuntimeError):
+    """Raised when a rubric file cannot be read or does not validate."""
+
+
+class Dimension(BaseModel):
+    """One rubric criterion plus the matchers detectives use for it."""
+
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    id: str
+    name: str
+    target_artifact: str = "unknown"
+    forensic_instruction: Optional[str] = None
+    success_pattern: Optional[str] = None
+    failure_pattern: Optional[str] = None
+    keywords: List[str] = Field(default_factory=list, description="Terms whose presence counts as evidence")
+    min_keywords: int = Field(1, ge=0, description="Keywords that must be present for the evidence to count as found")
+    path_pattern: Optional[str] = Field(None, description="Regex for file paths cited in the artifact")
+
+    _keyword_re: Optional[re.Pattern] = PrivateAttr(None)
+    _path_re: Optional[re.Pattern] = PrivateAttr(None)
+    _as_dict: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @field_validator("path_pattern")
+    @classmethod
+    def _compiles(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"invalid path_pattern {value!r}: {e}") from e
+        return value
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.keywords:
+            alternatives = sorted(self.keywords, key=len, reverse=True)
+            self._keyword_re = re.compile("|".join(re.escape(k) for k in alternatives), re.IGNORECASE)
+        if self.path_pattern:
+            self._path_re = re.compile(self.path_pattern)
+        # judges hash this dict (incremental mode): leave out defaults so it matches
+        # the file's entry and survives a checkpoint round trip unchanged
+        self._as_dict = self.model_dump(exclude_defaults=True)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._as_dict)
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Keywords occurring in ``text`` (case-insensitive), in rubric order."""
+        if self._keyword_re is None:
+            return []
+        seen = {m.group(0).lower() for m in self._keyword_re.finditer(text)}
+        return [k for k in self.keywords if k.lower() in seen]
+
+    def find_paths(self, text: str) -> List[str]:
+        """Sorted unique matches of ``path_pattern`` in ``text``."""
+        if self._path_re is None:
+            return []
+        return sorted({m.group(0) for m in self._path_re.finditer(text)})
+
+
+class SynthesisParameters(BaseModel):
+    """Numbers behind the Chief Justice's rules (see ``synthesis_rules``)."""
+
+    default_score: int = Field(3, ge=1, le=5, description="Score assumed for a missing opinion")
+    security_dimensions: List[str] = Field(default_factory=lambda: ["safe_tool_engineering"])
+    security_prosecutor_max: int = Field(2, description="Prosecutor score at or below which the security cap applies")
+    security_score_cap: int = Field(3, ge=1, le=5)
+    fact_supremacy_defense_min: int = Field(4, description="Defense score overruled when evidence is missing")
+    functionality_dimensions: List[str] = Field(
+        default_factory=lambda: ["graph_orchestration", "state_management_rigor"]
+    )
+    functionality_techlead_min: int = Field(4, description="Tech Lead score that carries the functionality rule")
+    variance_threshold: int = Field(2, ge=0, description="Score spread above which the Tech Lead breaks the tie")
+
+
+class Rubric(BaseModel):
+    """Parsed ``rubric.json`` with O(1) lookups by dimension id and artifact."""
+
+    rubric_metadata: Dict[str, Any] = Field(default_factory=dict)
+    dimensions: List[Dimension]
+    synthesis_rules: Dict[str, str] = Field(default_factory=dict)
+    synthesis_parameters: SynthesisParameters = Field(default_factory=SynthesisParameters)
+
+    _by_id: Dict[str, Dimension] = PrivateAttr(default_factory=dict)
+    _by_artifact: Dict[str, Tuple[Dimension, ...]] = PrivateAttr(default_factory=dict)
+    _dicts: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+
+    @field_validator("dimensions")
+    @classmethod
+    def _unique_ids(cls, dims: List[Dimension]) -> List[Dimension]:
+        ids = [d.id for d in dims]
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate dimension ids: {', '.join(duplicates)}")
+        return dims
+
+    def model_post_init(self, __context: Any) -> None:
+        self._by_id = {d.id: d for d in self.dimensions}
+        by_artifact: Dict[str, List[Dimension]] = {}
+        for d in self.dimensions:
+            by_artifact.setdefault(d.target_artifact, []).append(d)
+        self._by_artifact = {k: tuple(v) for k, v in by_artifact.items()}
+        self._dicts = [d.as_dict() for d in self.dimensions]
+
+    def dimension(self, dim_id: str) -> Optional[Dimension]:
+        return self._by_id.get(dim_id)
+
+    def for_artifact(self, *artifacts: str) -> List[Dimension]:
+        """Dimensions targeting any of ``artifacts``, in rubric order."""
+        if len(artifacts) == 1:
+            return list(self._by_artifact.get(artifacts[0], ()))
+        wanted = set(artifacts)
+        return [d for d in self.dimensions if d.target_artifact in wanted]
+
+    def dimension_dicts(self) -> List[Dict[str, Any]]:
+        """Dimensions as the plain dicts found in the file (what judges are shown)."""
+        return [dict(d) for d in self._dicts]
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, mtime_ns: int, size: int) -> Rubric:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return Rubric.model_validate(json.load(f))
+    except (OSError, ValueError, ValidationError) as e:
+        raise RubricError(f"Cannot load {path}: {e}") from e
+
+
+def rubric_path(path: Optional[str] = None) -> Path:
+    """``path``, else ``RUBRIC_PATH``, else ``./rubric.json``, else the project's rubric."""
+    chosen = path or os.getenv("RUBRIC_PATH")
+    if chosen:
+        return Path(chosen)
+    local = Path(DEFAULT_RUBRIC)
+    return local if local.is_file() else _PROJECT_RUBRIC
+
+
+def load_rubric(path: Optional[str] = None) -> Rubric:
+    """Cached :class:`Rubric` for ``path``; re-parsed only when the file changes."""
+    resolved = rubric_path(path).resolve()
+    try:
+        stat = resolved.stat()
+    except OSError as e:
+        raise RubricError(f"Cannot load {resolved}: {e}") from e
+    return _load(str(resolved), stat.st_mtime_ns, stat.st_size)
+
+
+def rubric_from_state(state: Mapping) -> Rubric:
+    """The rubric injected into ``state``, or the default one."""
+    return state.get("rubric") or load_rubric()
+
+
+def state_dimensions(state: Mapping) -> List[Dict[str, Any]]:
+    """Dimension dicts to judge: ``state["rubric_dimensions"]`` if set, else the state's rubric."""
+    return state.get("rubric_dimensions") or rubric_from_state(state).dimension_dicts()
@@ -0,0 +1,395 @@
+"""Pipelined, stage-aware batch scheduler.
+
+Instead of pushing every audit through the whole graph as one block, the
+detectives run in dedicated worker pools and only the judicial half of
+``build_auditor_graph()`` is invoked per audit:
+
+- ``io``  – ``RepoInvestigator`` (network-bound git clone + history)
+- ``cpu`` – ``DocAnalyst`` (CPU-bound PDF parsing; a process pool by default)
+- ``llm`` – ``VisionInspector`` and the judges + Chief Justice
+
+Up to ``prefetch`` audits may be admitted ahead of the judges (detecting, or
+detected and waiting for an LLM worker), so the clones and extractions of
+upcoming audits overlap with the judging of earlier ones and the LLM pool never
+waits on I/O, while the number of clones on disk stays bounded.
+
+``DocAnalyst`` runs in a process pool started with ``forkserver`` (``spawn``
+where that is unavailable): forking the multi-threaded scheduler could copy
+held locks into the child. The fresh workers are handed the parent's
+``configure()`` settings by :func:`worker_config`/:func:`_init_worker`.
+Spans and profiles cannot come back from another process, so with
+instrumentation or profiling on, ``DocAnalyst`` runs on threads instead.
+
+With ``async_git`` the clone and its ``git log`` run on the shared asyncio
+git loop (:mod:`src.tools.async_git`), and an ``io`` worker is only taken
+once the checkout and its history are ready. Dozens of transfers can then be in flight without a
+thread each. Local directories and archives have nothing to transfer and go
+straight to the ``io`` pool.
+"""
+
+import functools
+import itertools
+import multiprocessing
+import shutil
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.batch import (
+    BatchResult,
+    ManifestEntry,
+    default_output_path,
+    result_from_error,
+    result_from_state,
+)
+from src import instrumentation, profiling
+from src.instrumentation import instrument_node
+from src.nodes.detectives import DocAnalyst, RepoInvestigator, VisionInspector
+from src.profiling import profile_node
+from src.tools import repo_tools
+
+STAGES = ("io", "cpu", "llm")
+
+# (stage, node) in evidence merge order: VisionInspector's swarm_visual wins
+DETECTIVE_STAGES = (
+    ("io", RepoInvestigator),
+    ("cpu", DocAnalyst),
+    ("llm", VisionInspector),
+)
+
+
+class PipelineScheduler:
+    """Run many audits with separate worker pools per resource type.
+
+    Use as a context manager (or call :meth:`shutdown`) so the pools are torn
+    down. ``stage_depths()`` may be polled from any thread while :meth:`run`
+    is in progress.
+    """
+
+    def __init__(
+        self,
+        graph=None,
+        io_workers: int = 4,
+        cpu_workers: int = 2,
+        llm_workers: int = 2,
+        prefetch: int = 4,
+        cpu_processes: bool = True,
+        on_progress: Optional[Callable[["PipelineScheduler"], None]] = None,
+        async_git: bool = False,
+    ) -> None:
+        if graph is None:
+            from src.graph import build_auditor_graph
+
+            graph = build_auditor_graph(include_detectives=False).compile()
+        self.graph = graph
+        self.prefetch = max(1, prefetch)
+        self.on_progress = on_progress
+        self.async_git = async_git
+        self._lock = threading.Lock()
+        self._depths = {s: {"queued": 0, "running": 0, "done": 0} for s in STAGES}
+        # process-pool tasks report their start through _started; see _submit and _listen
+        self._started = None
+        self._task_ids = itertools.count()
+        self._running_ids: set = set()
+        self._finished_ids: set = set()
+        profiler = profiling.PROFILER
+        if instrumentation.RECORDER.enabled or (profiler is not None and profiler.enabled):
+            cpu_processes = False
+        if cpu_processes:
+            context = _process_context()
+            self._started = context.SimpleQueue()
+            cpu_pool: Executor = ProcessPoolExecutor(max_workers=cpu_workers, mp_context=context,
+                                                     initializer=_init_worker,
+                                                     initargs=(worker_config(), self._started))
+            self._listener = threading.Thread(target=self._listen, name="cpu-started", daemon=True)
+            self._listener.start()
+        else:
+            cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="cpu")
+        self._pools: Dict[str, Executor] = {
+            "io": ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io"),
+            "cpu": cpu_pool,
+            "llm": ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm"),
+        }
+
+    def __enter__(self) -> "PipelineScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        if self._started is not None:
+            self._started.put(None)
+            self._listener.join()
+
+    def stage_depths(self) -> Dict[str, Dict[str, int]]:
+        """Per-stage ``queued``/``running``/``done`` task counts."""
+        with self._lock:
+            return {s: dict(d) for s, d in self._depths.items()}
+
+    def _bump(self, stage: str, **delta: int) -> None:
+        with self._lock:
+            for key, value in delta.items():
+                self._depths[stage][key] += value
+
+    def _submit(self, stage: str, fn, *args) -> Future:
+        self._bump(stage, queued=1)
+        if stage == "cpu" and self._started is not None:
+            task_id = next(self._task_ids)
+            future = self._pools[stage].submit(_started_in_worker, task_id, fn, *args)
+            future.add_done_callback(lambda _: self._process_task_finished(task_id))
+        else:
+            future = self._pools[stage].submit(self._tracked, stage, fn, *args)
+            future.add_done_callback(lambda _: self._finished(stage))
+        return future
+
+    def _listen(self) -> None:
+        """Move process-pool tasks from queued to running as workers report their start."""
+        while True:
+            task_id = self._started.get()
+            if task_id is None:
+                return
+            with self._lock:
+                # the result may have overtaken the start message
+                if task_id in self._finished_ids:
+                    self._finished_ids.discard(task_id)
+                    continue
+                self._running_ids.add(task_id)
+                self._depths["cpu"]["queued"] -= 1
+                self._depths["cpu"]["running"] += 1
+
+    def _process_task_finished(self, task_id: int) -> None:
+        with self._lock:
+            if task_id in self._running_ids:
+                self._running_ids.discard(task_id)
+                self._depths["cpu"]["running"] -= 1
+            else:
+                self._finished_ids.add(task_id)
+                self._depths["cpu"]["queued"] -= 1
+            self._depths["cpu"]["done"] += 1
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def _submit_detective(self, stage: str, node, state: Dict) -> Future:
+        if (self.async_git and node is RepoInvestigator and not state.get("repo_path")
+                and not repo_tools.is_local_source(state["repo_url"])):
+            return self._clone_then_submit(stage, _wrapped(node), state)
+        return self._submit(stage, _wrapped(node), state)
+
+    def _clone_then_submit(self, stage: str, node, state: Dict) -> Future:
+        """Clone on the git event loop, then run ``node`` on the checkout in the ``stage`` pool."""
+        from src import deadline
+        from src.nodes.detectives import clone_failure
+        from src.tools import async_git
+
+        result: Future = Future()
+
+        def relay(inner: Future) -> None:
+            try:
+                result.set_result(inner.result())
+            except BaseException as exc:
+                result.set_exception(exc)
+
+        def cloned(clone: Future) -> None:
+            try:
+                repo_path, history = clone.result()
+            except BaseException as exc:
+                inner = self._submit(stage, clone_failure, state, exc)
+            else:
+                inner = self._submit(stage, _on_checkout, node, dict(state, repo_path=str(repo_path), git_history=history))
+            inner.add_done_callback(relay)
+
+        try:
+            timeout = deadline.timeout_for(state, "GIT_CLONE_TIMEOUT")
+        except deadline.DeadlineExceeded as exc:
+            self._submit(stage, clone_failure, state, exc).add_done_callback(relay)
+            return result
+        async_git.submit(async_git.clone_with_history(state["repo_url"], timeout)).add_done_callback(cloned)
+        return result
+
+    def _tracked(self, stage: str, fn, *args):
+        self._bump(stage, queued=-1, running=1)
+        return fn(*args)
+
+    def _finished(self, stage: str) -> None:
+        self._bump(stage, running=-1, done=1)
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def run(self, entries: List[ManifestEntry], output_dir: str = "audit/batch",
+            time_budget: Optional[float] = None) -> List[BatchResult]:
+        """Audit every entry and return results in manifest order.
+
+        An audit's ``time_budget`` starts when it enters the pipeline.
+        """
+        from src.graph import initial_state
+        from src.results import save_result
+
+        results: List[Optional[BatchResult]] = [None] * len(entries)
+        window = threading.BoundedSemaphore(self.prefetch)
+        remaining = threading.Semaphore(0)
+
+        def judge(index: int, entry: ManifestEntry, state: Dict, start: float) -> None:
+            # the audit leaves the prefetch window once judging actually starts
+            window.release()
+            try:
+                final_state = self.graph.invoke(state, {"recursion_limit": 50})
+                save_result(final_state, state["output_path"])
+                results[index] = result_from_state(entry, state["output_path"], final_state, start)
+            except Exception as exc:
+                results[index] = result_from_error(entry, state["output_path"], exc, start)
+
+        def detectives_done(index: int, entry: ManifestEntry, state: Dict, futures: List[Future], start: float) -> None:
+            evidences: Dict = {}
+            degradations: List[str] = []
+            commit = None
+            fingerprints: Dict[str, str] = {}
+            try:
+                for future in futures:
+                    update = future.result() or {}
+                    evidences.update(update.get("evidences", {}))
+                    degradations.extend(update.get("degradations", []))
+                    fingerprints.update(update.get("fingerprints", {}))
+                    commit = update.get("commit", commit)
+            except Exception as exc:
+                results[index] = result_from_error(entry, state["output_path"], exc, start)
+                window.release()
+                remaining.release()
+                return
+            state = dict(state, evidences=evidences, degradations=degradations, commit=commit,
+                         fingerprints=fingerprints)
+            future = self._submit("llm", judge, index, entry, state, start)
+            # registered after the depth bookkeeping callback, so counts are final on return
+            future.add_done_callback(lambda _: remaining.release())
+
+        for index, entry in enumerate(entries):
+            window.acquire()
+            start = time.perf_counter()
+            output = entry.output or default_output_path(output_dir, index + 1, entry.repo)
+            state = initial_state(entry.repo, entry.pdf, output, time_budget=time_budget)
+            futures = [self._submit_detective(stage, node, state) for stage, node in DETECTIVE_STAGES]
+            pending = [len(futures)]
+            pending_lock = threading.Lock()
+
+            def one_done(_, index=index, entry=entry, state=state, futures=futures, start=start,
+                         pending=pending, pending_lock=pending_lock):
+                with pending_lock:
+                    pending[0] -= 1
+                    last = pending[0] == 0
+                if last:
+                    detectives_done(index, entry, state, futures, start)
+
+            for future in futures:
+                future.add_done_callback(one_done)
+
+        for _ in entries:
+            remaining.acquire()
+        return results
+
+
+def _run_node(name: str, fn, state: Dict) -> Dict:
+    return profile_node(name, instrument_node(name, fn))(state)
+
+
+def _wrapped(node):
+    """``node`` instrumented and profiled as in ``build_auditor_graph``; picklable for the process pool."""
+    return functools.partial(_run_node, node.__name__, node)
+
+
+def _process_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def worker_config() -> Dict[str, Any]:
+    """This process's ``configure()`` settings, for :func:`_init_worker` in a pool worker.
+
+    Settings left to environment variables need no copying: workers inherit the environment.
+    """
+    from src import cassette, concurrency, fingerprint, results, similarity
+
+    tape = cassette.active_cassette()
+    return {
+        "cassette": (tape.path, tape.mode) if tape is not None else None,
+        "similarity": similarity._configured,
+        "dedupe": fingerprint._configured,
+        "results": results._configured,
+        "local_sources": repo_tools._local_sources_root,
+        "limits": {stage: stats["limit"] for stage, stats in concurrency.stage_stats().items()},
+    }
+
+
+_started_queue = None
+
+
+def _started_in_worker(task_id: int, fn, *args):
+    """Pool-worker side of :meth:`PipelineScheduler._listen`."""
+    _started_queue.put(task_id)
+    return fn(*args)
+
+
+def _init_worker(config: Dict[str, Any], started) -> None:
+    from src import cassette, concurrency, fingerprint, results, similarity
+
+    global _started_queue
+    _started_queue = started
+
+    if config["cassette"] is not None:
+        cassette.configure(*config["cassette"], append=True)
+    similarity.configure(config["similarity"])
+    fingerprint.configure(config["dedupe"])
+    results.configure(config["results"])
+    repo_tools.configure_local_sources(config["local_sources"])
+    concurrency.configure_limits(**config["limits"])
+
+
+def _on_checkout(node, state: Dict) -> Dict:
+    """Run ``node`` on the clone at ``state["repo_path"]``, then remove the clone."""
+    try:
+        return node(state)
+    finally:
+        shutil.rmtree(state["repo_path"], ignore_errors=True)
+
+
+def run_pipelined(
+    entries: List[ManifestEntry],
+    output_dir: str = "audit/batch",
+    io_workers: int = 4,
+    cpu_workers: int = 2,
+    llm_workers: int = 2,
+    prefetch: int = 4,
+    judge_concurrency: Optional[int] = 3,
+    on_progress: Optional[Callable[[PipelineScheduler], None]] = None,
+    time_budget: Optional[float] = None,
+    async_git: bool = False,
+    max_clones: Optional[int] = None,
+) -> List[BatchResult]:
+    """Convenience wrapper used by the ``--pipeline`` CLI flag.
+
+    ``max_clones`` caps the clones in flight on the git loop (``async_git``).
+    """
+    from src.concurrency import configure_limits
+
+    configure_limits(judge=judge_concurrency)
+    if max_clones is not None:
+        configure_limits(clone=max_clones)
+    with PipelineScheduler(
+        io_workers=io_workers,
+        cpu_workers=cpu_workers,
+        llm_workers=llm_workers,
+        prefetch=prefetch,
+        on_progress=on_progress,
+        async_git=async_git,
+    ) as scheduler:
+        return scheduler.run(entries, output_dir=output_dir, time_budget=time_budget)
+
+
+def format_depths(depths: Dict[str, Dict[str, int]]) -> str:
+    """One-line rendering of :meth:`PipelineScheduler.stage_depths`."""
+    return "  ".join(
+        f"{stage}: {d['queued']} queued / {d['running']} running / {d['done']} done"
+        for stage, d in depths.items()
+    )
@@ -0,0 +1,404 @@
+"""Long-running audit service.
+
+``python -m src.service`` compiles ``build_auditor_graph()`` once, loads the
+rubric once, keeps the LLM clients and the vision cache warm and accepts audit
+jobs over HTTP (TCP or a Unix socket). Jobs run concurrently on a thread pool
+bounded by the same per-stage limits as batch mode; per-audit overhead is only
+the audit itself.
+
+Endpoints (JSON in, JSON out):
+
+- ``POST /audits`` ``{"repo", "pdf", "output"?, "incremental"?, "time_budget"?}``
+  → ``202`` job.
+  Add ``"stream": true`` (or ``?stream=1``) to receive progress as JSON lines
+  instead, ending with the finished job.
+- ``GET /audits`` / ``GET /audits/<id>`` → job(s).
+- ``GET /audits/<id>/events`` → JSON-lines progress stream.
+- ``GET /health`` → job counts and stage occupancy.
+
+The API has no authentication, so it binds to localhost by default and never
+touches paths outside its own directories: ``output`` is resolved under the
+output directory and ``pdf`` under the input root, and absolute or ``..``
+paths escaping them are rejected with ``400``. Finished jobs are forgotten
+after ``job_ttl`` seconds or beyond ``keep_jobs``.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel, Field
+
+from src.batch import BatchResult, ManifestEntry, default_output_path, result_from_error, result_from_state
+from src.concurrency import configure_limits, stage_stats
+from src.rubric import load_rubric
+
+
+class AuditJob(BaseModel):
+    """Public view of one submitted audit."""
+
+    id: str
+    repo: str
+    pdf: str
+    output: str
+    incremental: bool = False
+    time_budget: Optional[float] = None
+    status: Literal["queued", "running", "done", "error"] = "queued"
+    submitted_at: float = Field(default_factory=time.time)
+    result: Optional[BatchResult] = None
+
+
+class _JobEntry:
+    """A job plus the progress events streamed to clients.
+
+    Events are kept until the job is evicted, so every reader, however late,
+    gets the whole stream.
+    """
+
+    def __init__(self, job: AuditJob) -> None:
+        self.job = job
+        self.events: List[Dict[str, Any]] = []
+        self.finished = False
+        self.finished_at: Optional[float] = None
+        self.changed = threading.Condition()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self.changed:
+            self.events.append(event)
+            self.finished = event["event"] == "finished"
+            if self.finished:
+                self.finished_at = time.monotonic()
+            self.changed.notify_all()
+
+
+def _confined(root: str, path: str, what: str) -> str:
+    """``path`` resolved under ``root``; ``ValueError`` for absolute paths and ``..`` escapes."""
+    if os.path.isabs(path) or ".." in Path(path).parts:
+        raise ValueError(f"{what} must be a relative path inside {root}: {path!r}")
+    base = Path(root).resolve()
+    resolved = (base / path).resolve()
+    if not resolved.is_relative_to(base):  # a symlink pointing out of the root
+        raise ValueError(f"{what} must stay inside {root}: {path!r}")
+    return str(resolved)
+
+
+class AuditService:
+    """Runs audits against one compiled graph; thread-safe."""
+
+    def __init__(
+        self,
+        graph=None,
+        output_dir: str = "audit/service",
+        max_audits: int = 4,
+        clone_concurrency: Optional[int] = 4,
+        extract_concurrency: Optional[int] = 2,
+        judge_concurrency: Optional[int] = 3,
+        rubric_path: Optional[str] = None,
+        input_root: str = "audit/inputs",
+        keep_jobs: int = 1000,
+        job_ttl: Optional[float] = 3600.0,
+    ) -> None:
+        if graph is None:
+            from src.graph import build_auditor_graph
+
+            graph = build_auditor_graph().compile()
+        self.graph = graph
+        self.output_dir = output_dir
+        self.input_root = input_root
+        # finished jobs are forgotten after job_ttl seconds, or oldest first beyond keep_jobs
+        self.keep_jobs = keep_jobs
+        self.job_ttl = job_ttl
+        self.rubric = load_rubric(rubric_path)
+        configure_limits(clone=clone_concurrency, extract=extract_concurrency, judge=judge_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_audits), thread_name_prefix="audit")
+        self._jobs: Dict[str, _JobEntry] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.started_at = time.time()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def submit(self, repo: str, pdf: str, output: Optional[str] = None, incremental: bool = False,
+               time_budget: Optional[float] = None) -> AuditJob:
+        """Queue an audit and return its job record immediately.
+
+        ``pdf`` is relative to the input root and ``output`` to the output
+        directory; ``ValueError`` if either escapes its root.
+        ``time_budget`` (seconds) starts counting when the job starts running.
+        """
+        pdf = _confined(self.input_root, pdf, "pdf")
+        if output is not None:
+            output = _confined(self.output_dir, output, "output")
+        n = next(self._ids)
+        job = AuditJob(
+            id=f"job-{n:04d}",
+            repo=repo,
+            pdf=pdf,
+            output=output or default_output_path(self.output_dir, n, repo),
+            incremental=incremental,
+            time_budget=time_budget,
+        )
+        entry = _JobEntry(job)
+        with self._lock:
+            self._evict_finished()
+            self._jobs[job.id] = entry
+        entry.emit({"event": "queued", "job": job.id})
+        self._pool.submit(self._run, entry)
+        return job
+
+    def _evict_finished(self) -> None:
+        """Forget finished jobs past ``job_ttl`` or beyond ``keep_jobs`` (caller holds ``_lock``)."""
+        finished = sorted((e.finished_at, job_id) for job_id, e in self._jobs.items() if e.finished_at is not None)
+        expired = 0 if self.job_ttl is None else sum(1 for at, _ in finished if time.monotonic() - at > self.job_ttl)
+        for _, job_id in finished[:max(expired, len(finished) - self.keep_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[AuditJob]:
+        entry = self._jobs.get(job_id)
+        return entry.job if entry else None
+
+    def jobs(self) -> List[AuditJob]:
+        with self._lock:
+            return [e.job for e in self._jobs.values()]
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict_finished()
+        counts: Dict[str, int] = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "jobs": counts,
+            "stages": stage_stats(),
+        }
+
+    def events(self, job_id: str, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the job's progress events (past and future) until it finishes.
+
+        Nothing is yielded for an unknown or evicted job; a job evicted while
+        it is being followed is still followed to the end.
+        """
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return
+        seen = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with entry.changed:
+                while seen == len(entry.events) and not entry.finished:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    entry.changed.wait(remaining)
+                batch = entry.events[seen:]
+                seen = len(entry.events)
+                finished = entry.finished
+            yield from batch
+            if finished:
+                return
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[AuditJob]:
+        """The job once it has finished (or ``timeout`` passed); ``None`` if unknown or evicted."""
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        for _ in self.events(job_id, timeout):
+            pass
+        return entry.job
+
+    def _run(self, entry: _JobEntry) -> None:
+        from src.graph import initial_state
+        from src.incremental import finalize_record, load_record, previous_audit, record_path
+        from src.results import save_result
+
+        job = entry.job
+        manifest_entry = ManifestEntry(repo=job.repo, pdf=job.pdf, output=job.output)
+        start = time.perf_counter()
+        job.status = "running"
+        entry.emit({"event": "started", "job": job.id})
+        try:
+            previous_record = load_record(record_path(job.output)) if job.incremental else None
+            state = initial_state(job.repo, job.pdf, job.output, previous_audit(previous_record, job.repo),
+                                  job.time_budget, rubric=self.rubric)
+            final_state = None
+            for mode, chunk in self.graph.stream(state, {"recursion_limit": 50}, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                for node in chunk or {}:
+                    entry.emit({"event": "node", "job": job.id, "node": node,
+                                "elapsed_s": round(time.perf_counter() - start, 3)})
+            finalize_record(final_state, job.output, previous_record)
+            save_result(final_state, job.output)
+            job.result = result_from_state(manifest_entry, job.output, final_state, start)
+            job.status = "done"
+        except Exception as exc:
+            job.result = result_from_error(manifest_entry, job.output, exc, start)
+            job.status = "error"
+        entry.emit({"event": "finished", "job": job.id, "status": job.result.status})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AutomatonAuditor/1.0"
+    service: AuditService  # set on the subclass created by make_server
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, job: AuditJob) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(payload: Any) -> None:
+            data = (json.dumps(payload, default=str) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        # the job record is updated in place, so it holds the result even if the job was evicted meanwhile
+        for event in self.service.events(job.id):
+            chunk(event)
+        chunk({"event": "result", "job": job.model_dump(mode="json")})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, self.service.health())
+        if parts == ["audits"]:
+            return self._send_json(HTTPStatus.OK, [j.model_dump(mode="json") for j in self.service.jobs()])
+        if len(parts) in (2, 3) and parts[0] == "audits":
+            job = self.service.get(parts[1])
+            if job is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown job {parts[1]}"})
+            if len(parts) == 3 and parts[2] == "events":
+                return self._stream(job)
+            if len(parts) == 2:
+                return self._send_json(HTTPStatus.OK, job.model_dump(mode="json"))
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/audits":
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            request = ManifestEntry(**{k: body[k] for k in ("repo", "pdf", "output") if body.get(k)})
+            time_budget = float(body["time_budget"]) if body.get("time_budget") else None
+            job = self.service.submit(request.repo, request.pdf, request.output, bool(body.get("incremental")),
+                                      time_budget)
+        except Exception as exc:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"invalid audit request: {exc}"})
+        stream = body.get("stream") or parse_qs(url.query).get("stream", ["0"])[0] in ("1", "true")
+        if stream:
+            return self._stream(job)
+        self._send_json(HTTPStatus.ACCEPTED, job.model_dump(mode="json"))
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: AuditService, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """HTTP server bound to ``host:port``, or to ``socket_path`` when given."""
+    handler = type("AuditHandler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Automaton Auditor as a long-running service")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Bind address; the API has no authentication, so keep it on localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", type=str, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--output-dir", default="audit/service",
+                        help="Directory for reports; a request's output is relative to it")
+    parser.add_argument("--input-root", default="audit/inputs",
+                        help="Directory a request's pdf is relative to; nothing outside it is read")
+    parser.add_argument("--keep-jobs", type=int, default=1000, help="Finished jobs kept for lookup")
+    parser.add_argument("--job-ttl", type=float, default=3600.0, help="Seconds a finished job is kept for lookup")
+    parser.add_argument("--max-audits", type=int, default=4, help="Audits in flight at once")
+    parser.add_argument("--clone-concurrency", type=int, default=4, help="Concurrent git clones")
+    parser.add_argument("--extract-concurrency", type=int, default=2, help="Concurrent PDF extractions")
+    parser.add_argument("--judge-concurrency", type=int, default=3, help="Concurrent LLM calls")
+    parser.add_argument("--results-db", type=str, help="Store every finished audit in this SQLite file "
+                                                        "(default: RESULTS_DB; unset = not stored)")
+    parser.add_argument("--similarity-db", type=str,
+                        help="Cross-submission code similarity index (default: SIMILARITY_DB; unset = off)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Reuse earlier audits of identical submissions (default: AUDIT_DEDUPE)")
+    args = parser.parse_args(argv)
+
+    from src.config import ConfigError, load_environment
+
+    try:
+        for warning in load_environment():
+            print(f"Warning: {warning}")
+    except ConfigError as exc:
+        parser.error(str(exc))
+
+    if args.results_db:
+        from src import results
+
+        results.configure(args.results_db)
+    if args.similarity_db:
+        from src import similarity
+
+        similarity.configure(args.similarity_db)
+    if args.dedupe:
+        from src import fingerprint
+
+        fingerprint.configure(True)
+    service = AuditService(
+        output_dir=args.output_dir,
+        input_root=args.input_root,
+        keep_jobs=args.keep_jobs,
+        job_ttl=args.job_ttl,
+        max_audits=args.max_audits,
+        clone_concurrency=args.clone_concurrency,
+        extract_concurrency=args.extract_concurrency,
+        judge_concurrency=args.judge_concurrency,
+    )
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Automaton Auditor service listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
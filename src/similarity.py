@@ -0,0 +1,359 @@
+"""Cross-submission similarity: AST/text winnowing plus a MinHash-LSH index.
+
+Copied ``src/graph.py`` and ``src/nodes/*`` files (kind ``code``) and copied
+architecture reports (kind ``report``) are found without comparing every pair
+of submissions:
+
+1. each file is reduced to its identifier-free AST token stream
+   (:func:`src.tools.repo_tools.normalized_tokens`), so renaming variables,
+   functions or docstrings does not hide a copy. A report is reduced to the
+   lower-cased words of its extracted chunks (:func:`sketch_text`);
+2. the stream is cut into ``K``-token grams whose hashes are winnowed (the
+   minimum of every ``WINDOW`` consecutive hashes is kept), giving a small
+   fingerprint set per file;
+3. a MinHash signature of that set is split into ``BANDS`` bands of ``ROWS``
+   values. Files sharing a band bucket are candidates, and candidates are
+   confirmed with the exact Jaccard similarity of their fingerprint sets.
+
+Looking a file up costs ``BANDS`` indexed queries however large the cohort is,
+so indexing a cohort is roughly linear in its size. With ``BANDS=32, ROWS=4``
+a pair with Jaccard 0.6 becomes a candidate with probability ~0.99.
+
+The index is a SQLite file and is opt-in: pass ``--similarity-db`` or set
+``SIMILARITY_DB``. RepoInvestigator and DocAnalyst then check every
+submission against the earlier ones, add it to the index and record the
+closest matches as ``code_similarity`` and ``report_similarity`` evidence.
+That evidence is stored with the audit but is not shown to the judges.
+
+CLI::
+
+    python -m src.similarity --db audit/similarity.sqlite pairs --threshold 0.7
+    python -m src.similarity pairs --kind report
+    python -m src.similarity index https://github.com/u/r path/to/checkout
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from src.tools.repo_tools import normalized_tokens
+
+if TYPE_CHECKING:  # numpy is imported where it is used, so importing the graph stays light
+    import numpy as np
+
+DEFAULT_SIMILARITY_DB = "audit/similarity.sqlite"
+SIMILARITY_PATTERNS = ("src/graph.py", "src/nodes/*.py")
+K = 12  # tokens per gram; node-type tokens carry little information each
+WINDOW = 8
+MIN_TOKENS = 40  # smaller files (``__init__.py``, stubs) match everything
+SHINGLE_WORDS, TEXT_WINDOW = 5, 4
+MIN_WORDS = 100  # a report with less text than this is not worth comparing
+BANDS, ROWS = 32, 4
+NUM_PERM = BANDS * ROWS
+DEFAULT_THRESHOLD = 0.6
+
+_MERSENNE = (1 << 61) - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind         TEXT NOT NULL,
+    repo_url     TEXT NOT NULL,
+    path         TEXT NOT NULL,
+    indexed_at   REAL NOT NULL,
+    tokens       INTEGER NOT NULL,
+    fingerprints BLOB NOT NULL,
+    UNIQUE (kind, repo_url, path)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band    INTEGER NOT NULL,
+    bucket  INTEGER NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);
+CREATE INDEX IF NOT EXISTS buckets_file ON buckets (file_id);
+"""
+
+
+class FileSketch(NamedTuple):
+    path: str
+    tokens: int
+    fingerprints: np.ndarray  # sorted unique uint32 winnowed k-gram hashes
+    signature: np.ndarray  # (NUM_PERM,) uint32 MinHash
+
+
+class SimilarityMatch(BaseModel):
+    """A file of this submission that resembles a file of an earlier one."""
+
+    path: str
+    other_repo: str
+    other_path: str
+    similarity: float  # Jaccard similarity of the winnowed fingerprint sets
+    overlap: float  # share of this file's fingerprints found in the other file
+
+
+@lru_cache(maxsize=1)
+def _permutations() -> Tuple[np.ndarray, np.ndarray]:
+    import numpy as np
+
+    rng = np.random.default_rng(0x5EED)  # fixed seed: signatures must be comparable across processes
+    return (rng.integers(1, _MERSENNE, size=NUM_PERM, dtype=np.uint64),
+            rng.integers(0, _MERSENNE, size=NUM_PERM, dtype=np.uint64))
+
+
+def winnow(tokens: Sequence[str], k: int = K, window: int = WINDOW) -> np.ndarray:
+    """Winnowed fingerprints of a token stream: the rightmost minimal hash of every window."""
+    import numpy as np
+
+    if len(tokens) < k:
+        return np.zeros(0, dtype=np.uint32)
+    hashes = np.fromiter((zlib.crc32("\x1f".join(tokens[i:i + k]).encode("utf-8"))
+                          for i in range(len(tokens) - k + 1)), dtype=np.uint32)
+    if len(hashes) <= window:
+        return np.unique(hashes[[len(hashes) - 1 - np.argmin(hashes[::-1])]])
+    windows = np.lib.stride_tricks.sliding_window_view(hashes, window)
+    picked = np.arange(len(windows)) + window - 1 - np.argmin(windows[:, ::-1], axis=1)
+    return np.unique(hashes[np.unique(picked)])
+
+
+def minhash(fingerprints: np.ndarray) -> np.ndarray:
+    """``NUM_PERM`` MinHash values of a fingerprint set (universal hashing, wrapping uint64)."""
+    import numpy as np
+
+    a, b = _permutations()
+    x = fingerprints.astype(np.uint64)[:, None]
+    with np.errstate(over="ignore"):
+        hashed = ((x * a + b) % np.uint64(_MERSENNE)) & np.uint64(0xFFFFFFFF)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    import numpy as np
+
+    union = len(np.union1d(a, b))
+    return len(np.intersect1d(a, b, assume_unique=True)) / union if union else 0.0
+
+
+def _compare(sketch: FileSketch, other_repo: str, other_path: str, other: np.ndarray) -> SimilarityMatch:
+    import numpy as np
+
+    shared = len(np.intersect1d(sketch.fingerprints, other, assume_unique=True))
+    union = len(sketch.fingerprints) + len(other) - shared
+    return SimilarityMatch(path=sketch.path, other_repo=other_repo, other_path=other_path,
+                           similarity=round(shared / union, 4) if union else 0.0,
+                           overlap=round(shared / len(sketch.fingerprints), 4) if len(sketch.fingerprints) else 0.0)
+
+
+def sketch_source(path: str, source: str) -> Optional[FileSketch]:
+    """Sketch of one Python file; ``None`` if it does not parse or is too small to judge."""
+    try:
+        tokens = normalized_tokens(source)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    if len(tokens) < MIN_TOKENS:
+        return None
+    fingerprints = winnow(tokens)
+    return FileSketch(path, len(tokens), fingerprints, minhash(fingerprints))
+
+
+def sketch_repo(root: Path, patterns: Sequence[str] = SIMILARITY_PATTERNS) -> List[FileSketch]:
+    root = Path(root)
+    sketches = []
+    for path in sorted({p for pattern in patterns for p in root.glob(pattern) if p.is_file()}):
+        try:
+            source = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        sketch = sketch_source(path.relative_to(root).as_posix(), source)
+        if sketch is not None:
+            sketches.append(sketch)
+    return sketches
+
+
+def sketch_text(name: str, text: str) -> Optional[FileSketch]:
+    """Sketch of a report's text (``SHINGLE_WORDS``-word shingles); ``None`` if it is too short."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    fingerprints = winnow(words, SHINGLE_WORDS, TEXT_WINDOW)
+    return FileSketch(name, len(words), fingerprints, minhash(fingerprints))
+
+
+def _buckets(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """``(band, bucket)`` keys of a signature; buckets are signed 64-bit for SQLite."""
+    rows = signature.reshape(BANDS, ROWS)
+    return [(band, int.from_bytes(hashlib.blake2b(rows[band].tobytes(), digest_size=8).digest(), "little",
+                                  signed=True))
+            for band in range(BANDS)]
+
+
+class SimilarityIndex:
+    """SQLite MinHash-LSH index of submitted files. Opens a short-lived
+    connection per operation (like :class:`src.results.ResultsStore`)."""
+
+    def __init__(self, path: str = DEFAULT_SIMILARITY_DB, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.path = path
+        self.threshold = threshold
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _matches(self, conn: sqlite3.Connection, kind: str, sketch: FileSketch,
+                 repo_url: str) -> List[SimilarityMatch]:
+        import numpy as np
+
+        keys = _buckets(sketch.signature)
+        where = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(keys))
+        rows = conn.execute(
+            f"SELECT DISTINCT f.repo_url, f.path, f.fingerprints FROM buckets b JOIN files f ON f.id = b.file_id "
+            f"WHERE ({where}) AND f.kind = ? AND f.repo_url != ?",
+            [v for key in keys for v in key] + [kind, repo_url],
+        ).fetchall()
+        matches = (_compare(sketch, other_repo, other_path, np.frombuffer(blob, dtype=np.uint32))
+                   for other_repo, other_path, blob in rows)
+        return [m for m in matches if m.similarity >= self.threshold]
+
+    def add(self, repo_url: str, sketches: Sequence[FileSketch], kind: str = "code") -> List[SimilarityMatch]:
+        """Match ``sketches`` against the other repositories, then (re)index them as ``repo_url``.
+
+        Replaces ``repo_url``'s earlier entries of the same ``kind``. One
+        transaction, so concurrent audits always see each other in one direction.
+        Matches come most similar first.
+        """
+        with self._tx() as conn:
+            matches = [m for sketch in sketches for m in self._matches(conn, kind, sketch, repo_url)]
+            conn.execute("DELETE FROM files WHERE kind = ? AND repo_url = ?", (kind, repo_url))
+            now = time.time()
+            for sketch in sketches:
+                file_id = conn.execute(
+                    "INSERT INTO files (kind, repo_url, path, indexed_at, tokens, fingerprints) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, repo_url, sketch.path, now, sketch.tokens, sketch.fingerprints.tobytes()),
+                ).lastrowid
+                conn.executemany("INSERT INTO buckets (band, bucket, file_id) VALUES (?, ?, ?)",
+                                 [(band, bucket, file_id) for band, bucket in _buckets(sketch.signature)])
+        return sorted(matches, key=lambda m: (-m.similarity, m.path, m.other_repo))
+
+    def index_repo(self, repo_url: str, root: Path) -> List[SimilarityMatch]:
+        return self.add(repo_url, sketch_repo(root), "code")
+
+    def index_report(self, repo_url: str, name: str, text: str) -> List[SimilarityMatch]:
+        sketch = sketch_text(name, text)
+        return self.add(repo_url, [sketch] if sketch is not None else [], "report")
+
+    def pairs(self, threshold: Optional[float] = None, kind: str = "code") -> List[SimilarityMatch]:
+        """Every cross-repository pair of similar indexed files, most similar first.
+
+        ``path`` is ``<repo>:<path>`` of the file indexed later, ``other_*`` the earlier one.
+        """
+        import numpy as np
+
+        threshold = self.threshold if threshold is None else threshold
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            candidates = conn.execute(
+                "SELECT DISTINCT a.file_id, b.file_id FROM buckets a JOIN buckets b "
+                "ON a.band = b.band AND a.bucket = b.bucket AND a.file_id < b.file_id"
+            ).fetchall()
+            files = {row[0]: row[1:] for row in conn.execute(
+                "SELECT id, repo_url, path, tokens, fingerprints FROM files WHERE kind = ?", (kind,))}
+        finally:
+            conn.close()
+        sketches = {fid: FileSketch(f"{repo}:{path}", tokens, np.frombuffer(blob, dtype=np.uint32), None)
+                    for fid, (repo, path, tokens, blob) in files.items()}
+        pairs = []
+        for a, b in candidates:
+            if a not in files or b not in files or files[a][0] == files[b][0]:
+                continue
+            match = _compare(sketches[b], files[a][0], files[a][1], sketches[a].fingerprints)
+            if match.similarity >= threshold:
+                pairs.append(match)
+        return sorted(pairs, key=lambda m: -m.similarity)
+
+
+_configured: Optional[str] = None
+_indexes: Dict[str, SimilarityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def configure(path: Optional[str]) -> None:
+    """Index submissions of this process in ``path`` (``None`` falls back to ``SIMILARITY_DB``)."""
+    global _configured
+    _configured = path
+
+
+def active_index() -> Optional[SimilarityIndex]:
+    """The configured index, or ``None`` when similarity checks are off."""
+    path = _configured or os.getenv("SIMILARITY_DB")
+    if not path:
+        return None
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = SimilarityIndex(path, float(os.getenv("SIMILARITY_THRESHOLD", DEFAULT_THRESHOLD)))
+        return _indexes[path]
+
+
+def format_matches(matches: Sequence[SimilarityMatch]) -> str:
+    lines = ["| File | Similar to | File | Jaccard | Overlap |", "|------|------------|------|---------|---------|"]
+    lines += [f"| {m.path} | {m.other_repo} | {m.other_path} | {m.similarity:.2f} | {m.overlap:.0%} |"
+              for m in matches]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-submission code similarity index")
+    parser.add_argument("--db", default=None,
+                        help=f"Similarity index (default: SIMILARITY_DB or {DEFAULT_SIMILARITY_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pairs = sub.add_parser("pairs", help="List similar files across indexed submissions")
+    pairs.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum Jaccard similarity")
+    pairs.add_argument("--kind", choices=("code", "report"), default="code",
+                       help="Compare graph/node files or architecture reports")
+    index = sub.add_parser("index", help="Index a local checkout and print its matches")
+    index.add_argument("repo_url")
+    index.add_argument("path")
+    args = parser.parse_args(argv)
+
+    idx = SimilarityIndex(args.db or os.getenv("SIMILARITY_DB") or DEFAULT_SIMILARITY_DB)
+    if args.command == "pairs":
+        print(format_matches(idx.pairs(args.threshold, args.kind)))
+    elif args.command == "index":
+        if not Path(args.path).is_dir():
+            parser.error(f"no such directory: {args.path}")
+        print(format_matches(idx.index_repo(args.repo_url, Path(args.path))))
+    return idx
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ from typing import Annotated, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
+from src.rubric import Rubric
+from src.state_accounting import accounted
+
 class Evidence(BaseModel):
     """Facts uncovered by a detective agent.
 
@@ -81,11 +84,25 @@ class AuditReport(BaseModel):
         description="Detailed results for each rubric criterion",
     )
     remediation_plan: str = Field(..., description="Advice for correcting deficiencies")
+    degradations: List[str] = Field(
+        default_factory=list,
+        description="Steps that ran in reduced form to stay within the audit's time budget",
+    )
 
 class AgentState(TypedDict):
     repo_url: str
     pdf_path: str
-    rubric_dimensions: List[Dict]  # loaded from rubric.json
-    evidences: Annotated[Dict[str, List[Evidence]], operator.ior]  # merge dicts
-    opinions: Annotated[List[JudicialOpinion], operator.add]      # append lists
-    final_report: Optional[AuditReport]
\ No newline at end of file
+    repo_path: Optional[str]  # existing checkout of repo_url; RepoInvestigator clones when unset
+    git_history: Optional[List[Dict]]  # commits of repo_path read ahead, oldest first; None = run git log
+    rubric: Optional[Rubric]  # shared, precompiled rubric (src.rubric); loaded by initial_state
+    rubric_dimensions: List[Dict]  # optional override of the dimensions to judge; empty = all of the rubric's
+    evidences: Annotated[Dict[str, List[Evidence]], accounted(operator.ior, "evidences")]  # merge dicts
+    opinions: Annotated[List[JudicialOpinion], accounted(operator.add, "opinions")]      # append lists
+    final_report: Optional[AuditReport]
+    commit: Optional[str]  # HEAD of the audited clone, set by RepoInvestigator
+    fingerprints: Annotated[Dict[str, str], operator.ior]  # "repo"/"pdf" content hashes (src.fingerprint)
+    output_path: Optional[str]  # where the report is written; its suffix selects the format (src.reports)
+    report_formats: List[str]  # extra formats written next to output_path
+    previous_audit: Optional[Dict]  # dimension_hashes + opinions of the last audit (incremental mode)
+    deadline: Optional[float]  # epoch seconds; None = no time budget (see src.deadline)
+    degradations: Annotated[List[str], operator.add]  # what was skipped or simplified to meet the deadline
\ No newline at end of file
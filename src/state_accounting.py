@@ -0,0 +1,123 @@
+"""State-size accounting per LangGraph super-step.
+
+The ``evidences`` and ``opinions`` reducers in :class:`src.state.AgentState`
+are wrapped with :func:`accounted`. While :func:`run_with_accounting` drives a
+graph, every merge is timed and counted, and after each super-step the size of
+the full state is measured. The resulting table shows which step (and which
+node) grows the state and how much the reducers cost, e.g. a node that echoes
+the whole state back instead of returning only its changes.
+
+Reducers run in the thread that drives the graph, so the counters are
+thread-local and concurrent audits do not mix.
+"""
+
+import pickle
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_local = threading.local()
+
+
+def count_objects(value: Any) -> int:
+    """Evidence items in an ``evidences`` dict, or items in an ``opinions`` list."""
+    if isinstance(value, dict):
+        return sum(len(v) if isinstance(v, list) else 1 for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return 0 if value is None else 1
+
+
+def accounted(reducer: Callable[[Any, Any], Any], channel: str) -> Callable[[Any, Any], Any]:
+    """Wrap a state reducer so merges are measured while accounting is active."""
+
+    def merge(current, update):
+        stats = getattr(_local, "merges", None)
+        if stats is None:
+            return reducer(current, update)
+        start = time.perf_counter()
+        result = reducer(current, update)
+        stats["calls"] += 1
+        stats["seconds"] += time.perf_counter() - start
+        stats[f"{channel}_in"] += count_objects(update)
+        return result
+
+    merge.__name__ = f"accounted_{getattr(reducer, '__name__', 'reducer')}"
+    merge.__doc__ = f"{getattr(reducer, '__name__', 'reducer')} reducer for {channel!r} (see src.state_accounting)"
+    return merge
+
+
+def _state_bytes(values: Dict) -> Optional[int]:
+    try:
+        return len(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+
+def run_with_accounting(graph, state: Dict, config: Optional[Dict] = None) -> Tuple[Optional[Dict], List[Dict]]:
+    """Run ``graph`` to completion; return ``(final_state, steps)``.
+
+    Each step entry has the nodes that ran, the objects their updates carried,
+    the evidence/opinion counts and pickled size of the state afterwards, and
+    the number and cost of reducer merges it triggered. Step ``input`` is the
+    application of the input state itself.
+    """
+    config = config or {"recursion_limit": 50}
+    steps: List[Dict] = []
+    current: Dict[str, Any] = {"step": "input", "nodes": Counter(), "update_objects": 0}
+    final_state: Optional[Dict] = None
+
+    def close() -> None:
+        merges = _local.merges
+        values = final_state or {}
+        steps.append({
+            "step": current["step"],
+            "nodes": dict(current["nodes"]),
+            "update_objects": current["update_objects"],
+            "evidence_objects": count_objects(values.get("evidences")),
+            "opinions": count_objects(values.get("opinions")),
+            "state_bytes": _state_bytes(values),
+            "merge_calls": merges["calls"],
+            "merge_ms": merges["seconds"] * 1000,
+            "merged_objects": merges["evidences_in"] + merges["opinions_in"],
+        })
+        _local.merges = Counter()
+
+    previous = getattr(_local, "merges", None)
+    _local.merges = Counter()
+    try:
+        # "values" is only emitted when a step changes the state, so step
+        # boundaries come from the debug stream's task events
+        for mode, chunk in graph.stream(state, config, stream_mode=["debug", "updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+            elif mode == "updates":
+                for node, update in (chunk or {}).items():
+                    for key in ("evidences", "opinions"):
+                        current["update_objects"] += count_objects((update or {}).get(key))
+            elif chunk.get("type") == "task":
+                if chunk["step"] != current["step"]:
+                    close()
+                    current = {"step": chunk["step"], "nodes": Counter(), "update_objects": 0}
+                current["nodes"][chunk["payload"]["name"]] += 1
+        close()
+    finally:
+        _local.merges = previous
+    return final_state, steps
+
+
+def format_steps(steps: List[Dict]) -> str:
+    """Markdown table of :func:`run_with_accounting` steps."""
+    lines = [
+        "| Step | Nodes | Update objs | Evidence | Opinions | State KB | Merges | Merged objs | Merge ms |",
+        "|------|-------|-------------|----------|----------|----------|--------|-------------|----------|",
+    ]
+    for s in steps:
+        nodes = ", ".join(f"{n}×{c}" if c > 1 else n for n, c in s["nodes"].items()) or "-"
+        size = f"{s['state_bytes'] / 1024:.1f}" if s["state_bytes"] is not None else "?"
+        lines.append(
+            f"| {s['step']} | {nodes} | {s['update_objects']} | {s['evidence_objects']} | {s['opinions']} "
+            f"| {size} | {s['merge_calls']} | {s['merged_objects']} | {s['merge_ms']:.2f} |"
+        )
+    return "\n".join(lines)
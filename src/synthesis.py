@@ -0,0 +1,199 @@
+"""Vectorized Chief Justice synthesis for one audit or a whole cohort.
+
+Opinions of N audits are packed into an ``(audits, dimensions, judges)`` score
+array and the rubric's synthesis rules are applied as boolean masks, in the
+same order the Chief Justice has always applied them:
+
+1. security: a low Prosecutor score caps the score of security dimensions;
+2. fact supremacy: a high Defense score on missing evidence is overruled by
+   the Prosecutor;
+3. functionality: a high Tech Lead score carries functionality dimensions;
+4. variance: if no rule fired and the judges disagree widely, the Tech Lead
+   breaks the tie.
+
+:class:`src.nodes.justice.ChiefJusticeNode` uses this for its single audit.
+``python -m src.synthesis audit/batch/*.record.json`` re-scores stored audits
+(incremental records) after a rule change without running a single graph or
+LLM call; ``--write`` regenerates their Markdown reports.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.rubric import SynthesisParameters
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+JUDGES = ("Prosecutor", "Defense", "TechLead")
+P, D, T = range(len(JUDGES))
+
+# rule that decided a criterion's final score (last one applied wins, as in the node)
+NO_RULE, SECURITY, FACT_SUPREMACY, FUNCTIONALITY, VARIANCE = range(5)
+
+
+class AuditOpinions(NamedTuple):
+    """What synthesis needs from one audit (an ``AuditRecord`` has the same fields)."""
+
+    repo_url: str
+    opinions: List[JudicialOpinion]
+    evidences: Dict[str, List[Evidence]]
+
+
+class CohortScores(NamedTuple):
+    scores: np.ndarray  # (audits, dims, judges) int8; missing opinions hold the default score
+    all_found: np.ndarray  # (audits, dims) bool: the dimension has evidence and all of it was found
+    final: np.ndarray  # (audits, dims) int8
+    rule: np.ndarray  # (audits, dims) int8, one of the rule constants above
+
+
+def score_arrays(audits: Sequence[AuditOpinions], dim_ids: Sequence[str],
+                 default_score: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """``(scores, all_found)`` arrays; the first opinion per (judge, dimension) counts."""
+    dim_index = {d: i for i, d in enumerate(dim_ids)}
+    judge_index = {j: i for i, j in enumerate(JUDGES)}
+    scores = np.full((len(audits), len(dim_ids), len(JUDGES)), default_score, dtype=np.int8)
+    seen = np.zeros(scores.shape, dtype=bool)
+    all_found = np.zeros((len(audits), len(dim_ids)), dtype=bool)
+    for a, audit in enumerate(audits):
+        for op in audit.opinions:
+            d, j = dim_index.get(op.criterion_id), judge_index.get(op.judge)
+            if d is None or j is None or seen[a, d, j]:
+                continue
+            scores[a, d, j] = op.score
+            seen[a, d, j] = True
+        for d, dim_id in enumerate(dim_ids):
+            evs = audit.evidences.get(dim_id) or []
+            all_found[a, d] = bool(evs) and all(e.found for e in evs)
+    return scores, all_found
+
+
+def apply_rules(scores: np.ndarray, all_found: np.ndarray, dim_ids: Sequence[str],
+                params: SynthesisParameters) -> Tuple[np.ndarray, np.ndarray]:
+    """Final scores and deciding rule per (audit, dimension), computed with masks."""
+    p, d, t = (scores[..., i].astype(np.int16) for i in (P, D, T))
+    final = np.rint((p + d + t) / 3).astype(np.int16)
+    rule = np.zeros(final.shape, dtype=np.int8)
+
+    security_dim = np.isin(np.asarray(dim_ids), params.security_dimensions)[None, :]
+    mask = security_dim & (p <= params.security_prosecutor_max)
+    final = np.where(mask, np.minimum(final, params.security_score_cap), final)
+    rule[mask] = SECURITY
+
+    mask = ~all_found & (d >= params.fact_supremacy_defense_min)
+    final = np.where(mask, p, final)
+    rule[mask] = FACT_SUPREMACY
+
+    functionality_dim = np.isin(np.asarray(dim_ids), params.functionality_dimensions)[None, :]
+    mask = functionality_dim & (t >= params.functionality_techlead_min)
+    final = np.where(mask, t, final)
+    rule[mask] = FUNCTIONALITY
+
+    variance = scores.max(axis=-1).astype(np.int16) - scores.min(axis=-1)
+    mask = (variance > params.variance_threshold) & (rule == NO_RULE)
+    final = np.where(mask, t, final)
+    rule[mask] = VARIANCE
+
+    return np.clip(final, 1, 5).astype(np.int8), rule
+
+
+def synthesize(audits: Sequence[AuditOpinions], dim_ids: Sequence[str],
+               params: Optional[SynthesisParameters] = None) -> CohortScores:
+    """Score every audit in one pass."""
+    params = params or SynthesisParameters()
+    scores, all_found = score_arrays(audits, dim_ids, params.default_score)
+    final, rule = apply_rules(scores, all_found, dim_ids, params)
+    return CohortScores(scores, all_found, final, rule)
+
+
+def _dissent(rule: int, p: int, d: int, t: int, params: SynthesisParameters) -> Optional[str]:
+    if rule == SECURITY:
+        return f"Security Rule Applied: Prosecutor identified flaws; score capped at {params.security_score_cap}."
+    if rule == FACT_SUPREMACY:
+        return "Fact Supremacy Rule Applied: Artifact missing but Defense gave high score. Overruled."
+    if rule == FUNCTIONALITY:
+        return ("Functionality Weight Rule Applied: Tech Lead confirmed modular workable architecture, "
+                "carrying highest weight.")
+    if rule == VARIANCE:
+        return (f"High variance ({max(p, d, t) - min(p, d, t)}) detected between Prosecutor ({p}) and "
+                f"Defense ({d}). TechLead ({t}) acts as tie-breaker.")
+    return None
+
+
+def build_reports(audits: Sequence[AuditOpinions], dimensions: Sequence[Dict],
+                  params: Optional[SynthesisParameters] = None) -> List[AuditReport]:
+    """One :class:`AuditReport` per audit, scored by :func:`synthesize`."""
+    params = params or SynthesisParameters()
+    dim_ids = [dim["id"] for dim in dimensions]
+    cohort = synthesize(audits, dim_ids, params)
+    overall = cohort.final.sum(axis=1) / len(dim_ids) if dim_ids else np.zeros(len(audits))
+
+    reports = []
+    for a, audit in enumerate(audits):
+        by_dim: Dict[str, List[JudicialOpinion]] = {}
+        for op in audit.opinions:
+            by_dim.setdefault(op.criterion_id, []).append(op)
+        criteria = []
+        for i, dim in enumerate(dimensions):
+            ops = by_dim.get(dim["id"], [])
+            tech_lead = next((o for o in ops if o.judge == "TechLead"), None)
+            p, d, t = (int(s) for s in cohort.scores[a, i])
+            criteria.append(CriterionResult(
+                dimension_id=dim["id"],
+                dimension_name=dim["name"],
+                final_score=int(cohort.final[a, i]),
+                judge_opinions=ops,
+                dissent_summary=_dissent(int(cohort.rule[a, i]), p, d, t, params),
+                remediation=tech_lead.argument if tech_lead else "Please review this component thoroughly.",
+            ))
+        score = float(overall[a])
+        reports.append(AuditReport(
+            repo_url=audit.repo_url,
+            executive_summary=(f"Automated Audit Complete. Evaluated {len(dim_ids)} dimensions. "
+                               f"Overall synthesis resulted in a score of {score:.2f}."),
+            overall_score=score,
+            criteria=criteria,
+            remediation_plan=("Review the individual criterion remediations above, particularly "
+                              "prioritizing dimensions scoring 3 or below."),
+        ))
+    return reports
+
+
+def report_path_for(record_file: str) -> str:
+    """``x.record.json`` → ``x.md`` (inverse of :func:`src.incremental.record_path`)."""
+    path = Path(record_file)
+    return str(path.with_name(path.name.removesuffix(".record.json") + ".md"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored audits with the current synthesis rules")
+    parser.add_argument("records", nargs="+", help="Audit record files (<report>.record.json)")
+    parser.add_argument("--rubric", type=str, help="Rubric file (default: RUBRIC_PATH or rubric.json)")
+    parser.add_argument("--write", action="store_true", help="Regenerate each record's Markdown report")
+    args = parser.parse_args(argv)
+
+    from src.incremental import load_record
+    from src.reports import write_report
+    from src.rubric import load_rubric
+
+    rubric = load_rubric(args.rubric)
+    records = [(path, load_record(path)) for path in args.records]
+    missing = [path for path, record in records if record is None]
+    if missing:
+        parser.error(f"no audit record at: {', '.join(missing)}")
+    audits = [AuditOpinions(r.repo_url, r.opinions, r.evidences) for _, r in records]
+    reports = build_reports(audits, rubric.dimension_dicts(), rubric.synthesis_parameters)
+
+    lines = ["| Repository | Score | Report |", "|------------|-------|--------|"]
+    for (path, _), report in zip(records, reports):
+        output = report_path_for(path)
+        if args.write:
+            write_report(report, output)
+        lines.append(f"| {report.repo_url} | {report.overall_score:.2f} | {output if args.write else '-'} |")
+    print("\n".join(lines))
+    return reports
+
+
+if __name__ == "__main__":
+    main()
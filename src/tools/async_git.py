@@ -0,0 +1,187 @@
+"""Non-blocking git: asyncio versions of the clone and history tools.
+
+:func:`safe_clone_repo` and :func:`extract_git_history` mirror the blocking
+functions in :mod:`src.tools.repo_tools` but run git through
+``asyncio.create_subprocess_exec``. One event loop can therefore drive dozens
+of clones without a thread per transfer:
+
+- ``git log`` output is parsed line by line as it streams in;
+- every call takes its own ``timeout``. On a timeout, or when the awaiting
+  task is cancelled, the git process is killed and reaped before the
+  exception propagates, so no orphaned clone keeps running;
+- clones hold a slot of a per-loop semaphore. Its size is the ``clone`` limit
+  of :mod:`src.concurrency` when one is configured, else ``GIT_MAX_CLONES``
+  (default 8).
+
+With an active cassette (:mod:`src.cassette`) both run the blocking tools in
+a thread instead, so each call is recorded, or replayed, exactly like a
+sequential audit's.
+
+Synchronous callers (the pipeline scheduler) use :func:`submit`. It runs a
+coroutine on a shared event loop in a daemon thread and returns a
+``concurrent.futures.Future``; cancelling the future kills the git process.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Coroutine, List, Optional, Sequence, Tuple, Union
+
+from src import cassette
+from src.concurrency import stage_stats
+from src.tools import repo_tools
+from src.tools.repo_tools import RepoCloneError, is_bare_repo
+
+DEFAULT_MAX_CLONES = 8
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[int, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary())
+
+
+def clone_limit() -> int:
+    configured = stage_stats()["clone"]["limit"]
+    return configured or int(os.getenv("GIT_MAX_CLONES", DEFAULT_MAX_CLONES))
+
+
+def _clone_semaphore() -> asyncio.Semaphore:
+    loop, limit = asyncio.get_running_loop(), clone_limit()
+    cached = _semaphores.get(loop)
+    if cached is None or cached[0] != limit:
+        # a changed limit applies to new clones; those in flight finish on the old semaphore
+        cached = _semaphores[loop] = (limit, asyncio.Semaphore(limit))
+    return cached[1]
+
+
+async def run_git(args: Sequence[str], timeout: Optional[float] = None,
+                  on_line: Optional[Callable[[str], None]] = None) -> str:
+    """Run ``git *args``; feed each stdout line to ``on_line``; return stderr.
+
+    Raises ``subprocess.CalledProcessError`` on a non-zero exit and
+    ``subprocess.TimeoutExpired`` after ``timeout`` seconds. On a timeout or
+    cancellation the process is killed before the exception propagates.
+    """
+    cmd = ["git", *args]
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env=dict(os.environ, GIT_TERMINAL_PROMPT="0"),  # never wait for credentials on a private URL
+    )
+    # drained concurrently, so a chatty stderr cannot block the process
+    stderr = asyncio.ensure_future(proc.stderr.read())
+
+    async def stream() -> int:
+        async for raw in proc.stdout:
+            if on_line is not None:
+                on_line(raw.decode("utf-8", "replace").rstrip("\r\n"))
+        return await proc.wait()
+
+    try:
+        returncode = await asyncio.wait_for(stream(), timeout)
+    except BaseException as exc:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stderr.cancel()
+        if isinstance(exc, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+        raise
+    err = (await stderr).decode("utf-8", "replace")
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=err)
+    return err
+
+
+async def safe_clone_repo(url: str, timeout: Optional[float] = None, depth: int = 10) -> Tuple[Path, bool]:
+    """Shallow-clone ``url`` into a new temporary directory, holding a clone slot.
+
+    Same contract as :func:`src.tools.repo_tools.safe_clone_repo`: the caller
+    removes the returned directory. Raises :class:`RepoCloneError` on failure
+    or timeout; the directory is removed then.
+    """
+    repo_tools.check_clone_source(url)
+    async with _clone_semaphore():
+        if cassette.active_cassette() is not None:
+            return await asyncio.to_thread(repo_tools.safe_clone_repo, url, timeout)
+        repo_path = Path(tempfile.mkdtemp(prefix="audit-clone-"))
+        try:
+            await run_git(["clone", "--depth", str(depth), "--", url, str(repo_path)], timeout)
+        except subprocess.TimeoutExpired:
+            shutil.rmtree(repo_path, ignore_errors=True)
+            raise RepoCloneError(f"Cloning {url} timed out after {timeout:.0f}s") from None
+        except subprocess.CalledProcessError as exc:
+            shutil.rmtree(repo_path, ignore_errors=True)
+            raise RepoCloneError(f"Failed to clone repository {url}: {exc.stderr.strip()}") from None
+        except BaseException:
+            shutil.rmtree(repo_path, ignore_errors=True)
+            raise
+    return repo_path, True
+
+
+async def extract_git_history(path: Path, timeout: Optional[float] = None) -> Tuple[int, list]:
+    """``(count, [{"hash", "message"}, ...])`` oldest first, parsed while ``git log`` streams."""
+    if cassette.active_cassette() is not None:
+        return await asyncio.to_thread(repo_tools.extract_git_history, path, timeout)
+    commits: List[dict] = []
+
+    def parse(line: str) -> None:
+        parts = line.strip().split(" ", 1)
+        if len(parts) == 2:
+            commits.append({"hash": parts[0], "message": parts[1]})
+
+    if not (Path(path) / ".git").exists() and not is_bare_repo(Path(path)):
+        raise FileNotFoundError(f"{path} has no .git directory; history is not available")
+    await run_git(["-C", str(path), "log", "--reverse", "--pretty=format:%H %s"], timeout, on_line=parse)
+    return len(commits), commits
+
+
+async def clone_with_history(url: str, timeout: Optional[float] = None) -> Tuple[Path, Optional[list]]:
+    """Clone ``url`` and read its history: ``(path, commits oldest first)``.
+
+    The commits are ``None`` when ``git log`` fails, so the caller can run it
+    again and report the error. The clone is removed if the task is cancelled.
+    """
+    path, _ = await safe_clone_repo(url, timeout)
+    try:
+        return path, (await extract_git_history(path, timeout))[1]
+    except Exception:
+        return path, None
+    except BaseException:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+
+
+async def clone_many(urls: Sequence[str], timeout: Optional[float] = None) -> List[Union[Path, Exception]]:
+    """Clone every URL on this loop (at most :func:`clone_limit` at once); failures are returned, not raised."""
+    async def one(url: str) -> Path:
+        return (await safe_clone_repo(url, timeout))[0]
+
+    return list(await asyncio.gather(*(one(url) for url in urls), return_exceptions=True))
+
+
+class _LoopThread:
+    """An event loop running forever on a daemon thread, started on first use."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="git-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+
+_git_loop = _LoopThread()
+
+
+def submit(coro: Coroutine) -> Future:
+    """Run ``coro`` on the shared git event loop; cancelling the future cancels it."""
+    return asyncio.run_coroutine_threadsafe(coro, _git_loop.loop())
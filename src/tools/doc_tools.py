@@ -1,18 +1,11 @@
 from pathlib import Path
+import hashlib
 import tempfile
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional
 
-# Lazy imports for optional dependencies
-try:
-    from pypdf import PdfReader
-except ImportError:  # pragma: no cover
-    PdfReader = None
-
-try:
-    import fitz  # pymupdf
-except ImportError:  # pragma: no cover
-    fitz = None
+from src import cassette
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +14,26 @@ class PDFExtractionError(Exception):
     """Raised when critical PDF text extraction fails."""
 
 
+# PDF libraries are imported on first extraction rather than at import time:
+# they cost more than the rest of CLI startup combined.
+@lru_cache(maxsize=None)
+def _pdf_reader():
+    try:
+        from pypdf import PdfReader
+    except ImportError:  # pragma: no cover
+        return None
+    return PdfReader
+
+
+@lru_cache(maxsize=None)
+def _fitz():
+    try:
+        import fitz  # pymupdf
+    except ImportError:  # pragma: no cover
+        return None
+    return fitz
+
+
 def chunk_text(text: str, max_chunk_size: int = 800) -> List[Dict[str, str]]:
     """Split text into chunks respecting paragraph boundaries."""
     if not text.strip():
@@ -65,6 +78,9 @@ def extract_pdf_content(pdf_path: Path) -> Dict[str, any]:
         "success": bool,
         "errors": List[str]
     }
+
+    With an active cassette (:mod:`src.cassette`) the result, images
+    included, is recorded or replayed under the PDF's content hash.
     """
     if not pdf_path.exists() or not pdf_path.is_file():
         return {
@@ -75,7 +91,31 @@ def extract_pdf_content(pdf_path: Path) -> Dict[str, any]:
             "success": False,
             "errors": [f"Invalid PDF path: {pdf_path}"]
         }
+    if cassette.active_cassette() is None:
+        return _extract_pdf_content(pdf_path)
+    digest = hashlib.sha256(pdf_path.read_bytes()).hexdigest()
+    return cassette.through("pdf", {"sha256": digest}, lambda: _extract_pdf_content(pdf_path),
+                            encode=_encode_extraction, decode=_decode_extraction)
+
+
+def _encode_extraction(result: Dict[str, any]) -> Dict[str, any]:
+    images = [[p.name, cassette.encode_bytes(p.read_bytes())] for p in result["image_paths"]]
+    return dict({k: v for k, v in result.items() if k not in ("image_paths", "temp_dir")}, images=images)
+
+
+def _decode_extraction(recorded: Dict[str, any]) -> Dict[str, any]:
+    result = {k: v for k, v in recorded.items() if k != "images"}
+    result["image_paths"], result["temp_dir"] = [], None
+    if recorded["images"]:
+        tmp_dir = Path(tempfile.mkdtemp(prefix="audit_pdf_images_"))
+        result["temp_dir"] = tmp_dir
+        for name, data in recorded["images"]:
+            (tmp_dir / name).write_bytes(cassette.decode_bytes(data))
+            result["image_paths"].append(tmp_dir / name)
+    return result
 
+
+def _extract_pdf_content(pdf_path: Path) -> Dict[str, any]:
     result: Dict[str, any] = {
         "full_text": "",
         "chunks": [],
@@ -85,6 +125,8 @@ def extract_pdf_content(pdf_path: Path) -> Dict[str, any]:
         "errors": []
     }
 
+    PdfReader, fitz = _pdf_reader(), _fitz()
+
     # Text extraction (critical)
     if PdfReader is None:
         result["errors"].append("pypdf not installed")
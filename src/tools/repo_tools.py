@@ -1,31 +1,48 @@
 import ast
+import os
+import re
+import shutil
 import subprocess
+import tarfile
 import tempfile
+import zipfile
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from src import cassette
+
+REMOTE_SCHEMES = ("https", "http", "ssh", "git")
+# scp-like "user@host:path"
+_SCP_RE = re.compile(r"^[\w.-]+@[\w.-]+:")
+# git's "<transport>::<address>" remote-helper syntax (ext::, fd::, ...)
+_HELPER_RE = re.compile(r"^([A-Za-z][\w+.-]*)::")
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+DEFAULT_ARCHIVE_MAX_BYTES = 1 << 30
 
 
 class RepoCloneError(Exception):
-    """Raised when a repository cannot be cloned successfully."""
+    """Raised when a repository cannot be cloned, or a local source opened, successfully."""
 
 
 
-def safe_clone_repo(url: str) -> Tuple[Path, bool]:
+def safe_clone_repo(url: str, timeout: Optional[float] = None) -> Tuple[Path, bool]:
     """Clone a git repository to a temporary directory safely.
 
     The clone is shallow (depth 10) and uses ``subprocess.run`` for
     execution. The target directory is returned along with a boolean
     indicating success. Caller is responsible for cleaning up the
-    temporary directory (it will be removed automatically once
-    the returned :class:`pathlib.Path` object is out of scope if it
-    refers to a tempdir context manager, but this function returns the
-    actual path - use :func:`shutil.rmtree` or context manager when
-    needed).
+    temporary directory with :func:`shutil.rmtree`. See
+    :mod:`src.tools.async_git` for a non-blocking version. With an active
+    cassette (:mod:`src.cassette`) the checkout is recorded or replayed.
 
     Parameters
     ----------
     url : str
         The URL of the repository to clone.
+    timeout : float, optional
+        Seconds after which the clone is killed; ``None`` waits indefinitely.
 
     Returns
     -------
@@ -37,17 +54,33 @@ def safe_clone_repo(url: str) -> Tuple[Path, bool]:
     Raises
     ------
     RepoCloneError
-        If the git command fails in a way we cannot recover from.
+        If ``url`` is a local path or ``file://`` URL outside
+        ``LOCAL_SOURCES_ROOT`` (see :func:`check_clone_source`), the git
+        command fails in a way we cannot recover from, or does not finish
+        within ``timeout``.
     """
-    temp_dir = tempfile.TemporaryDirectory()
-    repo_path = Path(temp_dir.name)
+    check_clone_source(url)
+    recorder = cassette.active_cassette()
+    if recorder is not None:
+        return recorder.checkout(url, lambda: _clone_repo(url, timeout), root=lambda r: r[0],
+                                 replayed=lambda path: (path, True))
+    return _clone_repo(url, timeout)
+
 
-    cmd = ["git", "clone", "--depth", "10", url, str(repo_path)]
+def _clone_repo(url: str, timeout: Optional[float]) -> Tuple[Path, bool]:
+    # mkdtemp, not TemporaryDirectory: the latter's finalizer removed the
+    # clone as soon as this function returned
+    repo_path = Path(tempfile.mkdtemp(prefix="audit-clone-"))
+
+    cmd = ["git", "clone", "--depth", "10", "--", url, str(repo_path)]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        shutil.rmtree(repo_path, ignore_errors=True)
+        raise RepoCloneError(f"Cloning {url} timed out after {timeout:.0f}s")
     except subprocess.CalledProcessError as exc:
         # cleanup the temporary directory
-        temp_dir.cleanup()
+        shutil.rmtree(repo_path, ignore_errors=True)
         raise RepoCloneError(
             f"Failed to clone repository {url}: {exc.stderr.strip() or exc.stdout.strip()}"
         )
@@ -55,18 +88,21 @@ def safe_clone_repo(url: str) -> Tuple[Path, bool]:
     return repo_path, True
 
 
-def extract_git_history(path: Path) -> Tuple[int, list]:
+def extract_git_history(path: Path, timeout: Optional[float] = None) -> Tuple[int, list]:
     """Extract a summarized git history from a repository path.
 
     The function runs ``git log`` with ``--oneline`` and ``--reverse``
     to provide commits from oldest to newest. A simple dict with
     ``hash`` and ``message`` keys is returned for each commit along with
-    the total count.
+    the total count. With an active cassette the history is recorded or
+    replayed under the checkout's URL.
 
     Parameters
     ----------
     path : Path
         Path to the local git repository.
+    timeout : float, optional
+        Seconds after which ``git log`` is killed; ``None`` waits indefinitely.
 
     Returns
     -------
@@ -76,9 +112,19 @@ def extract_git_history(path: Path) -> Tuple[int, list]:
 
     Raises
     ------
+    FileNotFoundError
+        If ``path`` is neither a checkout with ``.git`` nor a bare repository.
     CalledProcessError
         If the git command fails.
+    TimeoutExpired
+        If the git command does not finish within ``timeout``.
     """
+    # keyed by where the checkout came from: the temporary path differs every run
+    return cassette.through("git.log", {"repo": cassette.origin(path)}, lambda: _git_log(path, timeout),
+                            decode=tuple)
+
+
+def _git_log(path: Path, timeout: Optional[float]) -> Tuple[int, list]:
     cmd = [
         "git",
         "-C",
@@ -88,7 +134,10 @@ def extract_git_history(path: Path) -> Tuple[int, list]:
         "--reverse",
         "--pretty=format:%H %s",
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    if not (Path(path) / ".git").exists() and not is_bare_repo(Path(path)):
+        # without this, git would walk up and report the history of an enclosing repository
+        raise FileNotFoundError(f"{path} has no .git directory; history is not available")
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=timeout)
     lines = [l.strip() for l in result.stdout.splitlines() if l.strip()]
     commits = []
     for line in lines:
@@ -99,6 +148,169 @@ def extract_git_history(path: Path) -> Tuple[int, list]:
     return len(commits), commits
 
 
+_local_sources_root: Optional[str] = None
+
+
+def configure_local_sources(root: Optional[str]) -> None:
+    """Allow local sources under ``root`` in this process (``None`` falls back to ``LOCAL_SOURCES_ROOT``)."""
+    global _local_sources_root
+    _local_sources_root = root
+
+
+def local_sources_root() -> Optional[Path]:
+    """The directory local sources must lie in, or ``None`` when they are not allowed (the default)."""
+    root = _local_sources_root or os.getenv("LOCAL_SOURCES_ROOT")
+    return Path(root).expanduser().resolve() if root else None
+
+
+def _local_path(source: str) -> Optional[Path]:
+    """The filesystem path ``source`` names (a ``file://`` URL or a plain path), else ``None``."""
+    if source.startswith("file://"):
+        return Path(unquote(urlparse(source).path))
+    if "://" in source or _SCP_RE.match(source) or _HELPER_RE.match(source):
+        return None
+    return Path(source).expanduser()
+
+
+def _allowed_local(path: Path) -> bool:
+    root = local_sources_root()
+    return root is not None and path.resolve().is_relative_to(root)
+
+
+def check_clone_source(url: str) -> None:
+    """Refuse to clone anything but a remote URL, unless it lies under ``LOCAL_SOURCES_ROOT``.
+
+    ``git clone`` reads local paths and ``file://`` URLs as readily as remote
+    ones, so without this a submitted "URL" could make the auditor read any
+    repository on the machine.
+    """
+    path = _local_path(url)
+    if path is None:
+        helper = _HELPER_RE.match(url)
+        scheme = helper.group(1) if helper else url.split("://", 1)[0].lower() if "://" in url else "ssh"
+        if scheme not in REMOTE_SCHEMES:
+            raise RepoCloneError(f"Unsupported repository URL scheme {scheme!r} in {url}")
+    elif not _allowed_local(path):
+        raise RepoCloneError(f"{url} is a local path; local sources are only audited under "
+                             f"LOCAL_SOURCES_ROOT (or --local-sources)")
+
+
+def is_local_source(source: str) -> bool:
+    """True when ``source`` is an existing local path under ``LOCAL_SOURCES_ROOT``.
+
+    Local sources are off unless that root is set, so a path submitted through
+    the service or the job queue is never read from the server's disk.
+    """
+    if source.startswith("file://"):
+        return False  # cloned like a remote, subject to the same root
+    path = _local_path(source)
+    return path is not None and path.exists() and _allowed_local(path)
+
+
+def is_bare_repo(path: Path) -> bool:
+    """True for a git directory without a working tree (``git init --bare``, a mirror)."""
+    return (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+
+
+def open_local_repo(source: str, timeout: Optional[float] = None) -> Tuple[Path, Optional[Path]]:
+    """Make a local submission auditable without touching the network.
+
+    ``source`` may be
+
+    - a directory (a CI checkout, with or without ``.git``): used in place and
+      never written to;
+    - a bare repository: cloned locally (hardlinks, no transfer) so the
+      detectors see a working tree and the full history;
+    - an archive (see ``ARCHIVE_SUFFIXES``): streamed into a temporary
+      directory. A single top-level directory, as in GitHub's source
+      exports, becomes the root.
+
+    Parameters
+    ----------
+    source : str
+        Path to the directory, bare repository or archive.
+    timeout : float, optional
+        Seconds after which a local clone is killed; ``None`` waits indefinitely.
+
+    Returns
+    -------
+    Tuple[Path, Optional[Path]]
+        The root to audit and the temporary directory the caller must remove
+        with :func:`shutil.rmtree` (``None`` when the source is used in place).
+
+    Raises
+    ------
+    RepoCloneError
+        If ``source`` is outside ``LOCAL_SOURCES_ROOT``, is none of the above, the archive is unsafe or larger
+        than ``ARCHIVE_MAX_BYTES`` unpacked, or the local clone fails.
+    """
+    if not is_local_source(source):
+        raise RepoCloneError(f"{source} is not an existing path under LOCAL_SOURCES_ROOT")
+    recorder = cassette.active_cassette()
+    if recorder is not None:
+        # a replayed snapshot is always a temporary copy, even of an in-place directory
+        return recorder.checkout(source, lambda: _open_local_repo(source, timeout), root=lambda r: r[0],
+                                 replayed=lambda path: (path, path))
+    return _open_local_repo(source, timeout)
+
+
+def _open_local_repo(source: str, timeout: Optional[float]) -> Tuple[Path, Optional[Path]]:
+    path = Path(source).expanduser().resolve()
+    if path.is_dir() and not is_bare_repo(path):
+        return path, None
+    if not path.is_dir() and not path.name.lower().endswith(ARCHIVE_SUFFIXES):
+        raise RepoCloneError(f"{source} is not a directory, bare repository or archive ({', '.join(ARCHIVE_SUFFIXES)})")
+
+    tmp = Path(tempfile.mkdtemp(prefix="audit-local-"))
+    try:
+        if path.is_dir():
+            checkout = tmp / path.name.removesuffix(".git")
+            cmd = ["git", "clone", "--quiet", str(path), str(checkout)]
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=timeout)
+            return checkout, tmp
+        _extract_archive(path, tmp)
+    except subprocess.TimeoutExpired:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RepoCloneError(f"Cloning {source} timed out after {timeout:.0f}s")
+    except subprocess.CalledProcessError as exc:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RepoCloneError(f"Failed to clone repository {source}: {exc.stderr.strip()}")
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as exc:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RepoCloneError(f"Failed to unpack {source}: {exc}")
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    entries = list(tmp.iterdir())
+    root = entries[0] if len(entries) == 1 and entries[0].is_dir() else tmp
+    return root, tmp
+
+
+def _extract_archive(archive: Path, dest: Path) -> None:
+    """Unpack ``archive`` into ``dest`` member by member, refusing paths outside it and bombs."""
+    limit = int(os.getenv("ARCHIVE_MAX_BYTES", DEFAULT_ARCHIVE_MAX_BYTES))
+    total = 0
+
+    def account(size: int, name: str) -> None:
+        nonlocal total
+        total += size
+        if total > limit:
+            raise RepoCloneError(f"{archive.name} unpacks to more than ARCHIVE_MAX_BYTES={limit} bytes (at {name})")
+
+    if archive.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                account(info.file_size, info.filename)
+                zf.extract(info, dest)  # strips absolute paths and ".." components
+        return
+    # "r|*": a forward-only stream, so the archive is never read twice or seeked
+    with tarfile.open(archive, "r|*") as tf:
+        for member in tf:
+            account(member.size, member.name)
+            # the "data" filter rejects absolute paths, "..", links leaving dest and device files
+            tf.extract(member, dest, filter="data")
+
+
 class GraphASTAnalyzer(ast.NodeVisitor):
     """Visitor that inspects Python source and collects information about a
     ``StateGraph`` usage.
@@ -184,3 +396,37 @@ def analyze_graph_structure(code_str: str) -> dict:
         "has_aggregator": has_agg,
         "has_conditional": has_cond,
     }
+
+
+class NormalizedTokenizer(ast.NodeVisitor):
+    """Flatten a module into AST node-type tokens with identifiers renamed away.
+
+    Names, attributes, arguments and definitions contribute only their node
+    type, string and number literals only their kind, and docstrings and
+    load/store contexts nothing, so renaming variables or rewording comments
+    does not change the token stream. Statements are closed with ``")"`` to
+    keep some of the block structure.
+    """
+
+    def __init__(self) -> None:
+        self.tokens: list[str] = []
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if isinstance(node, (ast.expr_context, ast.Module)):
+            return super().generic_visit(node)
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            return  # docstring or bare string
+        if isinstance(node, ast.Constant):
+            self.tokens.append(f"Constant:{type(node.value).__name__}")
+            return
+        self.tokens.append(type(node).__name__)
+        super().generic_visit(node)
+        if isinstance(node, ast.stmt):
+            self.tokens.append(")")
+
+
+def normalized_tokens(code_str: str) -> list[str]:
+    """Identifier-free AST token stream of Python source (see :class:`NormalizedTokenizer`)."""
+    tokenizer = NormalizedTokenizer()
+    tokenizer.visit(ast.parse(code_str))
+    return tokenizer.tokens
@@ -0,0 +1,259 @@
+"""Perceptual-hash cache for VisionInspector classifications.
+
+Images are fingerprinted with a 64-bit dHash or pHash computed with NumPy.
+Classifications are stored on disk keyed by that fingerprint and looked up
+through a BK-tree, so lightly edited copies of a diagram (re-exported,
+rescaled, recompressed) within ``max_distance`` bits are served from the cache
+instead of triggering a new vision call.
+
+The cache is off unless ``VISION_CACHE=true``. Its file is a JSON-lines log: a
+header naming the hash algorithm, then one line per stored classification,
+appended with a single ``O_APPEND`` write.
+"""
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Lazy imports for optional dependencies
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+HASH_ALGORITHMS = ("dhash", "phash")
+
+
+def _grayscale(image_path: Path, width: int, height: int) -> "np.ndarray":
+    if np is None or Image is None:
+        raise RuntimeError("numpy and Pillow are required for perceptual hashing")
+    with Image.open(image_path) as img:
+        img = img.convert("L").resize((width, height), Image.Resampling.LANCZOS)
+        return np.asarray(img, dtype=np.float64)
+
+
+def _bits_to_int(bits: "np.ndarray") -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def dhash(image_path: Path, hash_size: int = 8) -> int:
+    """Difference hash: sign of horizontal gradients on a tiny grayscale image."""
+    pixels = _grayscale(image_path, hash_size + 1, hash_size)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n: int) -> "np.ndarray":
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+def phash(image_path: Path, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """DCT hash: low-frequency DCT coefficients compared against their median."""
+    size = hash_size * highfreq_factor
+    pixels = _grayscale(image_path, size, size)
+    dct = _dct_matrix(size)
+    coeffs = (dct @ pixels @ dct.T)[:hash_size, :hash_size]
+    # ignore the DC term when picking the threshold
+    median = np.median(coeffs.ravel()[1:])
+    return _bits_to_int(coeffs > median)
+
+
+def image_hash(image_path: Path, algorithm: str = "phash") -> int:
+    if algorithm == "dhash":
+        return dhash(image_path)
+    if algorithm == "phash":
+        return phash(image_path)
+    raise ValueError(f"Unknown hash algorithm {algorithm!r}; expected one of {HASH_ALGORITHMS}")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes using Hamming distance.
+
+    Nodes are ``[hash, value, {distance: child}]`` lists. A radius search only
+    descends into children whose edge distance lies within
+    ``[d - radius, d + radius]`` of the query distance ``d``.
+    """
+
+    def __init__(self) -> None:
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: Dict) -> None:
+        if self._root is None:
+            self._root = [key, value, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            dist = hamming_distance(key, node[0])
+            if dist == 0:
+                node[1] = value
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [key, value, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, int, Dict]]:
+        """Return ``(distance, hash, value)`` tuples within ``radius``, closest first."""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = hamming_distance(key, node[0])
+            if dist <= radius:
+                found.append((dist, node[0], node[1]))
+            for edge, child in node[2].items():
+                if dist - radius <= edge <= dist + radius:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def items(self) -> Iterator[Tuple[int, Dict]]:
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node[0], node[1]
+            stack.extend(node[2].values())
+
+
+class VisionCache:
+    """Persistent near-duplicate cache of per-image vision classifications.
+
+    Values are small dicts (``classification``/``flow``) so that results from
+    the single-image and batched VisionInspector modes are interchangeable.
+    Each ``store`` appends one line to the file; the log is compacted on
+    load once superseded lines outnumber live entries.
+    """
+
+    def __init__(self, path: Path, max_distance: int = 6, algorithm: str = "phash") -> None:
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm {algorithm!r}")
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.algorithm = algorithm
+        self.hits = 0
+        self.misses = 0
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.is_file():
+            return
+        lines = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("algorithm") != self.algorithm:
+                    logger.info(f"Vision cache {self.path} uses {header.get('algorithm')}; starting empty")
+                    self._rewrite()
+                    return
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a write cut off mid-line
+                    self._tree.add(int(entry.pop("key"), 16), entry)
+                    lines += 1
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable vision cache {self.path}: {exc}")
+            return
+        if lines > 2 * len(self._tree):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """Replace the file with a header and one line per live entry."""
+        from src.reports import atomic_write
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(str(self.path), [json.dumps({"algorithm": self.algorithm}) + "\n"]
+                     + [_line(key, value) for key, value in self._tree.items()])
+
+    def _append(self, key: int, value: Dict) -> None:
+        if not self.path.is_file():
+            self._rewrite()
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, _line(key, value).encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def fingerprint(self, image_path: Path) -> int:
+        return image_hash(image_path, self.algorithm)
+
+    def lookup(self, image_path: Path, fingerprint: Optional[int] = None) -> Optional[Dict]:
+        """Return the cached classification of the closest near-duplicate, if any."""
+        key = self.fingerprint(image_path) if fingerprint is None else fingerprint
+        with self._lock:
+            matches = self._tree.search(key, self.max_distance)
+            if matches:
+                self.hits += 1
+                dist, _, value = matches[0]
+                return dict(value, distance=dist)
+            self.misses += 1
+            return None
+
+    def store(self, image_path: Path, value: Dict, fingerprint: Optional[int] = None) -> None:
+        key = self.fingerprint(image_path) if fingerprint is None else fingerprint
+        entry = {"classification": value.get("classification", ""), "flow": value.get("flow", "")}
+        with self._lock:
+            self._tree.add(key, entry)
+            self._append(key, entry)
+
+
+def _line(key: int, value: Dict) -> str:
+    return json.dumps(dict(value, key=f"{key:016x}")) + "\n"
+
+
+@lru_cache(maxsize=None)
+def _cache_for(path: str, max_distance: int, algorithm: str) -> VisionCache:
+    return VisionCache(Path(path), max_distance=max_distance, algorithm=algorithm)
+
+
+def get_vision_cache() -> Optional[VisionCache]:
+    """Return the process-wide cache configured through ``VISION_CACHE*`` env vars.
+
+    Returns ``None`` unless ``VISION_CACHE`` is set, or when NumPy/Pillow are missing.
+    """
+    if os.getenv("VISION_CACHE", "false").strip().lower() not in ("1", "true", "yes"):
+        return None
+    if np is None or Image is None:
+        return None
+    return _cache_for(
+        os.getenv("VISION_CACHE_PATH", ".cache/vision_cache.jsonl"),
+        int(os.getenv("VISION_CACHE_MAX_DISTANCE", "6")),
+        os.getenv("VISION_CACHE_HASH", "phash").strip().lower(),
+    )
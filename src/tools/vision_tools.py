@@ -0,0 +1,233 @@
+import base64
+import io
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Lazy imports for optional dependencies
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # pragma: no cover
+    Image = None
+    ImageDraw = None
+
+logger = logging.getLogger(__name__)
+
+_PAGE_RE = re.compile(r"page(\d+)_img(\d+)")
+
+# Images smaller than this on either side are almost always logos or icons.
+MIN_DIAGRAM_SIDE = 64
+
+SINGLE_IMAGE_PROMPT = (
+    "Analyze this architectural diagram. Is it a LangGraph State Machine diagram showing "
+    "parallel branching for Detectives and Judges (with EvidenceAggregator in between), or "
+    "just a generic flowchart? Reply ONLY with 'CLASSIFICATION: [classification]. FLOW: "
+    "[brief description]'."
+)
+
+
+def image_page(image_path: Path) -> Optional[int]:
+    """Return the 1-based PDF page an extracted image came from, if known."""
+    match = _PAGE_RE.search(Path(image_path).name)
+    return int(match.group(1)) if match else None
+
+
+def _image_score(image_path: Path) -> float:
+    """Heuristic "diagram-ness" score: large, roughly landscape images win."""
+    if Image is None:
+        return 0.0
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size
+    except Exception as exc:
+        logger.debug(f"Cannot open {image_path} for ranking: {exc}")
+        return -1.0
+    if min(width, height) < MIN_DIAGRAM_SIDE:
+        return 0.0
+    aspect = max(width, height) / min(width, height)
+    # banners and thin rules are not diagrams
+    penalty = 1.0 if aspect <= 4 else 4 / aspect
+    return float(width * height) * penalty
+
+
+def rank_images(image_paths: Sequence[Path], top_k: int = 3) -> List[Path]:
+    """Return the ``top_k`` images most likely to be architecture diagrams.
+
+    Ranking is stable, so without Pillow the extraction order is kept.
+    """
+    scored = [(-_image_score(Path(p)), i, Path(p)) for i, p in enumerate(image_paths)]
+    scored.sort()
+    return [p for score, _, p in scored if score <= 0][:top_k]
+
+
+def downscale_image(image_path: Path, max_side: int = 768) -> bytes:
+    """Return PNG bytes of the image with its longest side capped at ``max_side``.
+
+    Falls back to the raw file bytes when Pillow is unavailable.
+    """
+    if Image is None:
+        return Path(image_path).read_bytes()
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((max_side, max_side))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue()
+
+
+def build_contact_sheet(
+    image_paths: Sequence[Path], cell_size: int = 512, columns: int = 2
+) -> bytes:
+    """Tile images into a single labelled PNG contact sheet.
+
+    Each cell is numbered ``1..N`` in its top-left corner so the vision model
+    can refer to individual figures.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build a contact sheet")
+    if not image_paths:
+        raise ValueError("No images to tile")
+
+    columns = max(1, min(columns, len(image_paths)))
+    rows = (len(image_paths) + columns - 1) // columns
+    sheet = Image.new("RGB", (columns * cell_size, rows * cell_size), "white")
+    draw = ImageDraw.Draw(sheet)
+
+    for idx, path in enumerate(image_paths):
+        col, row = idx % columns, idx // columns
+        x0, y0 = col * cell_size, row * cell_size
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            img.thumbnail((cell_size - 8, cell_size - 28))
+            offset_x = x0 + (cell_size - img.width) // 2
+            offset_y = y0 + 24 + (cell_size - 24 - img.height) // 2
+            sheet.paste(img, (offset_x, offset_y))
+        draw.rectangle([x0, y0, x0 + cell_size - 1, y0 + cell_size - 1], outline="black")
+        draw.rectangle([x0, y0, x0 + 40, y0 + 20], fill="black")
+        draw.text((x0 + 6, y0 + 4), f"#{idx + 1}", fill="white")
+
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def to_data_url(data: bytes, mime: str = "image/png") -> str:
+    """Encode raw image bytes as a ``data:`` URL for multimodal messages."""
+    return f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+def build_batch_prompt(count: int, contact_sheet: bool) -> str:
+    """Instruction text asking for one classification per numbered image."""
+    layout = (
+        f"The attached contact sheet contains {count} figures, numbered #1 to #{count} "
+        "in the top-left corner of each cell."
+        if contact_sheet
+        else f"The following {count} images are numbered 1 to {count} in order."
+    )
+    return (
+        f"{layout} For EACH figure decide whether it is a LangGraph State Machine diagram "
+        "showing parallel branching for Detectives and Judges (with EvidenceAggregator in "
+        "between), a generic flowchart, or not a diagram at all. Reply ONLY with a JSON "
+        'array like [{"image": 1, "classification": "...", "flow": "brief description"}] '
+        "containing exactly one object per figure."
+    )
+
+
+def build_batch_content(
+    image_paths: Sequence[Path],
+    contact_sheet: bool = True,
+    max_side: int = 768,
+) -> List[Dict]:
+    """Build the multimodal message content for a batched classification call."""
+    paths = [Path(p) for p in image_paths]
+    if contact_sheet and Image is not None:
+        parts: List[Dict] = [{"type": "text", "text": build_batch_prompt(len(paths), True)}]
+        sheet = build_contact_sheet(paths, cell_size=max_side // 2 if len(paths) > 1 else max_side)
+        parts.append({"type": "image_url", "image_url": {"url": to_data_url(sheet)}})
+        return parts
+
+    parts = [{"type": "text", "text": build_batch_prompt(len(paths), False)}]
+    for idx, path in enumerate(paths):
+        parts.append({"type": "text", "text": f"Image {idx + 1}:"})
+        parts.append(
+            {"type": "image_url", "image_url": {"url": to_data_url(downscale_image(path, max_side))}}
+        )
+    return parts
+
+
+def is_parallel_classification(text: str) -> bool:
+    """Whether a classification describes a parallel StateGraph diagram."""
+    lowered = text.lower()
+    if "not parallel" in lowered or "non-parallel" in lowered:
+        return False
+    return "parallel" in lowered or "stategraph" in lowered or "state machine" in lowered
+
+
+def parse_single_classification(text: str) -> Dict:
+    """Split a ``CLASSIFICATION: x. FLOW: y`` reply into its two fields.
+
+    A reply without a classification is ``UNKNOWN``, as in :func:`parse_batch_classification`.
+    """
+    match = re.search(r"classification:\s*(.+?)(?:\.\s*flow:\s*(.*))?$", text.strip(), re.IGNORECASE | re.DOTALL)
+    if not match:
+        return {"classification": "UNKNOWN", "flow": ""}
+    return {"classification": match.group(1).strip(), "flow": (match.group(2) or "").strip()}
+
+
+def parse_batch_classification(text: str, count: int) -> List[Dict]:
+    """Parse the model reply into ``count`` per-image classification dicts.
+
+    Each dict has ``index`` (1-based), ``classification``, ``flow`` and
+    ``is_parallel`` keys. Figures the model skipped are reported as
+    ``UNKNOWN`` rather than dropped, so callers can always zip the result with
+    the images they sent.
+    """
+    results: Dict[int, Dict] = {}
+
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if match:
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            items = []
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get("image", 0))
+            except (TypeError, ValueError):
+                continue
+            if 1 <= idx <= count and idx not in results:
+                classification = str(item.get("classification", "UNKNOWN"))
+                results[idx] = {
+                    "index": idx,
+                    "classification": classification,
+                    "flow": str(item.get("flow", "")),
+                    "is_parallel": is_parallel_classification(classification),
+                }
+
+    if not results:
+        # tolerate "IMAGE 1: CLASSIFICATION: x. FLOW: y" style replies
+        for m in re.finditer(
+            r"(?:image|#)\s*(\d+)\W+classification:\s*(.+?)(?:\.\s*flow:\s*(.+?))?$",
+            text,
+            re.IGNORECASE | re.MULTILINE,
+        ):
+            idx = int(m.group(1))
+            if 1 <= idx <= count and idx not in results:
+                results[idx] = {
+                    "index": idx,
+                    "classification": m.group(2).strip(),
+                    "flow": (m.group(3) or "").strip(),
+                    "is_parallel": is_parallel_classification(m.group(2)),
+                }
+
+    return [
+        results.get(
+            i,
+            {"index": i, "classification": "UNKNOWN", "flow": "", "is_parallel": False},
+        )
+        for i in range(1, count + 1)
+    ]
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from src.batch import ManifestEntry
+from src.scheduler import PipelineScheduler
+from src.tools import async_git
+from src.tools.repo_tools import RepoCloneError
+
+
+@pytest.fixture(autouse=True)
+def local_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCAL_SOURCES_ROOT", str(tmp_path))  # the "remotes" here are local repositories
+
+
+def _git_repo(path, commits=3):
+    path.mkdir()
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+    for i in range(commits):
+        (path / f"f{i}.txt").write_text(str(i))
+        subprocess.run(git + ["add", "."], cwd=path, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", f"commit {i}"], cwd=path, check=True)
+    return path
+
+
+def _fake_git(tmp_path, monkeypatch, body):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "git"
+    script.write_text("#!/bin/sh\n" + body)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_clone_and_streamed_history(tmp_path):
+    origin = _git_repo(tmp_path / "origin")
+
+    async def audit():
+        path, ok = await async_git.safe_clone_repo(str(origin), timeout=30)
+        return path, ok, await async_git.extract_git_history(path, timeout=30)
+
+    path, ok, (count, commits) = asyncio.run(audit())
+    try:
+        assert ok and (path / "f2.txt").read_text() == "2"
+        assert count == 3 and [c["message"] for c in commits] == ["commit 0", "commit 1", "commit 2"]
+    finally:
+        import shutil
+
+        shutil.rmtree(path)
+
+
+def test_clone_with_history_reads_the_log_on_the_loop(tmp_path):
+    origin = _git_repo(tmp_path / "origin")
+    path, commits = asyncio.run(async_git.clone_with_history(str(origin), timeout=30))
+    try:
+        assert [c["message"] for c in commits] == ["commit 0", "commit 1", "commit 2"]
+    finally:
+        import shutil
+
+        shutil.rmtree(path)
+
+
+def test_async_git_options_require_pipeline(tmp_path):
+    from src.graph import main
+
+    for option in (["--async-git"], ["--max-clones", "2"]):
+        with pytest.raises(SystemExit):
+            main(["--manifest", str(tmp_path / "m.csv"), *option])
+
+
+def test_failed_clone_raises_and_leaves_nothing(tmp_path):
+    with pytest.raises(RepoCloneError, match="Failed to clone repository"):
+        asyncio.run(async_git.safe_clone_repo(str(tmp_path / "missing"), timeout=30))
+    results = asyncio.run(async_git.clone_many([str(tmp_path / "missing")]))
+    assert isinstance(results[0], RepoCloneError)
+
+
+def test_timeout_and_cancellation_kill_git(tmp_path, monkeypatch):
+    pids = tmp_path / "pids"
+    _fake_git(tmp_path, monkeypatch, f"echo $$ >> {pids}\nexec sleep 30\n")
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(async_git.run_git(["status"], timeout=0.3))
+
+    async def cancelled():
+        task = asyncio.ensure_future(async_git.run_git(["status"]))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled())
+    for pid in pids.read_text().split():
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid), 0)
+
+
+def test_clones_are_capped_per_loop(tmp_path, monkeypatch):
+    slots, counts = tmp_path / "slots", tmp_path / "counts"
+    slots.mkdir()
+    # "git clone --depth 10 <url> <dir>": record how many clones run at once
+    _fake_git(tmp_path, monkeypatch, f"mkdir {slots}/$$\nls {slots} | wc -l >> {counts}\nsleep 0.2\nrmdir {slots}/$$\n")
+    monkeypatch.setenv("GIT_MAX_CLONES", "2")
+
+    start = time.perf_counter()
+    paths = asyncio.run(async_git.clone_many([f"https://example.com/r{i}" for i in range(6)]))
+    assert all(p.is_dir() for p in paths)
+    assert max(int(n) for n in counts.read_text().split()) <= 2
+    assert time.perf_counter() - start >= 0.55
+
+
+def test_pipeline_clones_on_the_git_loop(tmp_path, monkeypatch):
+    from src.nodes.detectives import RepoInvestigator
+    from src.state import AuditReport, CriterionResult
+
+    class JudicialGraph:
+        seen = {}
+
+        def invoke(self, state, config):
+            self.seen[state["repo_url"]] = sorted(state["evidences"])
+            crit = CriterionResult(dimension_id="d", dimension_name="D", final_score=3, remediation="-")
+            return {"final_report": AuditReport(repo_url=state["repo_url"], executive_summary="-",
+                                                overall_score=3.0, criteria=[crit], remediation_plan="-")}
+
+    def empty(state):
+        return {"evidences": {}}
+
+    seen_paths = []
+
+    def investigator(state):
+        seen_paths.append(state.get("repo_path"))
+        return RepoInvestigator(state)
+
+    monkeypatch.setattr("src.scheduler.RepoInvestigator", investigator)
+    # the history was read on the git loop along with the clone
+    monkeypatch.setattr("src.tools.repo_tools.extract_git_history",
+                        lambda *a, **k: pytest.fail("git log should not run on the io worker"))
+    monkeypatch.setattr("src.scheduler.DETECTIVE_STAGES", (("io", investigator), ("cpu", empty), ("llm", empty)))
+    origin = _git_repo(tmp_path / "origin")
+    # file:// URLs: a bare local path would be audited in place instead of cloned
+    entries = [ManifestEntry(repo=origin.as_uri(), pdf="p.pdf"),
+               ManifestEntry(repo=(tmp_path / "gone").as_uri(), pdf="p.pdf")]
+
+    graph = JudicialGraph()
+    with PipelineScheduler(graph=graph, cpu_processes=False, async_git=True) as sched:
+        results = sched.run(entries, output_dir=str(tmp_path / "out"))
+
+    assert [r.status for r in results] == ["ok", "ok"]
+    assert graph.seen[origin.as_uri()] == ["git_forensic_analysis", "graph_orchestration", "safe_tool_engineering",
+                                       "state_management_rigor"]
+    assert graph.seen[(tmp_path / "gone").as_uri()] == ["general"]  # clone failure evidence
+    assert len(seen_paths) == 1 and not os.path.exists(seen_paths[0])  # cloned ahead, removed afterwards
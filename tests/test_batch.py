@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from src.batch import default_output_path, format_summary, load_manifest, run_manifest
+from src.concurrency import configure_limits, stage_slot, stage_stats
+from src.state import AuditReport, CriterionResult
+
+
+@pytest.fixture(autouse=True)
+def reset_limits():
+    yield
+    configure_limits(clone=None, extract=None, judge=None)
+
+
+def test_load_manifest_formats(tmp_path):
+    (tmp_path / "a.csv").write_text("repo,pdf,output\nhttps://github.com/a/x,x.pdf,\nhttps://github.com/b/y,/abs/y.pdf,out/y.md\n")
+    (tmp_path / "a.jsonl").write_text('{"repo": "https://github.com/a/x", "pdf": "x.pdf"}\n\n')
+
+    csv_entries = load_manifest(tmp_path / "a.csv")
+    assert csv_entries[0].pdf == str(tmp_path / "x.pdf")
+    assert csv_entries[0].output is None
+    assert csv_entries[1].pdf == "/abs/y.pdf"
+    assert csv_entries[1].output == str(tmp_path / "out/y.md")
+    assert load_manifest(tmp_path / "a.jsonl")[0].repo == "https://github.com/a/x"
+
+
+def test_default_output_path_is_unique_per_entry():
+    assert default_output_path("audit/batch", 7, "https://github.com/alice/auditor.git") == "audit/batch/007-alice_auditor.md"
+    assert default_output_path("out", 1, "https://github.com/a/r") != default_output_path("out", 2, "https://github.com/a/r")
+
+
+class FakeGraph:
+    """Stands in for a compiled graph; records peak concurrency."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def invoke(self, state, config):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        if "broken" in state["repo_url"]:
+            raise RuntimeError("boom")
+        crit = CriterionResult(dimension_id="d", dimension_name="D", final_score=4, remediation="-")
+        return {"final_report": AuditReport(
+            repo_url=state["repo_url"], executive_summary="ok", overall_score=4.0,
+            criteria=[crit], remediation_plan="-",
+        ), "output_path": state["output_path"]}
+
+
+def test_run_manifest_bounds_parallelism_and_keeps_order(tmp_path):
+    from src.batch import ManifestEntry
+
+    entries = [ManifestEntry(repo=f"https://github.com/u/r{i}", pdf="p.pdf") for i in range(6)]
+    entries.append(ManifestEntry(repo="https://github.com/u/broken", pdf="p.pdf"))
+    graph = FakeGraph()
+
+    results = run_manifest(entries, graph=graph, output_dir=str(tmp_path), max_audits=3)
+
+    assert graph.peak == 3
+    assert [r.repo for r in results] == [e.repo for e in entries]
+    assert len({r.output for r in results}) == len(entries)
+    assert results[0].status == "ok" and results[0].overall_score == 4.0
+    assert results[-1].status == "error"
+    assert "6/7 audits" in format_summary(results)
+
+
+def test_stage_slot_limits_concurrency():
+    configure_limits(clone=2)
+    peak = []
+
+    def work():
+        with stage_slot("clone"):
+            peak.append(stage_stats()["clone"]["active"])
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+    assert stage_stats()["clone"] == {"limit": 2, "active": 0, "waiting": 0}
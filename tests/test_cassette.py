@@ -0,0 +1,141 @@
+import gzip
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+import pytest
+
+from src import cassette
+from src.cassette import Cassette, CassetteMiss, ReplayedError, request_key, through
+from src.nodes import judges
+from src.state import JudicialOpinion
+from src.tools import doc_tools
+
+GRAPH = "from langgraph.graph import StateGraph\ng = StateGraph(dict)\ng.add_node('a', f)\ng.add_edge(START, 'a')\n"
+
+
+@pytest.fixture
+def tape(tmp_path, monkeypatch):
+    path = str(tmp_path / "run.cassette")
+    monkeypatch.setattr(cassette, "_configured", None)
+    judges._judge_llm.cache_clear()
+    judges.clear_opinion_cache()
+    yield path
+    judges._judge_llm.cache_clear()
+    judges.clear_opinion_cache()
+
+
+def test_keys_mask_temp_dirs():
+    a = {"content": f"Location: {tempfile.gettempdir()}/audit-clone-abc/src/graph.py"}
+    b = {"content": f"Location: {tempfile.gettempdir()}/audit-replay-xyz/src/graph.py"}
+    assert request_key("llm", a) == request_key("llm", b)
+    assert request_key("llm", a) != request_key("llm", {"content": "Location: src/graph.py"})
+    assert request_key("llm", a) != request_key("git.log", a)
+
+
+def test_record_then_replay_in_order_with_errors(tape, monkeypatch):
+    cassette.configure(tape, "record")
+    assert through("llm", {"q": 1}, lambda: "first") == "first"
+    assert through("llm", {"q": 1}, lambda: "second") == "second"
+
+    def fail():
+        raise RuntimeError("429 rate_limit")
+
+    with pytest.raises(RuntimeError):
+        through("llm", {"q": 2}, fail)
+    with open(tape, "ab") as fh:
+        fh.write(gzip.compress(b'{"kind": "llm", "key"')[:-5])  # a recording cut off mid-write
+
+    cassette.configure(tape, "replay")
+
+    def live():
+        raise AssertionError("went live during replay")
+
+    assert [through("llm", {"q": 1}, live) for _ in range(3)] == ["first", "second", "second"]
+    with pytest.raises(ReplayedError, match="429 rate_limit"):
+        through("llm", {"q": 2}, live)
+    with pytest.raises(CassetteMiss):
+        through("llm", {"q": 3}, live)
+    assert len(cassette.active_cassette()) == 3
+
+
+def test_replay_requires_a_cassette(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "_configured", None)
+    monkeypatch.delenv("CASSETTE", raising=False)
+    assert cassette.active_cassette() is None
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.cassette"))
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.cassette"), "rewind")
+
+
+class RandomJudge:
+    """Structured-output stand-in with the nondeterminism of a sampled LLM."""
+
+    calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    def invoke(self, messages, config=None):
+        RandomJudge.calls += 1
+        return JudicialOpinion(judge="Prosecutor", criterion_id="x", score=random.randint(1, 5),
+                               argument=f"draw {random.random()}")
+
+
+def _audit(tmp_path, repo_url):
+    from src.graph import build_auditor_graph, initial_state
+
+    state = initial_state(repo_url, str(tmp_path / "report.pdf"), str(tmp_path / "out" / "report.md"))
+    state["rubric_dimensions"] = [
+        {"id": "graph_orchestration", "name": "Graph Orchestration", "target_artifact": "github_repo"},
+        {"id": "git_forensic_analysis", "name": "Git Forensic Analysis", "target_artifact": "github_repo"},
+    ]
+    graph = build_auditor_graph().compile()
+    start = time.perf_counter()
+    final = graph.invoke(state, {"recursion_limit": 50})
+    return final, time.perf_counter() - start
+
+
+def test_full_audit_replays_offline_and_deterministically(tmp_path, tape, monkeypatch):
+    monkeypatch.setenv("LOCAL_SOURCES_ROOT", str(tmp_path))
+    origin = tmp_path / "origin"
+    (origin / "src").mkdir(parents=True)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q"], cwd=origin, check=True)
+    for i in range(5):
+        (origin / "src" / "graph.py").write_text(GRAPH + f"# {i}\n")
+        subprocess.run(git + ["add", "."], cwd=origin, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", f"step {i}"], cwd=origin, check=True)
+    (tmp_path / "report.pdf").write_bytes(b"%PDF-1.4 report")
+    monkeypatch.setattr(judges, "_chat_model", RandomJudge)
+    monkeypatch.setattr(doc_tools, "_extract_pdf_content", lambda path: {
+        "full_text": "StateGraph fan-out", "chunks": [{"text": "StateGraph fan-out", "chunk_index": 0}],
+        "image_paths": [], "temp_dir": None, "success": True, "errors": []})
+
+    cassette.configure(tape, "record")
+    recorded, _ = _audit(tmp_path, origin.as_uri())
+    assert RandomJudge.calls == 6
+
+    def offline(*args, **kwargs):
+        raise AssertionError("went live during replay")
+
+    monkeypatch.setattr(judges, "_chat_model", offline)
+    monkeypatch.setattr(doc_tools, "_extract_pdf_content", offline)
+    monkeypatch.setattr("src.tools.repo_tools._clone_repo", offline)
+    monkeypatch.setattr("src.tools.repo_tools._git_log", offline)
+    shutil.rmtree(origin)
+    judges._judge_llm.cache_clear()
+    judges.clear_opinion_cache()
+
+    cassette.configure(tape, "replay")
+    replayed, elapsed = _audit(tmp_path, origin.as_uri())
+
+    history = replayed["evidences"]["git_forensic_analysis"][0]
+    assert history.found and history.content == "5 commits. Example: step 0"
+    assert sorted((op.judge, op.criterion_id, op.score, op.argument) for op in replayed["opinions"]) == sorted(
+        (op.judge, op.criterion_id, op.score, op.argument) for op in recorded["opinions"])
+    assert replayed["final_report"].overall_score == recorded["final_report"].overall_score
+    assert elapsed < 1.0
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from src.checkpoint import CompactSerializer, default_audit_id, invoke_checkpointed, open_checkpointer, resume_status
+from src.state import Evidence, JudicialOpinion
+
+
+def _ev():
+    return Evidence(goal="g", found=True, content="x" * 2000, location="l", rationale="r", confidence=1.0)
+
+
+def test_compact_serializer_roundtrip_compresses_large_state():
+    serde = CompactSerializer()
+    value = {"evidences": {"graph_orchestration": [_ev()]}}
+    type_, data = serde.dumps_typed(value)
+    assert type_.startswith("z:")
+    assert len(data) < 2000
+    restored = serde.loads_typed((type_, data))
+    assert restored["evidences"]["graph_orchestration"][0] == _ev()
+
+
+def test_default_audit_id_is_stable(tmp_path):
+    pdf = tmp_path / "r.pdf"
+    assert default_audit_id("https://x/y", str(pdf)) == default_audit_id("https://x/y", str(pdf))
+    assert default_audit_id("https://x/y", str(pdf)) != default_audit_id("https://x/z", str(pdf))
+
+
+def test_resume_skips_completed_nodes(tmp_path, monkeypatch):
+    import src.graph as graph_mod
+
+    calls = {"RepoInvestigator": 0, "Defense": 0, "Prosecutor": 0}
+    state = {"fail": True}
+    judged = {"Defense": threading.Event(), "TechLead": threading.Event()}
+
+    def repo(s):
+        calls["RepoInvestigator"] += 1
+        return {"evidences": {"graph_orchestration": [_ev()]}}
+
+    def empty(s):
+        return {"evidences": {}}
+
+    def judge_criterion(s, name, prompt, dim):
+        calls[name] = calls.get(name, 0) + 1
+        if name == "Prosecutor" and state["fail"]:
+            # fail only once the other judges have their opinions
+            assert all(event.wait(10) for event in judged.values())
+            raise RuntimeError("rate limit storm")
+        if name in judged:
+            judged[name].set()
+        return JudicialOpinion(judge=name, criterion_id=dim["id"], score=4, argument="ok"), True
+
+    monkeypatch.setattr("src.nodes.detectives.RepoInvestigator", repo)
+    monkeypatch.setattr("src.nodes.detectives.DocAnalyst", empty)
+    monkeypatch.setattr("src.nodes.detectives.VisionInspector", empty)
+    monkeypatch.setattr("src.nodes.judges.judge_criterion", judge_criterion)
+
+    saver = open_checkpointer(str(tmp_path / "ck.sqlite"))
+    graph = graph_mod.build_auditor_graph().compile(checkpointer=saver)
+    initial = graph_mod.initial_state("https://x/y", "r.pdf", str(tmp_path / "report.md"))
+    initial["rubric_dimensions"] = [{"id": "graph_orchestration", "name": "Graph Orchestration"}]
+
+    with pytest.raises(RuntimeError):
+        invoke_checkpointed(graph, initial, "a1")
+    status = resume_status(graph, "a1")
+    assert status["exists"] and not status["complete"]
+    assert "graph_orchestration" in status["evidence_keys"]
+
+    state["fail"] = False
+    final = invoke_checkpointed(graph, initial, "a1", resume=True)
+
+    assert final["final_report"] is not None
+    assert {op.judge for op in final["opinions"]} == {"Prosecutor", "Defense", "TechLead"}
+    assert len(final["opinions"]) == 3
+    assert calls["RepoInvestigator"] == 1
+    assert calls["Defense"] == 1
+    assert calls["Prosecutor"] == 2
+    assert resume_status(graph, "a1")["complete"]
+
+    # resuming a finished audit returns the stored result without running anything
+    assert invoke_checkpointed(graph, initial, "a1", resume=True)["final_report"] == final["final_report"]
+    assert calls["RepoInvestigator"] == 1
+
+
+def test_resume_gets_a_fresh_budget(tmp_path, monkeypatch):
+    import time
+
+    import src.graph as graph_mod
+    from src import deadline
+
+    for name in ("BUDGET_VISION_MIN_S", "BUDGET_JUDGE_BATCH_S", "BUDGET_JUDGE_MIN_S"):
+        monkeypatch.setenv(name, "0")
+    crash = {"on": True}
+    left = []
+
+    def empty(s):
+        return {"evidences": {}}
+
+    def judge_criterion(s, name, prompt, dim):
+        if crash["on"]:
+            raise RuntimeError("worker killed")
+        left.append(deadline.remaining(s))
+        return JudicialOpinion(judge=name, criterion_id=dim["id"], score=4, argument="ok"), True
+
+    monkeypatch.setattr("src.nodes.detectives.RepoInvestigator",
+                        lambda s: {"evidences": {"graph_orchestration": [_ev()]}})
+    monkeypatch.setattr("src.nodes.detectives.DocAnalyst", empty)
+    monkeypatch.setattr("src.nodes.detectives.VisionInspector", empty)
+    monkeypatch.setattr("src.nodes.judges.judge_criterion", judge_criterion)
+
+    graph = graph_mod.build_auditor_graph().compile(checkpointer=open_checkpointer(str(tmp_path / "ck.sqlite")))
+    first = graph_mod.initial_state("https://x/y", "r.pdf", str(tmp_path / "report.md"), time_budget=0.2)
+    first["rubric_dimensions"] = [{"id": "graph_orchestration", "name": "Graph Orchestration"}]
+    with pytest.raises(RuntimeError):
+        invoke_checkpointed(graph, first, "a2")
+    while not deadline.expired(first):
+        time.sleep(0.01)
+
+    crash["on"] = False
+    again = dict(first, deadline=deadline.deadline_after(600))
+    final = invoke_checkpointed(graph, again, "a2", resume=True)
+
+    assert len(final["opinions"]) == 3
+    assert len(left) == 3 and all(t > 500 for t in left)
@@ -0,0 +1,222 @@
+import subprocess
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import deadline
+from src.state import Evidence, JudicialOpinion
+
+
+@pytest.fixture
+def task_state():
+    return {
+        "repo_url": "https://github.com/example/test",
+        "rubric_dimensions": [
+            {"id": "dim_a", "name": "Dimension A", "target_artifact": "github_repo"},
+            {"id": "dim_b", "name": "Dimension B", "target_artifact": "github_repo"},
+        ],
+        "evidences": {
+            "dim_a": [Evidence(goal="A", found=True, location="a.py", rationale="ok", confidence=1.0)],
+            "dim_b": [Evidence(goal="B", found=False, location="b.py", rationale="missing", confidence=1.0)],
+        },
+        "previous_audit": None,
+    }
+
+
+def test_timeouts_follow_the_remaining_budget(monkeypatch):
+    monkeypatch.setenv("GIT_CLONE_TIMEOUT", "300")
+    assert deadline.timeout_for({}) is None
+    assert deadline.timeout_for({}, "GIT_CLONE_TIMEOUT") == 300
+    assert deadline.timeout_for({"deadline": None}, "GIT_CLONE_TIMEOUT") == 300
+
+    state = {"deadline": time.time() + 30}
+    assert 29 < deadline.timeout_for(state, "GIT_CLONE_TIMEOUT") <= 30
+    assert 29 < deadline.timeout_for(state) <= 30
+
+    with pytest.raises(deadline.DeadlineExceeded):
+        deadline.timeout_for({"deadline": time.time() - 1})
+    assert deadline.expired({"deadline": time.time() - 1})
+
+
+def test_budget_env_and_judge_modes(monkeypatch):
+    monkeypatch.setenv("AUDIT_TIME_BUDGET", "100")
+    assert 99 < deadline.deadline_after(None) - time.time() <= 100
+    monkeypatch.delenv("AUDIT_TIME_BUDGET")
+    assert deadline.deadline_after(None) is None
+
+    monkeypatch.setenv("BUDGET_JUDGE_BATCH_S", "120")
+    monkeypatch.setenv("BUDGET_JUDGE_MIN_S", "20")
+    assert deadline.judge_mode({}) == "full"
+    assert deadline.judge_mode({"deadline": time.time() + 500}) == "full"
+    assert deadline.judge_mode({"deadline": time.time() + 60}) == "batched"
+    assert deadline.judge_mode({"deadline": time.time() + 5}) == "deterministic"
+
+
+def test_call_with_timeout_abandons_slow_calls():
+    assert deadline.call_with_timeout(lambda: 42, None) == 42
+    assert deadline.call_with_timeout(lambda: 42, 5) == 42
+    with pytest.raises(deadline.DeadlineExceeded):
+        deadline.call_with_timeout(lambda: time.sleep(1), 0.05)
+
+
+def test_abandoned_calls_keep_their_slot_until_they_end():
+    import threading
+
+    from src.concurrency import configure_limits, stage_stats
+
+    configure_limits(judge=1)
+    try:
+        unblock = threading.Event()
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.call_with_timeout(unblock.wait, 0.05, stage="judge")
+        assert stage_stats()["judge"]["active"] == 1
+        unblock.set()
+        # the next call only gets the slot once the abandoned one has returned
+        assert deadline.call_with_timeout(lambda: 42, lambda: 5, stage="judge") == 42
+        assert stage_stats()["judge"]["active"] == 0
+    finally:
+        configure_limits(judge=None)
+
+
+def test_sleep_within_never_passes_the_deadline(monkeypatch):
+    slept = []
+    monkeypatch.setattr(deadline.time, "sleep", slept.append)
+    assert not deadline.sleep_within({"deadline": time.time() + 5}, 10)
+    assert deadline.sleep_within({"deadline": time.time() + 50}, 10)
+    assert slept == [10]
+
+
+def test_clone_timeout_raises_clone_error(monkeypatch):
+    from src.tools import repo_tools
+
+    def fake_run(cmd, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    monkeypatch.setattr(repo_tools.subprocess, "run", fake_run)
+    with pytest.raises(repo_tools.RepoCloneError, match="timed out after 7s"):
+        repo_tools.safe_clone_repo("https://example.com/repo.git", timeout=7)
+
+
+def test_low_budget_batches_judges(task_state, monkeypatch):
+    from src.nodes import judges
+
+    judges.clear_opinion_cache()
+    monkeypatch.setenv("BUDGET_JUDGE_BATCH_S", "120")
+    monkeypatch.setenv("BUDGET_JUDGE_MIN_S", "20")
+    task_state["deadline"] = time.time() + 60
+    sends = judges.fan_out_judges(task_state)
+    assert [s.arg["judge"] for s in sends] == ["Prosecutor", "Defense", "TechLead"]
+    assert all(len(s.arg["dimensions"]) == 2 and s.arg["deadline"] == task_state["deadline"] for s in sends)
+
+    batch_llm = MagicMock()
+    # the model covers only one of the two dimensions; the other is scored from evidence
+    batch_llm.invoke.return_value = judges.JudgeBatch(opinions=[
+        JudicialOpinion(judge="TechLead", criterion_id="dim_a", score=4, argument="fine"),
+    ])
+    monkeypatch.setattr(judges, "_judge_batch_llm", lambda: batch_llm)
+    update = judges.JudgeCriterion(sends[0].arg)
+    first, second = update["opinions"]
+    assert (first.judge, first.criterion_id, first.score) == ("Prosecutor", "dim_a", 4)
+    assert judges.is_deterministic(second) and second.score == 1
+    assert batch_llm.invoke.call_count == 1
+    assert any("batched" in note for note in update["degradations"])
+    assert any("deterministically" in note for note in update["degradations"])
+
+
+def test_exhausted_budget_scores_deterministically(task_state, monkeypatch):
+    from src.nodes import judges
+
+    judges.clear_opinion_cache()
+    llm = MagicMock()
+    monkeypatch.setattr(judges, "_judge_llm", lambda: llm)
+    monkeypatch.setattr(judges, "_judge_batch_llm", lambda: llm)
+    task_state["deadline"] = time.time() - 1
+
+    op, called_llm = judges.judge_criterion(task_state, "Defense", "", task_state["rubric_dimensions"][0])
+    assert not called_llm and op.score == 5 and judges.is_deterministic(op)
+
+    task = judges.fan_out_judges(task_state)[0].arg
+    update = judges.JudgeCriterion(task)
+    assert [op.score for op in update["opinions"]] == [5, 1]
+    assert update["degradations"] == [
+        "Judges scored some dimensions deterministically from evidence, without an LLM call"
+    ]
+    llm.invoke.assert_not_called()
+
+
+def test_judge_call_cut_off_by_deadline(task_state, monkeypatch):
+    from src.nodes import judges
+
+    judges.clear_opinion_cache()
+    monkeypatch.setenv("BUDGET_JUDGE_BATCH_S", "0")
+    monkeypatch.setenv("BUDGET_JUDGE_MIN_S", "0")
+    llm = MagicMock()
+    llm.invoke.side_effect = lambda *a, **k: time.sleep(2)
+    monkeypatch.setattr(judges, "_judge_llm", lambda: llm)
+    task_state["deadline"] = time.time() + 0.2
+
+    op, called_llm = judges.judge_criterion(task_state, "TechLead", "", task_state["rubric_dimensions"][0])
+    assert called_llm and judges.is_deterministic(op)
+    assert llm.invoke.call_count == 1
+
+
+def test_vision_skipped_when_budget_low(monkeypatch, tmp_path):
+    from src.nodes import detectives
+
+    monkeypatch.setenv("BUDGET_VISION_MIN_S", "180")
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    monkeypatch.setattr(detectives.doc_tools, "extract_pdf_content",
+                        lambda path: pytest.fail("vision should not extract images"))
+    update = detectives.VisionInspector({"pdf_path": str(pdf), "deadline": time.time() + 60})
+    assert "evidences" not in update
+    assert update["degradations"][0].startswith("VisionInspector skipped")
+
+
+def test_vision_timeout_counts_the_wait_for_the_llm_slot(monkeypatch, tmp_path):
+    import threading
+
+    from src.concurrency import acquire_slot, configure_limits
+    from src.nodes import detectives
+
+    monkeypatch.setenv("BUDGET_VISION_MIN_S", "0")
+    monkeypatch.setenv("VISION_MODE", "single")
+    monkeypatch.setenv("VISION_CACHE", "false")
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    image = tmp_path / "page1_img0.png"
+    image.write_bytes(b"png")
+    monkeypatch.setattr(detectives.doc_tools, "extract_pdf_content",
+                        lambda path: {"image_paths": [image], "temp_dir": None})
+    llm = MagicMock()
+    monkeypatch.setattr(detectives, "_vision_llm", lambda: llm)
+
+    configure_limits(judge=1)
+    try:
+        # a judge holds the only LLM slot until the audit's deadline has passed
+        threading.Timer(0.5, acquire_slot("judge")).start()
+        update = detectives.VisionInspector({"pdf_path": str(pdf), "deadline": time.time() + 0.2})
+    finally:
+        configure_limits(judge=None)
+    assert update["degradations"][0].startswith("VisionInspector cut off by the deadline")
+    llm.invoke.assert_not_called()
+
+
+def test_report_lists_degradations(tmp_path):
+    from src.nodes.justice import ChiefJusticeNode
+
+    out = tmp_path / "report.md"
+    note = "Judges batched: one LLM call per judge covering every dimension"
+    result = ChiefJusticeNode({
+        "repo_url": "https://github.com/example/test",
+        "evidences": {},
+        "opinions": [],
+        "output_path": str(out),
+        "degradations": ["VisionInspector skipped: diagrams not classified (150s of budget left)", note, note],
+    })
+    report = result["final_report"]
+    assert report.degradations == ["VisionInspector skipped: diagrams not classified (150s of budget left)", note]
+    assert "degraded mode" in report.executive_summary
+    text = out.read_text(encoding="utf-8")
+    assert "## Degraded Mode" in text and f"- {note}" in text
@@ -0,0 +1,106 @@
+import pytest
+
+from src import fingerprint
+from src.fingerprint import audit_key, tree_hash, tree_hashes
+from src.nodes import detectives
+from src.state import AuditReport, CriterionResult, JudicialOpinion
+
+DIMS = [{"id": "graph_orchestration", "name": "Graph Orchestration", "target_artifact": "github_repo"}]
+
+
+@pytest.fixture
+def dedupe(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "_configured", True)
+    monkeypatch.setenv("AUDIT_DEDUPE_PATH", str(tmp_path / "dedupe"))
+    return fingerprint.active_store()
+
+
+def _repo(root, graph="from langgraph.graph import StateGraph\n"):
+    (root / "src" / "nodes").mkdir(parents=True, exist_ok=True)
+    (root / "src" / "graph.py").write_text(graph)
+    (root / "src" / "nodes" / "judges.py").write_text("x = 1\n")
+    (root / "README.md").write_text("not audited")
+    return root
+
+
+def test_tree_hash_tracks_relevant_content_and_history(tmp_path):
+    a, b = _repo(tmp_path / "a"), _repo(tmp_path / "b")
+    (b / "README.md").write_text("changed, but not read by the detectors")
+    assert tree_hash(a, ["c1"]) == tree_hash(b, ["c1"])
+    assert tree_hash(a, ["c1"]) != tree_hash(a, ["c1", "c2"])
+
+    before = tree_hashes(a)
+    (a / "src" / "nodes" / "judges.py").write_text("x = 2\n")
+    after = tree_hashes(a)
+    assert before["src"] != after["src"] and before["src/nodes"] != after["src/nodes"]
+    assert set(after) == {"", "src", "src/nodes"}
+
+
+def test_duplicate_repo_reuses_stored_evidence(tmp_path, monkeypatch, dedupe):
+    clones = iter([_repo(tmp_path / "clone1"), _repo(tmp_path / "clone2")])
+    monkeypatch.setattr(detectives.repo_tools, "safe_clone_repo", lambda url, timeout=None: (next(clones), True))
+    monkeypatch.setattr(detectives.repo_tools, "extract_git_history",
+                        lambda path, timeout=None: (1, [{"hash": "abc", "message": "init"}]))
+
+    first = detectives.RepoInvestigator({"repo_url": "https://github.com/u/original"})
+
+    def reanalyzed(content):
+        raise AssertionError("duplicate repository was analyzed again")
+
+    monkeypatch.setattr(detectives.repo_tools, "analyze_graph_structure", reanalyzed)
+    second = detectives.RepoInvestigator({"repo_url": "https://github.com/v/fork"})
+
+    assert second["fingerprints"] == first["fingerprints"]
+    assert second["evidences"] == first["evidences"] and second["commit"] == "abc"
+    assert dedupe.has("repo", first["fingerprints"]["repo"])
+
+
+def _finished_state(repo_url, argument="solid"):
+    opinions = [JudicialOpinion(judge=j, criterion_id="graph_orchestration", score=4, argument=argument)
+                for j in ("Prosecutor", "Defense", "TechLead")]
+    return {
+        "repo_url": repo_url,
+        "rubric_dimensions": DIMS,
+        "evidences": {},
+        "opinions": opinions,
+        "fingerprints": {"repo": "r" * 64, "pdf": "p" * 64},
+    }
+
+
+def test_identical_audit_is_remembered_and_reused(tmp_path, dedupe):
+    from src.nodes.judges import fan_out_judges
+    from src.nodes.justice import ChiefJusticeNode
+
+    original = _finished_state("https://github.com/u/original")
+    ChiefJusticeNode(dict(original, output_path=str(tmp_path / "a.md")))
+    assert dedupe.has("audit", audit_key(original))
+
+    fork = dict(_finished_state("https://github.com/v/fork"), output_path=str(tmp_path / "b.md"))
+    sends = fan_out_judges(fork)
+    previous = sends[0].arg["previous_audit"]
+    assert [op.argument for op in previous["opinions"]] == ["solid"] * 3
+
+    report = ChiefJusticeNode(fork)["final_report"]
+    assert "identical to the earlier audit of https://github.com/u/original" in report.executive_summary
+
+
+def test_fallback_and_degraded_audits_are_not_remembered(tmp_path, dedupe):
+    from src.nodes.justice import ChiefJusticeNode
+
+    failed = _finished_state("https://github.com/u/r", argument="Failed to generate opinion: timeout")
+    ChiefJusticeNode(dict(failed, output_path=str(tmp_path / "a.md")))
+    degraded = dict(_finished_state("https://github.com/u/r"), degradations=["vision skipped"])
+    ChiefJusticeNode(dict(degraded, output_path=str(tmp_path / "b.md")))
+    assert not dedupe.has("audit", audit_key(failed))
+
+    assert audit_key({"fingerprints": {"repo": "r" * 64}}) is None
+
+
+def test_dedupe_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(fingerprint, "_configured", None)
+    monkeypatch.delenv("AUDIT_DEDUPE", raising=False)
+    assert fingerprint.active_store() is None
+    report = AuditReport(repo_url="u", executive_summary="-", overall_score=4.0, remediation_plan="-",
+                         criteria=[CriterionResult(dimension_id="a", dimension_name="A", final_score=4,
+                                                   remediation="-")])
+    fingerprint.remember_audit(_finished_state("u"), report)  # no store: a no-op
@@ -0,0 +1,110 @@
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.incremental import build_record, changed_dimensions, finalize_record, load_record, previous_audit, record_path
+from src.nodes.judges import JudgeCriterion, evidence_fingerprint
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+DIMS = [
+    {"id": "graph_orchestration", "name": "Graph Orchestration", "target_artifact": "github_repo"},
+    {"id": "safe_tool_engineering", "name": "Safe Tool Engineering", "target_artifact": "github_repo"},
+]
+
+
+def _state(graph_content="StateGraph fan-out", clone_dir="tmpaaaa"):
+    location = f"{tempfile.gettempdir()}/{clone_dir}/src/graph.py"
+    return {
+        "repo_url": "https://github.com/u/r",
+        "rubric_dimensions": DIMS,
+        "evidences": {
+            "graph_orchestration": [Evidence(goal="g", found=True, content=graph_content,
+                                             location=location, rationale="r", confidence=0.9)],
+            "safe_tool_engineering": [Evidence(goal="s", found=True, content="tempfile used",
+                                               location="src/tools/", rationale="r", confidence=0.9)],
+        },
+        "opinions": [],
+    }
+
+
+def _op(dim, score=4, judge="Prosecutor"):
+    return JudicialOpinion(judge=judge, criterion_id=dim, score=score, argument="previous")
+
+
+def _prosecute(state):
+    """The Prosecutor's opinions on every dimension, one ``JudgeCriterion`` task each."""
+    return [op for dim in DIMS for op in JudgeCriterion(dict(state, judge="Prosecutor", dimension=dim))["opinions"]]
+
+
+def test_fingerprint_ignores_temp_clone_dir_but_not_content():
+    dim = DIMS[0]
+    assert evidence_fingerprint(dim, _state(clone_dir="tmpaaaa")) == evidence_fingerprint(dim, _state(clone_dir="tmpbbbb"))
+    assert evidence_fingerprint(dim, _state()) != evidence_fingerprint(dim, _state(graph_content="linear pipeline"))
+
+
+def test_judge_only_calls_llm_for_changed_dimensions(monkeypatch):
+    old = _state()
+    new = _state(graph_content="linear pipeline", clone_dir="tmpcccc")
+    new["previous_audit"] = {
+        "dimension_hashes": {d["id"]: evidence_fingerprint(d, old) for d in DIMS},
+        "opinions": [_op("graph_orchestration", 5), _op("safe_tool_engineering", 2)],
+    }
+    llm = MagicMock()
+    llm.invoke.return_value = _op("graph_orchestration", 1)
+    monkeypatch.setattr("src.nodes.judges._judge_llm", lambda: llm)
+
+    opinions = _prosecute(new)
+
+    assert llm.invoke.call_count == 1
+    scores = {op.criterion_id: op.score for op in opinions}
+    assert scores == {"graph_orchestration": 1, "safe_tool_engineering": 2}
+
+
+def test_fallback_and_deterministic_opinions_are_not_reused(monkeypatch):
+    from src.nodes.judges import clear_opinion_cache
+
+    clear_opinion_cache()
+    state = _state()
+    fallback = JudicialOpinion(judge="Prosecutor", criterion_id="graph_orchestration", score=3,
+                               argument="Rate limit exceeded after 3 retries: 429")
+    budget = JudicialOpinion(judge="Prosecutor", criterion_id="safe_tool_engineering", score=3,
+                             argument="Deterministic score from evidence")
+    state["previous_audit"] = {
+        "dimension_hashes": {d["id"]: evidence_fingerprint(d, state) for d in DIMS},
+        "opinions": [fallback, budget],
+    }
+    llm = MagicMock()
+    llm.invoke.side_effect = lambda messages, config=None: _op("x", 5)
+    monkeypatch.setattr("src.nodes.judges._judge_llm", lambda: llm)
+
+    opinions = _prosecute(state)
+
+    assert llm.invoke.call_count == 2
+    assert {op.criterion_id: op.score for op in opinions} == {"graph_orchestration": 5, "safe_tool_engineering": 5}
+
+
+def test_record_roundtrip_and_changed_dimensions(tmp_path):
+    state = _state()
+    state["final_report"] = AuditReport(
+        repo_url=state["repo_url"], executive_summary="-", overall_score=4.0, remediation_plan="-",
+        criteria=[CriterionResult(dimension_id=d["id"], dimension_name=d["name"], final_score=4,
+                                  judge_opinions=[_op(d["id"])], remediation="-") for d in DIMS],
+    )
+    output = str(tmp_path / "report.md")
+
+    assert finalize_record(state, output) == ["graph_orchestration", "safe_tool_engineering"]
+    record = load_record(record_path(output))
+    assert record_path(output).endswith("report.record.json")
+    assert len(record.opinions) == 2
+    assert previous_audit(record, "https://github.com/other/repo") is None
+
+    changed = build_record(dict(state, evidences=_state(graph_content="new").get("evidences")))
+    assert changed_dimensions(record, changed) == ["graph_orchestration"]
+
+
+def test_incremental_is_rejected_in_pipeline_mode(tmp_path):
+    from src.graph import main
+
+    with pytest.raises(SystemExit):
+        main(["--manifest", str(tmp_path / "m.csv"), "--pipeline", "--incremental"])
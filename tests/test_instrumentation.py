@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src import instrumentation
+from src.instrumentation import count, instrument_node, llm_config, prometheus_snapshot, span, summary_table
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    rec = instrumentation.configure(trace_path=str(tmp_path / "trace.jsonl"))
+    yield rec
+    instrumentation.disable()
+
+
+def test_disabled_span_records_nothing():
+    instrumentation.disable()
+    instrumentation.RECORDER.reset()
+    with span("llm", "judge.Prosecutor") as sp:
+        sp["retries"] = 2
+    count("cache_hits")
+    assert instrumentation.RECORDER.spans == []
+    assert instrumentation.RECORDER.counters == {}
+    assert llm_config({}) == {}
+
+
+def test_span_records_timing_attrs_and_errors(recorder):
+    with span("git", "git.clone", repo="r") as sp:
+        sp["retries"] = 1
+    with pytest.raises(ValueError):
+        with span("git", "git.clone"):
+            raise ValueError("boom")
+
+    ok, failed = recorder.spans
+    assert ok["status"] == "ok" and failed["status"] == "error"
+    assert ok["retries"] == 1 and ok["repo"] == "r"
+    assert ok["wall_s"] >= 0 and ok["cpu_s"] >= 0
+    assert "memory_delta_bytes" in ok and ok["process_peak_bytes"] > 0
+
+    lines = recorder.trace_path.read_text().splitlines()
+    assert [json.loads(line)["status"] for line in lines] == ["ok", "error"]
+
+
+def test_usage_callback_collects_tokens(recorder):
+    with span("llm", "vision.batch") as sp:
+        callback = llm_config(sp)["callbacks"][0]
+        message = AIMessage(content="ok", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+        callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+        callback.on_llm_end(LLMResult(generations=[[]], llm_output={"token_usage": {"prompt_tokens": 5, "completion_tokens": 1}}))
+    entry = recorder.spans[0]
+    assert entry["prompt_tokens"] == 125
+    assert entry["completion_tokens"] == 31
+
+
+def test_instrument_node_tags_spans_with_audit(recorder):
+    def Detective(state):
+        with span("pdf", "pdf.extract"):
+            pass
+        return {"evidences": {}}
+
+    node = instrument_node("Detective", Detective)
+    assert node.__name__ == "Detective"
+    assert node({"repo_url": "https://github.com/a/x"}) == {"evidences": {}}
+
+    inner, outer = recorder.spans
+    assert (outer["kind"], outer["name"]) == ("node", "Detective")
+    assert inner["audit"] == outer["audit"] == "https://github.com/a/x"
+
+
+def test_prometheus_snapshot_and_summary(recorder):
+    for hit in (True, False):
+        with span("cache", "vision.lookup") as sp:
+            sp["cache_hit"] = hit
+    count("cache_hits", cache="vision")
+
+    text = prometheus_snapshot(recorder)
+    assert '# TYPE auditor_span_count counter' in text
+    assert 'auditor_span_count{kind="cache",name="vision.lookup"} 2' in text
+    assert 'auditor_span_cache_hits_total{kind="cache",name="vision.lookup"} 1' in text
+    assert 'auditor_events_total{event="cache_hits",cache="vision"} 1' in text
+
+    table = summary_table(recorder)
+    assert "| cache | vision.lookup | 2 |" in table
+    assert "cache_hits (cache=vision): 1" in table
+
+
+def test_nested_spans_keep_the_outer_peak(recorder):
+    with span("node", "RepoInvestigator"):
+        big = bytearray(4_000_000)
+        del big
+        with span("llm", "judge.Prosecutor"):
+            pass
+    inner, outer = recorder.spans
+    # the inner span must not have reset the peak the outer one saw
+    assert outer["process_peak_bytes"] >= 4_000_000
+    assert abs(outer["memory_delta_bytes"]) < 4_000_000
@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+from src.batch import BatchResult, ManifestEntry
+from src.jobqueue import JobQueue, format_status, run_worker
+from src.state import AuditReport, CriterionResult
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), clock=clock, backoff_s=10)
+
+
+def _entries(n):
+    return [ManifestEntry(repo=f"https://github.com/u/r{i}", pdf="p.pdf") for i in range(n)]
+
+
+def _ok(output="out.md"):
+    return BatchResult(repo="r", output=output, status="ok", overall_score=4.0, duration_s=2.0)
+
+
+def test_lease_is_exclusive_and_complete_records_result(queue):
+    queue.enqueue(_entries(2))
+    a, b = queue.lease("w1"), queue.lease("w2")
+    assert (a.id, b.id) == (1, 2) and a.attempts == 1
+    assert queue.lease("w3") is None
+
+    assert not queue.complete(a.id, "w2", _ok())  # not the lease owner
+    assert queue.complete(a.id, "w1", _ok())
+    done = queue.get(a.id)
+    assert done.status == "done" and done.overall_score == 4.0 and done.result_status == "ok"
+
+
+def test_expired_lease_is_reclaimed_and_heartbeat_keeps_it(queue, clock):
+    queue.enqueue(_entries(1))
+    job = queue.lease("w1", lease_s=60)
+    clock.now += 50
+    assert queue.heartbeat(job.id, "w1", lease_s=60)
+    clock.now += 50
+    assert queue.lease("w2") is None  # renewed lease still valid
+
+    clock.now += 61
+    stolen = queue.lease("w2", lease_s=60)
+    assert stolen.id == job.id and stolen.attempts == 2 and stolen.lease_owner == "w2"
+    assert not queue.heartbeat(job.id, "w1")
+    assert queue.fail(job.id, "w1", "late") is None
+
+
+def test_retry_backoff_then_dead_letter(queue, clock):
+    queue.enqueue(_entries(1), max_attempts=2)
+    job = queue.lease("w1")
+    assert queue.fail(job.id, "w1", "rate limited") == "queued"
+    assert queue.lease("w1") is None  # backing off for 10s
+    clock.now += 10
+    job = queue.lease("w1")
+    assert job.attempts == 2
+    assert queue.fail(job.id, "w1", "rate limited again") == "dead"
+
+    dead = queue.jobs("dead")
+    assert [j.last_error for j in dead] == ["rate limited again"]
+    assert "dead #1" in format_status(queue.stats(), dead)
+    assert queue.retry_dead() == 1
+    assert queue.lease("w1").attempts == 1
+
+
+def test_expired_lease_without_attempts_left_is_dead_lettered(queue, clock):
+    queue.enqueue(_entries(1), max_attempts=1)
+    queue.lease("w1", lease_s=5)
+    clock.now += 6
+    assert queue.lease("w2") is None
+    assert queue.get(1).status == "dead"
+    assert queue.get(1).last_error == "lease expired"
+
+
+class FakeGraph:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.repos = []
+
+    def invoke(self, state, config):
+        with self.lock:
+            self.repos.append(state["repo_url"])
+        if state["repo_url"].endswith("r3"):
+            raise RuntimeError("boom")
+        crit = CriterionResult(dimension_id="d", dimension_name="D", final_score=3, remediation="-")
+        return {"final_report": AuditReport(repo_url=state["repo_url"], executive_summary="ok", overall_score=3.0,
+                                            criteria=[crit], remediation_plan="-")}
+
+    def stream(self, state, config, stream_mode):
+        yield self.invoke(state, config)
+
+
+def test_workers_drain_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), backoff_s=0)
+    queue.enqueue(_entries(6), max_attempts=2)
+    graph = FakeGraph()
+    counts = []
+
+    def work(i):
+        counts.append(run_worker(queue, graph=graph, worker_id=f"w{i}", output_dir=str(tmp_path / "out"),
+                                 exit_when_idle=True, heartbeat_s=0.01))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = queue.stats()
+    assert stats["counts"] == {"queued": 0, "leased": 0, "done": 5, "dead": 1}
+    assert sum(counts) == 7  # r3 ran twice before being dead-lettered
+    assert stats["throughput_per_min"] > 0 and stats["backlog"] == 0
+    outputs = {j.output for j in queue.jobs("done")}
+    assert len(outputs) == 5 and all(o.startswith(str(tmp_path / "out")) for o in outputs)
+
+
+def test_worker_that_loses_its_lease_stops_and_records_nothing(queue, clock, tmp_path, caplog):
+    import time
+
+    class TakenOverGraph:
+        finished = False
+
+        def stream(self, state, config, stream_mode):
+            yield {}
+            clock.now += 1000  # the lease expires and another worker takes the job over
+            assert queue.lease("w2").lease_owner == "w2"
+            time.sleep(0.3)
+            yield {}
+            self.finished = True  # the final step would write the report
+
+    queue.enqueue(_entries(1))
+    graph = TakenOverGraph()
+    assert run_worker(queue, graph=graph, worker_id="w1", output_dir=str(tmp_path / "out"),
+                      max_jobs=1, heartbeat_s=0.01) == 1
+
+    assert not graph.finished and not (tmp_path / "out").exists()
+    job = queue.get(1)
+    assert (job.status, job.lease_owner, job.last_error) == ("leased", "w2", None)
+    assert "lost the lease on job #1" in caplog.text
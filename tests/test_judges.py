@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from src.state import AgentState, Evidence
-from src.nodes.judges import Prosecutor, Defense, TechLead, JudicialOpinion
+from src.nodes.judges import JudgeCriterion, JudicialOpinion
 
 @pytest.fixture
 def mock_state() -> AgentState:
@@ -50,7 +50,7 @@ def test_prosecutor_node(mock_chat, mock_state):
     )
     
     # Run the node
-    result = Prosecutor(mock_state)
+    result = JudgeCriterion(dict(mock_state, judge="Prosecutor", dimension=mock_state["rubric_dimensions"][0]))
     opinions = result["opinions"]
     
     assert len(opinions) == 1
@@ -73,7 +73,7 @@ def test_defense_node(mock_chat, mock_state):
         cited_evidence=["test.py"]
     )
     
-    result = Defense(mock_state)
+    result = JudgeCriterion(dict(mock_state, judge="Defense", dimension=mock_state["rubric_dimensions"][0]))
     opinions = result["opinions"]
     
     assert len(opinions) == 1
@@ -95,9 +95,50 @@ def test_techlead_node(mock_chat, mock_state):
         cited_evidence=["test.py"]
     )
     
-    result = TechLead(mock_state)
+    result = JudgeCriterion(dict(mock_state, judge="TechLead", dimension=mock_state["rubric_dimensions"][0]))
     opinions = result["opinions"]
     
     assert len(opinions) == 1
     assert opinions[0].judge == "TechLead"
     assert opinions[0].score == 3
+
+
+def test_fan_out_sends_one_task_per_judge_and_dimension(mock_state):
+    from src.nodes.judges import fan_out_judges
+
+    mock_state["rubric_dimensions"].append(dict(mock_state["rubric_dimensions"][0], id="dimension_two"))
+    sends = fan_out_judges(mock_state)
+    assert len(sends) == 6
+    assert {s.node for s in sends} == {"JudgeCriterion"}
+    pairs = {(s.arg["judge"], s.arg["dimension"]["id"]) for s in sends}
+    assert pairs == {(j, d) for j in ("Prosecutor", "Defense", "TechLead") for d in ("dimension_test", "dimension_two")}
+    assert all(s.arg["evidences"] is mock_state["evidences"] for s in sends)
+
+
+def test_judge_criterion_task_caches_opinions_but_not_failures(mock_state, monkeypatch):
+    from src.nodes import judges
+    from src.nodes.judges import clear_opinion_cache, fan_out_judges
+
+    clear_opinion_cache()
+    llm = MagicMock()
+    llm.invoke.return_value = JudicialOpinion(judge="Defense", criterion_id="x", score=4, argument="solid")
+    monkeypatch.setattr(judges, "_judge_llm", lambda: llm)
+    task = next(s.arg for s in fan_out_judges(mock_state) if s.arg["judge"] == "Defense")
+
+    first = JudgeCriterion(task)["opinions"][0]
+    second = JudgeCriterion(dict(task))["opinions"][0]
+    assert (first.judge, first.criterion_id, first.score) == ("Defense", "dimension_test", 4)
+    assert second == first and second is not first
+    assert llm.invoke.call_count == 1
+    # audits get their own copies: adjusting one does not leak into the cache
+    second.score = 1
+    assert JudgeCriterion(dict(task))["opinions"][0].score == 4
+
+    clear_opinion_cache()
+    monkeypatch.setattr(judges.deadline.time, "sleep", lambda s: None)
+    llm.invoke.side_effect = RuntimeError("boom")
+    failed = JudgeCriterion(task)["opinions"][0]
+    assert failed.score == 3 and "boom" in failed.argument
+    llm.invoke.side_effect = None
+    assert JudgeCriterion(task)["opinions"][0].score == 4
+    clear_opinion_cache()
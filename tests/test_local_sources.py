@@ -0,0 +1,141 @@
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import zipfile
+
+import pytest
+
+from src.nodes import detectives
+from src.tools.repo_tools import (
+    RepoCloneError,
+    check_clone_source,
+    extract_git_history,
+    is_local_source,
+    open_local_repo,
+)
+
+GRAPH = "from langgraph.graph import StateGraph\ng = StateGraph(dict)\ng.add_node('a', f)\n"
+
+
+@pytest.fixture(autouse=True)
+def local_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCAL_SOURCES_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def _git_repo(path, commits=4):
+    (path / "src").mkdir(parents=True)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+    for i in range(commits):
+        (path / "src" / "graph.py").write_text(GRAPH + f"# {i}\n")
+        subprocess.run(git + ["add", "."], cwd=path, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", f"commit {i}"], cwd=path, check=True)
+    return path
+
+
+def _no_network(monkeypatch):
+    def clone(url, timeout=None):
+        raise AssertionError(f"{url} was cloned")
+
+    monkeypatch.setattr(detectives.repo_tools, "safe_clone_repo", clone)
+
+
+def test_directory_is_audited_in_place(tmp_path, monkeypatch):
+    _no_network(monkeypatch)
+    repo = _git_repo(tmp_path / "checkout")
+    before = sorted(p.relative_to(repo) for p in repo.rglob("*"))
+
+    update = detectives.RepoInvestigator({"repo_url": str(repo)})
+    history = update["evidences"]["git_forensic_analysis"][0]
+    assert history.found and history.content.startswith("4 commits")
+    assert "Nodes: ['a']" in update["evidences"]["graph_orchestration"][0].content
+    assert sorted(p.relative_to(repo) for p in repo.rglob("*")) == before  # nothing written, nothing removed
+
+
+def test_bare_repository_is_cloned_locally(tmp_path, monkeypatch):
+    _no_network(monkeypatch)
+    bare = tmp_path / "submission.git"
+    subprocess.run(["git", "clone", "-q", "--bare", str(_git_repo(tmp_path / "work")), str(bare)], check=True)
+
+    root, cleanup = open_local_repo(str(bare))
+    try:
+        assert (root / "src" / "graph.py").is_file() and extract_git_history(root)[0] == 4
+    finally:
+        shutil.rmtree(cleanup)
+    assert extract_git_history(bare)[0] == 4
+    assert detectives.RepoInvestigator({"repo_url": str(bare)})["commit"]
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_archive_is_unpacked_and_removed(tmp_path, monkeypatch, suffix):
+    _no_network(monkeypatch)
+    repo = _git_repo(tmp_path / "export")
+    (repo / ".git").rename(tmp_path / "dot-git")  # source downloads carry no history
+    archive = shutil.make_archive(str(tmp_path / "sub"), "zip" if suffix == ".zip" else "gztar", tmp_path, "export")
+
+    root, cleanup = open_local_repo(archive)
+    assert root.name == "export" and root.parent == cleanup  # single top-level folder becomes the root
+    shutil.rmtree(cleanup)
+
+    created = []
+    real_open = detectives.repo_tools.open_local_repo
+    monkeypatch.setattr(detectives.repo_tools, "open_local_repo",
+                        lambda *a, **kw: created.append(real_open(*a, **kw)) or created[-1])
+    update = detectives.RepoInvestigator({"repo_url": archive})
+    assert "Nodes: ['a']" in update["evidences"]["graph_orchestration"][0].content
+    history = update["evidences"]["git_forensic_analysis"][0]
+    assert not history.found and "no .git directory" in history.rationale
+    assert not os.path.exists(created[0][1])
+
+
+def test_unsafe_and_oversized_archives_are_refused(tmp_path, monkeypatch):
+    evil = tmp_path / "evil.tar.gz"
+    with tarfile.open(evil, "w:gz") as tf:
+        data = b"pwned"
+        info = tarfile.TarInfo("../../escaped.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+    with pytest.raises(RepoCloneError, match="Failed to unpack"):
+        open_local_repo(str(evil))
+    assert not (tmp_path.parent / "escaped.txt").exists()
+
+    big = tmp_path / "big.zip"
+    with zipfile.ZipFile(big, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("big.txt", b"0" * 10_000)
+    monkeypatch.setenv("ARCHIVE_MAX_BYTES", "1000")
+    with pytest.raises(RepoCloneError, match="ARCHIVE_MAX_BYTES"):
+        open_local_repo(str(big))
+
+    (tmp_path / "notes.txt").write_text("x")
+    update = detectives.RepoInvestigator({"repo_url": str(tmp_path / "notes.txt")})
+    assert "not a directory, bare repository or archive" in update["evidences"]["general"][0].rationale
+
+
+def test_local_sources_are_off_without_a_root(tmp_path, monkeypatch):
+    repo = _git_repo(tmp_path / "checkout")
+    monkeypatch.delenv("LOCAL_SOURCES_ROOT")
+    assert not is_local_source(str(repo))
+    for source in (str(repo), repo.as_uri(), "/etc"):
+        with pytest.raises(RepoCloneError, match="LOCAL_SOURCES_ROOT"):
+            check_clone_source(source)
+    with pytest.raises(RepoCloneError, match="scheme"):
+        check_clone_source("ext::sh -c touch% /tmp/pwned")
+    check_clone_source("git@github.com:u/r.git")
+    check_clone_source("https://github.com/u/r")
+
+    update = detectives.RepoInvestigator({"repo_url": str(repo)})
+    assert "LOCAL_SOURCES_ROOT" in update["evidences"]["general"][0].rationale
+
+    monkeypatch.setenv("LOCAL_SOURCES_ROOT", str(repo / "src"))  # the checkout is outside this root
+    assert not is_local_source(str(repo))
+
+
+def test_urls_are_not_local_sources(tmp_path):
+    assert is_local_source(str(tmp_path))
+    assert not is_local_source(tmp_path.as_uri())
+    assert not is_local_source("git@github.com:u/r.git")
+    assert not is_local_source("https://github.com/u/r")
+    assert not is_local_source(str(tmp_path / "missing"))
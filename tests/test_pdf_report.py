@@ -0,0 +1,54 @@
+from pypdf import PdfReader
+
+from src.pdf_report import main, pdf_path_for, render_cohort, stylesheet
+from src.reports import write_report
+from src.state import AuditReport, CriterionResult, JudicialOpinion
+
+
+def _report(repo="https://github.com/u/r", n=3):
+    criteria = [
+        CriterionResult(
+            dimension_id=f"d{i}", dimension_name=f"Dimension <{i}> & co", final_score=i % 5 + 1,
+            judge_opinions=[JudicialOpinion(judge=j, criterion_id=f"d{i}", score=3, argument=f"{j} says x < y")
+                            for j in ("Prosecutor", "Defense", "TechLead")],
+            dissent_summary="High variance" if i % 2 else None, remediation="Add tests.",
+        )
+        for i in range(n)
+    ]
+    return AuditReport(repo_url=repo, executive_summary="Summary.", overall_score=2.5, criteria=criteria,
+                       remediation_plan="Plan.")
+
+
+def _text(path):
+    return "\n".join(page.extract_text() for page in PdfReader(str(path)).pages)
+
+
+def test_pdf_writer_renders_any_report(tmp_path):
+    written = write_report(_report(), str(tmp_path / "report.md"), ["pdf"])
+    assert written[-1] == str(tmp_path / "report.pdf")
+    text = _text(tmp_path / "report.pdf")
+    assert "Audit Report for https://github.com/u/r" in text
+    assert "Dimension <2> & co" in text and "Prosecutor says x < y" in text
+    assert stylesheet() is stylesheet()
+
+    write_report(_report(n=0), str(tmp_path / "failed.pdf"))
+    assert "Failed Audit" in _text(tmp_path / "failed.pdf")
+
+
+def test_render_cohort_on_process_pool(tmp_path):
+    jobs = [(_report(f"https://github.com/u/r{i}"), str(tmp_path / f"{i}.pdf")) for i in range(4)]
+    assert render_cohort(jobs, workers=2) == [out for _, out in jobs]
+    assert "https://github.com/u/r3" in _text(tmp_path / "3.pdf")
+
+
+def test_cli_accepts_json_reports_and_records(tmp_path):
+    from src.incremental import AuditRecord, save_record
+
+    write_report(_report(), str(tmp_path / "001-u_r.json"))
+    save_record(str(tmp_path / "002-u_s.record.json"), AuditRecord(repo_url="https://github.com/u/s"))
+
+    outputs = main([str(tmp_path / "001-u_r.json"), str(tmp_path / "002-u_s.record.json"),
+                    "--out-dir", str(tmp_path / "pdf"), "--workers", "1"])
+    assert outputs == [str(tmp_path / "pdf" / "001-u_r.pdf"), str(tmp_path / "pdf" / "002-u_s.pdf")]
+    assert "https://github.com/u/s" in _text(outputs[1])
+    assert pdf_path_for("a/b.record.json") == "a/b.pdf"
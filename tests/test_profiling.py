@@ -0,0 +1,78 @@
+import operator
+import pstats
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from src import profiling
+from src.profiling import profile_node
+
+
+class S(TypedDict):
+    log: Annotated[list, operator.add]
+
+
+def _busy(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def parse_step(state):
+    _busy(300_000)
+    return {"log": ["parse"]}
+
+
+def graph_step(state):
+    _busy(300_000)
+    return {"log": ["graph"]}
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    prof = profiling.enable(str(tmp_path / "prof"), interval=0.001)
+    yield prof
+    profiling.disable()
+
+
+def _parallel_graph():
+    builder = StateGraph(S)
+    builder.add_node("Parse", profile_node("Parse", parse_step))
+    builder.add_node("Graph", profile_node("Graph", graph_step))
+    builder.add_edge(START, "Parse")
+    builder.add_edge(START, "Graph")
+    builder.add_edge("Parse", END)
+    builder.add_edge("Graph", END)
+    return builder.compile()
+
+
+def test_profile_node_is_noop_when_disabled():
+    profiling.disable()
+    assert profile_node("Parse", parse_step)({}) == {"log": ["parse"]}
+
+
+def test_parallel_nodes_get_separate_profiles(profiler):
+    result = _parallel_graph().invoke({"log": []})
+    assert sorted(result["log"]) == ["graph", "parse"]
+    profiler.stop()
+
+    written = {p.name for p in profiler.write()}
+    assert {"Parse.pstats", "Parse.collapsed", "Graph.pstats", "Graph.collapsed", "all.collapsed"} <= written
+
+    parse_funcs = {func for _, _, func in pstats.Stats(str(profiler.out_dir / "Parse.pstats")).stats}
+    assert "parse_step" in parse_funcs
+    assert "graph_step" not in parse_funcs
+
+    collapsed = (profiler.out_dir / "Graph.collapsed").read_text().splitlines()
+    assert collapsed, "sampler recorded no stacks"
+    for line in collapsed:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("graph_step (")
+        assert "parse_step" not in stack and "langgraph" not in stack
+
+    combined = (profiler.out_dir / "all.collapsed").read_text()
+    assert "Parse;parse_step" in combined and "Graph;graph_step" in combined
+    assert "Parse (1 run(s)" in profiler.summary()
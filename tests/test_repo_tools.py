@@ -22,7 +22,7 @@ def test_safe_clone_repo_success(tmp_path, monkeypatch):
         stdout = "Cloned"
         stderr = ""
 
-    def fake_run(cmd, capture_output, text, check):
+    def fake_run(cmd, capture_output, text, check, timeout=None):
         assert "git" in cmd[0]
         assert "clone" in cmd
         return DummyResult()
@@ -40,7 +40,7 @@ def test_safe_clone_repo_success(tmp_path, monkeypatch):
 
 
 def test_safe_clone_repo_failure(monkeypatch):
-    def fake_run(cmd, capture_output, text, check):
+    def fake_run(cmd, capture_output, text, check, timeout=None):
         raise subprocess.CalledProcessError(1, cmd, stderr="error occurred")
 
     monkeypatch.setattr("subprocess.run", fake_run)
@@ -94,23 +94,29 @@ def test_repoinvestigator_node(tmp_path, monkeypatch):
 
     # missing repo_url
     state = {"repo_url": ""}
-    ev = RepoInvestigator(state)
+    [ev] = RepoInvestigator(state)["evidences"]["general"]
     assert not ev.found
 
     # simulate successful clone and history
-    def fake_clone(url):
+    def fake_clone(url, timeout=None):
         return tmp_path, True
 
     monkeypatch.setattr("src.tools.repo_tools.safe_clone_repo", fake_clone)
 
-    def fake_history(path):
-        return 1, [{"hash": "abc", "message": "init"}]
+    # git_forensic_analysis only counts as found with more than three commits
+    commits = [{"hash": f"c{i}", "message": "init" if i == 0 else f"change {i}"} for i in range(3)]
+    commits.append({"hash": "abc", "message": "latest"})
+
+    def fake_history(path, timeout=None):
+        return len(commits), commits
 
     monkeypatch.setattr("src.tools.repo_tools.extract_git_history", fake_history)
     state = {"repo_url": "https://example.com/repo.git"}
-    ev = RepoInvestigator(state)
+    update = RepoInvestigator(state)
+    [ev] = update["evidences"]["git_forensic_analysis"]
     assert ev.found
-    assert "1 commits" in (ev.content or "")
+    assert "4 commits" in (ev.content or "")
+    assert update["commit"] == "abc"
 
 
 def test_docanalyst_node(tmp_path):
@@ -118,15 +124,15 @@ def test_docanalyst_node(tmp_path):
 
     # missing pdf_path
     state = {"pdf_path": ""}
-    ev = DocAnalyst(state)
+    [ev] = DocAnalyst(state)["evidences"]["general"]
     assert not ev.found
 
     # create a minimal (invalid) pdf for parsing
     pdf = tmp_path / "empty.pdf"
     pdf.write_bytes(b"%PDF-1.4\n%%EOF")
     state = {"pdf_path": str(pdf)}
-    ev = DocAnalyst(state)
-    assert isinstance(ev.found, bool)
+    evidences = DocAnalyst(state)["evidences"]
+    assert evidences and all(isinstance(ev.found, bool) for evs in evidences.values() for ev in evs)
 
 
 def test_build_detective_graph_structure():
@@ -0,0 +1,112 @@
+import json
+import threading
+
+import pytest
+
+from src import reports
+from src.reports import ReportWriter, register_writer, resolve_formats, write_report
+from src.state import AuditReport, CriterionResult, JudicialOpinion
+
+
+def _report(repo="https://github.com/u/r", n=2):
+    criteria = [
+        CriterionResult(
+            dimension_id=f"d{i}", dimension_name=f"Dim <{i}>", final_score=3,
+            judge_opinions=[JudicialOpinion(judge="Defense", criterion_id=f"d{i}", score=4, argument="a & b")],
+            dissent_summary="close call" if i else None, remediation="fix it",
+        )
+        for i in range(n)
+    ]
+    return AuditReport(repo_url=repo, executive_summary="summary", overall_score=3.0, criteria=criteria,
+                       remediation_plan="plan", degradations=["vision skipped"])
+
+
+def test_formats_follow_suffix_and_extras(tmp_path):
+    report = _report()
+    written = write_report(report, str(tmp_path / "out" / "report.json"), ["md", "html,json"])
+    assert written == [str(tmp_path / "out" / f"report.{s}") for s in ("json", "md", "html")]
+
+    assert AuditReport.model_validate_json((tmp_path / "out" / "report.json").read_text()) == report
+    md = (tmp_path / "out" / "report.md").read_text(encoding="utf-8")
+    assert md.startswith("# Audit Report for https://github.com/u/r\n")
+    assert "> close call" in md and "## Degraded Mode" in md
+    page = (tmp_path / "out" / "report.html").read_text(encoding="utf-8")
+    assert "<h3>Dim &lt;1&gt;</h3>" in page and "a &amp; b" in page
+    assert [p.name for p in (tmp_path / "out").iterdir() if p.name.startswith(".")] == []
+
+
+def test_report_without_criteria_renders_as_failed_audit(tmp_path):
+    failed = _report(n=0)
+    write_report(failed, str(tmp_path / "r.md"), ["json"])
+    assert (tmp_path / "r.md").read_text() == "# Failed Audit\n\nsummary"
+    assert json.loads((tmp_path / "r.json").read_text())["criteria"] == []
+
+
+def test_failed_render_keeps_previous_report(tmp_path):
+    class Broken(ReportWriter):
+        format, suffix = "broken", ".broken"
+
+        def render(self, report):
+            yield "partial"
+            raise RuntimeError("boom")
+
+    register_writer(Broken())
+    try:
+        path = tmp_path / "r.broken"
+        path.write_text("previous")
+        with pytest.raises(RuntimeError):
+            write_report(_report(), str(path))
+        assert path.read_text() == "previous"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["r.broken"]
+    finally:
+        del reports.WRITERS["broken"]
+
+
+def test_concurrent_writers_never_interleave(tmp_path):
+    path = str(tmp_path / "shared.json")
+    big = [_report(f"https://github.com/u/r{i}", n=200) for i in range(8)]
+    threads = [threading.Thread(target=write_report, args=(r, path)) for r in big]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert AuditReport.model_validate_json(open(path).read()) in big
+
+
+def test_resolve_formats(monkeypatch):
+    monkeypatch.setattr(reports, "_configured", None)
+    monkeypatch.setenv("REPORT_FORMATS", "json, HTML,json")
+    assert resolve_formats() == ["json", "html"]
+    assert resolve_formats([]) == []
+    with pytest.raises(ValueError, match="unknown report format 'docx'"):
+        resolve_formats(["docx"])
+
+
+def test_chief_justice_writes_requested_formats(tmp_path):
+    from src.nodes.justice import ChiefJusticeNode
+
+    opinions = [JudicialOpinion(judge=j, criterion_id="a", score=4, argument="-")
+                for j in ("Prosecutor", "Defense", "TechLead")]
+    ChiefJusticeNode({
+        "repo_url": "https://github.com/u/r",
+        "rubric_dimensions": [{"id": "a", "name": "A"}],
+        "evidences": {},
+        "opinions": opinions,
+        "output_path": str(tmp_path / "report.md"),
+        "report_formats": ["json"],
+    })
+    assert json.loads((tmp_path / "report.json").read_text())["criteria"][0]["final_score"] == 4
+    assert (tmp_path / "report.md").is_file()
+
+
+def test_reports_get_the_usual_permissions(tmp_path):
+    import os
+    import stat
+
+    umask = os.umask(0o027)
+    try:
+        path = tmp_path / "r.md"
+        write_report(_report(), str(path))
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from src.results import ResultsStore, main, percentile, save_result
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+
+def _report(repo, scores, judge_scores=(3, 3, 3)):
+    criteria = [
+        CriterionResult(
+            dimension_id=dim, dimension_name=dim.title(), final_score=score, remediation=f"fix {dim}",
+            judge_opinions=[JudicialOpinion(judge=j, criterion_id=dim, score=s, argument=f"{j} on {dim}",
+                                            cited_evidence=["e1"])
+                            for j, s in zip(("Prosecutor", "Defense", "TechLead"), judge_scores)],
+        )
+        for dim, score in scores.items()
+    ]
+    overall = sum(scores.values()) / len(scores) if scores else 0.0
+    return AuditReport(repo_url=repo, executive_summary="s", overall_score=overall, criteria=criteria,
+                       remediation_plan="p", degradations=["vision skipped"] if not scores else [])
+
+
+def test_round_trip_and_indexes(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    report = _report("https://github.com/u/a", {"tools": 2, "graph": 5}, judge_scores=(1, 5, 4))
+    evidences = {"tools": [Evidence(goal="g", found=True, location="src/tools", rationale="r", confidence=0.8)]}
+    run_id = store.add(report, commit="abc123", evidences=evidences, output="audit/a.md", run_at=100.0)
+
+    assert store.report(run_id) == report
+    assert store.evidences(run_id) == evidences
+    [run] = store.runs(commit="abc123")
+    assert (run.repo_url, run.status, run.output, run.run_at) == ("https://github.com/u/a", "ok", "audit/a.md", 100.0)
+
+    conn = sqlite3.connect(store.path)
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM opinions WHERE judge = 'Defense' AND dimension_id = 'tools'"))
+    assert "opinions_judge" in plan
+    conn.close()
+
+
+def test_cohort_queries_use_latest_judged_run_per_repo(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    store.add(_report("a", {"tools": 1, "graph": 1}), run_at=1.0)  # superseded by the re-audit below
+    store.add(_report("a", {"tools": 4, "graph": 2}, judge_scores=(2, 5, 3)), run_at=5.0)
+    store.add(_report("b", {"tools": 2, "graph": 4}), run_at=2.0)
+    store.add(_report("c", {"tools": 3, "graph": 3}), run_at=3.0)
+    store.add(_report("d", {}), run_at=4.0)  # failed audit: never part of the cohort
+
+    overall = store.stats()
+    assert overall.count == 3 and overall.mean == pytest.approx(3.0) and overall.percentiles[50] == 3.0
+    assert store.stats(latest=False).count == 4
+    assert store.stats("tools").percentiles[90] == pytest.approx(3.8)
+    assert [s.dimension for s in store.dimension_stats()] == ["tools", "graph"]
+    assert store.stats(since=2.5).count == 2
+
+    assert store.rank("a", "tools") == pytest.approx(100 * 2.5 / 3)
+    assert store.rank("c") == pytest.approx(50.0)
+    assert store.rank("d") is None
+
+    assert store.distribution()["tools"] == {1: 0, 2: 1, 3: 1, 4: 1, 5: 0}
+
+    bias = {b.judge: b for b in store.judge_bias()}
+    assert bias["Defense"].opinions == 6
+    # a: defense 5 vs finals 4, 2; b: 3 vs 2, 4; c: 3 vs 3, 3
+    assert bias["Defense"].mean_delta == pytest.approx((1 + 3 + 1 - 1 + 0 + 0) / 6)
+    assert {(b.judge, b.dimension) for b in store.judge_bias(by_dimension=True)} >= {("TechLead", "graph")}
+
+
+def test_save_result_is_opt_in(tmp_path, monkeypatch):
+    from src import results
+
+    state = {"final_report": _report("u", {"tools": 3}), "commit": "f00", "evidences": {}, "output_path": "r.md"}
+    monkeypatch.delenv("RESULTS_DB", raising=False)
+    monkeypatch.setattr(results, "_configured", None)
+    assert save_result(state) is None
+
+    monkeypatch.setenv("RESULTS_DB", str(tmp_path / "env.sqlite"))
+    assert save_result(state) == 1
+    assert results.active_store().runs()[0].commit_sha == "f00"
+
+
+def test_store_errors_do_not_fail_the_audit(tmp_path, monkeypatch, caplog):
+    from src import results
+    from src.batch import ManifestEntry, run_manifest
+
+    class Graph:
+        def invoke(self, state, config):
+            return {"final_report": _report(state["repo_url"], {"tools": 4}), "evidences": {}}
+
+    monkeypatch.setattr(results, "_configured", str(tmp_path))  # a directory: sqlite cannot open it
+    [result] = run_manifest([ManifestEntry(repo="https://github.com/u/r", pdf="p.pdf")], graph=Graph(),
+                            output_dir=str(tmp_path / "out"))
+    assert result.status == "ok" and result.overall_score == 4.0
+    assert "results database" in caplog.text
+
+
+def test_percentile_interpolates_like_numpy():
+    values = [1, 2, 3, 4, 10]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 90) == pytest.approx(7.6)
+    assert percentile([4], 25) == 4
+
+
+def test_cli_imports_records_and_prints_stats(tmp_path, capsys):
+    from src.incremental import AuditRecord, save_record
+
+    record = tmp_path / "001-u_r.record.json"
+    opinions = [JudicialOpinion(judge=j, criterion_id="graph_orchestration", score=4, argument="-")
+                for j in ("Prosecutor", "Defense", "TechLead")]
+    save_record(str(record), AuditRecord(repo_url="https://github.com/u/r", opinions=opinions))
+    db = str(tmp_path / "results.sqlite")
+
+    store = main(["--db", db, "import", str(record)])
+    [run] = store.runs()
+    assert run.output == str(tmp_path / "001-u_r.md")
+    scores = {cr.dimension_id: cr.final_score for cr in store.report(run.id).criteria}
+    assert scores["graph_orchestration"] == 4
+
+    capsys.readouterr()
+    main(["--db", db, "stats", "--dimension", "graph_orchestration"])
+    assert "| graph_orchestration | 1 | 4.00 |" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from src.rubric import Rubric, RubricError, load_rubric, state_dimensions
+from src.state import JudicialOpinion
+
+
+def _write(path, dims, **extra):
+    path.write_text(json.dumps(dict({"dimensions": dims}, **extra)), encoding="utf-8")
+    return str(path)
+
+
+def test_load_is_cached_by_path_and_mtime(tmp_path):
+    path = _write(tmp_path / "rubric.json", [{"id": "a", "name": "A"}])
+    first = load_rubric(path)
+    assert load_rubric(path) is first
+
+    _write(tmp_path / "rubric.json", [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = load_rubric(path)
+    assert second is not first
+    assert [d.id for d in second.dimensions] == ["a", "b"]
+
+
+def test_invalid_rubrics_raise(tmp_path):
+    with pytest.raises(RubricError, match="duplicate dimension ids: a"):
+        load_rubric(_write(tmp_path / "dup.json", [{"id": "a", "name": "A"}, {"id": "a", "name": "A2"}]))
+    with pytest.raises(RubricError):
+        load_rubric(_write(tmp_path / "regex.json", [{"id": "a", "name": "A", "path_pattern": "src/(["}]))
+    with pytest.raises(RubricError):
+        load_rubric(str(tmp_path / "missing.json"))
+
+
+def test_project_rubric_precompiles_matchers():
+    rubric = load_rubric()
+    depth = rubric.dimension("theoretical_depth")
+    assert depth.matched_keywords("on METACOGNITION and fan-in / fan-out") == ["Fan-In / Fan-Out", "Metacognition"]
+    assert depth.min_keywords == 2
+    accuracy = rubric.dimension("report_accuracy")
+    assert accuracy.find_paths("see src/graph.py, src/tools/x.json and src/graph.py") == [
+        "src/graph.py", "src/tools/x.json"
+    ]
+    assert [d.id for d in rubric.for_artifact("pdf_report", "pdf_images")] == [
+        "theoretical_depth", "report_accuracy", "swarm_visual"
+    ]
+    # judges see (and hash) exactly the dimension entries of the file
+    with open("rubric.json", encoding="utf-8") as f:
+        assert rubric.dimension_dicts() == json.load(f)["dimensions"]
+
+
+def test_state_dimensions_prefers_explicit_override():
+    rubric = Rubric.model_validate({"dimensions": [{"id": "a", "name": "A"}]})
+    assert state_dimensions({"rubric": rubric, "rubric_dimensions": []}) == [{"id": "a", "name": "A"}]
+    assert state_dimensions({"rubric": rubric, "rubric_dimensions": [{"id": "x"}]}) == [{"id": "x"}]
+
+
+def test_chief_justice_applies_rubric_synthesis_parameters(tmp_path):
+    from src.nodes.justice import ChiefJusticeNode
+
+    rubric = Rubric.model_validate({
+        "dimensions": [{"id": "tools", "name": "Tools"}],
+        "synthesis_parameters": {"security_dimensions": ["tools"], "security_score_cap": 2},
+    })
+    opinions = [JudicialOpinion(judge=j, criterion_id="tools", score=s, argument="-")
+                for j, s in (("Prosecutor", 1), ("Defense", 3), ("TechLead", 3))]
+    report = ChiefJusticeNode({
+        "repo_url": "https://github.com/u/r",
+        "rubric": rubric,
+        "evidences": {},
+        "opinions": opinions,
+        "output_path": str(tmp_path / "report.md"),
+    })["final_report"]
+    assert report.criteria[0].final_score == 2
+    assert "capped at 2" in report.criteria[0].dissent_summary
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.batch import ManifestEntry
+from src.scheduler import PipelineScheduler
+from src.state import AuditReport, CriterionResult, Evidence
+
+
+def _ev(goal):
+    return Evidence(goal=goal, found=True, location="x", rationale="r", confidence=1.0)
+
+
+class JudicialGraph:
+    """Fake judicial half of the graph; records which evidences it received."""
+
+    def __init__(self):
+        self.seen = {}
+
+    def invoke(self, state, config):
+        time.sleep(0.02)
+        self.seen[state["repo_url"]] = sorted(state["evidences"])
+        crit = CriterionResult(dimension_id="d", dimension_name="D", final_score=3, remediation="-")
+        return {"final_report": AuditReport(
+            repo_url=state["repo_url"], executive_summary="ok", overall_score=3.0,
+            criteria=[crit], remediation_plan="-",
+        )}
+
+
+def test_pipeline_merges_detective_evidence_and_bounds_prefetch(tmp_path, monkeypatch):
+    lock = threading.Lock()
+    admitted = {"now": 0, "peak": 0}
+
+    def repo(state):
+        with lock:
+            admitted["now"] += 1
+            admitted["peak"] = max(admitted["peak"], admitted["now"])
+        time.sleep(0.01)
+        return {"evidences": {"git_forensic_analysis": [_ev("git")]}}
+
+    def doc(state):
+        return {"evidences": {"theoretical_depth": [_ev("doc")]}}
+
+    def vision(state):
+        return {"evidences": {"swarm_visual": [_ev("vision")]}}
+
+    graph = JudicialGraph()
+    original_invoke = graph.invoke
+
+    def invoke(state, config):
+        with lock:
+            admitted["now"] -= 1
+        return original_invoke(state, config)
+
+    graph.invoke = invoke
+    monkeypatch.setattr(
+        "src.scheduler.DETECTIVE_STAGES", (("io", repo), ("cpu", doc), ("llm", vision))
+    )
+    entries = [ManifestEntry(repo=f"https://github.com/u/r{i}", pdf="p.pdf") for i in range(8)]
+
+    with PipelineScheduler(graph=graph, llm_workers=1, prefetch=2, cpu_processes=False) as sched:
+        results = sched.run(entries, output_dir=str(tmp_path))
+        depths = sched.stage_depths()
+
+    assert [r.repo for r in results] == [e.repo for e in entries]
+    assert all(r.status == "ok" for r in results)
+    assert graph.seen[entries[0].repo] == ["git_forensic_analysis", "swarm_visual", "theoretical_depth"]
+    assert admitted["peak"] <= 2
+    assert depths["io"]["done"] == 8 and depths["cpu"]["done"] == 8
+    # 8 vision tasks + 8 judicial runs
+    assert depths["llm"] == {"queued": 0, "running": 0, "done": 16}
+
+
+def test_pipeline_reports_detective_errors(tmp_path, monkeypatch):
+    def broken(state):
+        raise RuntimeError("clone exploded")
+
+    def empty(state):
+        return {"evidences": {}}
+
+    monkeypatch.setattr(
+        "src.scheduler.DETECTIVE_STAGES", (("io", broken), ("cpu", empty), ("llm", empty))
+    )
+    with PipelineScheduler(graph=JudicialGraph(), cpu_processes=False) as sched:
+        results = sched.run([ManifestEntry(repo="https://github.com/u/r", pdf="p.pdf")], str(tmp_path))
+
+    assert results[0].status == "error"
+    assert "clone exploded" in results[0].error
+
+
+def test_process_pool_does_not_fork_and_gets_the_parent_config(tmp_path, monkeypatch):
+    from src import concurrency, scheduler, similarity
+    from src.tools import repo_tools
+
+    monkeypatch.setattr(similarity, "_configured", str(tmp_path / "sim.db"))
+    monkeypatch.setattr(repo_tools, "_local_sources_root", str(tmp_path))
+    concurrency.configure_limits(judge=2)
+    try:
+        with PipelineScheduler(graph=JudicialGraph(), cpu_workers=1) as sched:
+            pool = sched._pools["cpu"]
+            assert pool._mp_context.get_start_method() != "fork"
+            child = pool.submit(scheduler.worker_config).result(timeout=60)
+    finally:
+        concurrency.configure_limits(judge=None)
+    assert child["similarity"] == str(tmp_path / "sim.db")
+    assert child["local_sources"] == str(tmp_path)
+    assert child["limits"]["judge"] == 2
+
+
+def test_process_pool_tasks_are_queued_until_a_worker_starts_them():
+    with PipelineScheduler(graph=JudicialGraph(), cpu_workers=1) as sched:
+        futures = [sched._submit("cpu", time.sleep, 0.5) for _ in range(3)]
+        deadline = time.monotonic() + 30
+        while sched.stage_depths()["cpu"]["running"] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sched.stage_depths()["cpu"] == {"queued": 2, "running": 1, "done": 0}
+        for future in futures:
+            future.result(timeout=30)
+    assert sched.stage_depths()["cpu"] == {"queued": 0, "running": 0, "done": 3}
+
+
+def test_pipeline_detectives_are_instrumented(tmp_path, monkeypatch):
+    from src import instrumentation
+
+    def doc(state):
+        return {"evidences": {}}
+
+    monkeypatch.setattr("src.scheduler.DETECTIVE_STAGES", (("io", doc), ("cpu", doc), ("llm", doc)))
+    recorder = instrumentation.configure()
+    try:
+        # spans cannot come back from a pool process: DocAnalyst runs on a thread while tracing
+        with PipelineScheduler(graph=JudicialGraph()) as sched:
+            assert not isinstance(sched._pools["cpu"], ProcessPoolExecutor)
+            sched.run([ManifestEntry(repo="https://github.com/u/r", pdf="p.pdf")], str(tmp_path))
+    finally:
+        instrumentation.disable()
+    nodes = [s for s in recorder.spans if s["kind"] == "node"]
+    assert [s["name"] for s in nodes] == ["doc"] * 3
+    assert all(s["audit"] == "https://github.com/u/r" for s in nodes)
@@ -0,0 +1,145 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from src.concurrency import configure_limits
+from src.service import AuditService, make_server
+from src.state import AuditReport, CriterionResult
+
+
+class StreamingGraph:
+    """Fake compiled graph: emits two node updates, then the final state."""
+
+    def __init__(self):
+        self.rubrics = []
+
+    def stream(self, state, config, stream_mode):
+        self.rubrics.append(state["rubric"])
+        if "fail" in state["repo_url"]:
+            raise RuntimeError("clone failed")
+        time.sleep(0.01)
+        yield "updates", {"RepoInvestigator": {"evidences": {}}}
+        crit = CriterionResult(dimension_id="d", dimension_name="D", final_score=4, remediation="-")
+        report = AuditReport(repo_url=state["repo_url"], executive_summary="ok", overall_score=4.0,
+                             criteria=[crit], remediation_plan="-")
+        yield "updates", {"ChiefJustice": {"final_report": report}}
+        yield "values", dict(state, final_report=report)
+
+
+@pytest.fixture
+def service(tmp_path):
+    rubric = tmp_path / "rubric.json"
+    rubric.write_text(json.dumps({"dimensions": [{"id": "d", "name": "D"}]}))
+    svc = AuditService(graph=StreamingGraph(), output_dir=str(tmp_path / "out"), max_audits=2,
+                       rubric_path=str(rubric))
+    yield svc
+    svc.shutdown()
+    configure_limits(clone=None, extract=None, judge=None)
+
+
+def test_jobs_run_concurrently_with_shared_rubric(service):
+    jobs = [service.submit(f"https://github.com/u/r{i}", "p.pdf") for i in range(4)]
+    failed = service.submit("https://github.com/u/fail", "p.pdf")
+    events = [e["event"] if e["event"] != "node" else e["node"] for e in service.events(jobs[0].id, timeout=5)]
+    assert events == ["queued", "started", "RepoInvestigator", "ChiefJustice", "finished"]
+
+    done = [service.wait(j.id, timeout=5) for j in jobs]
+    assert {j.status for j in done} == {"done"}
+    assert all(j.result.overall_score == 4.0 for j in done)
+    assert len({j.output for j in done}) == 4
+
+    failed = service.wait(failed.id, timeout=5)
+    assert failed.status == "error" and "clone failed" in failed.result.error
+    assert service.graph.rubrics[0].dimension_dicts() == [{"id": "d", "name": "D"}]
+    assert all(r is service.rubric for r in service.graph.rubrics)
+    assert service.health()["jobs"] == {"done": 4, "error": 1}
+    # a later reader still gets the whole stream
+    assert [e["event"] for e in service.events(jobs[0].id)] == ["queued", "started", "node", "node", "finished"]
+
+
+def test_concurrent_readers_each_get_every_event(service):
+    release = threading.Event()
+    graph = service.graph
+    original = graph.stream
+
+    def stream(state, config, stream_mode):
+        release.wait(5)
+        yield from original(state, config, stream_mode)
+
+    graph.stream = stream
+    job = service.submit("https://github.com/u/r", "p.pdf")
+    readers = [service.events(job.id, timeout=5) for _ in range(2)]
+    first = [next(readers[0]) for _ in range(2)]
+    release.set()
+    rest = list(readers[0])  # the first reader finishes while the second has not started
+    assert [e["event"] for e in first + rest] == [e["event"] for e in readers[1]]
+    assert (first + rest)[-1]["event"] == "finished"
+
+
+def test_evicted_jobs_are_not_found(service):
+    job = service.submit("https://github.com/u/r", "p.pdf")
+    assert service.wait(job.id, timeout=5).status == "done"
+    service.job_ttl = 0.0
+    time.sleep(0.01)
+    service.health()
+    assert service.wait(job.id) is None
+    assert list(service.events(job.id)) == []
+
+
+def test_paths_stay_inside_their_roots(service, tmp_path):
+    service.input_root = str(tmp_path / "in")
+    job = service.submit("https://github.com/u/r", "sub/p.pdf", output="r/report.md")
+    assert job.pdf == str((tmp_path / "in" / "sub" / "p.pdf").resolve())
+    assert job.output == str((tmp_path / "out" / "r" / "report.md").resolve())
+    for pdf, output in (("/etc/passwd", None), ("../p.pdf", None), ("p.pdf", "/tmp/x.md"), ("p.pdf", "a/../../x.md")):
+        with pytest.raises(ValueError):
+            service.submit("https://github.com/u/r", pdf, output=output)
+    service.wait(job.id, timeout=5)
+
+
+def test_finished_jobs_are_evicted(service):
+    service.keep_jobs = 2
+    jobs = [service.submit(f"https://github.com/u/r{i}", "p.pdf") for i in range(4)]
+    for job in jobs:
+        service.wait(job.id, timeout=5)
+    assert len(service.jobs()) == 4  # evicted lazily
+    assert service.health()["jobs"] == {"done": 2}
+    assert service.get(jobs[0].id) is None and service.get(jobs[3].id) is not None
+
+    service.job_ttl = 0.0
+    time.sleep(0.01)
+    assert service.health()["jobs"] == {}
+
+
+def test_http_submit_stream_and_lookup(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("POST", "/audits?stream=1", json.dumps({"repo": "https://github.com/u/r", "pdf": "p.pdf"}))
+        resp = conn.getresponse()
+        assert resp.status == 200
+        lines = [json.loads(line) for line in resp.read().decode().splitlines()]
+        assert lines[-1]["event"] == "result"
+        job = lines[-1]["job"]
+        assert job["status"] == "done" and job["result"]["overall_score"] == 4.0
+
+        conn.request("GET", f"/audits/{job['id']}")
+        assert json.loads(conn.getresponse().read())["status"] == "done"
+
+        conn.request("POST", "/audits", json.dumps({"repo": "https://github.com/u/r"}))
+        assert conn.getresponse().status == 400
+        conn.request("POST", "/audits", json.dumps({"repo": "https://github.com/u/r", "pdf": "p.pdf",
+                                                    "output": "/etc/cron.d/x"}))
+        resp = conn.getresponse()
+        assert resp.status == 400 and "output" in json.loads(resp.read())["error"]
+        conn.request("GET", "/audits/job-9999")
+        resp = conn.getresponse()
+        resp.read()
+        assert resp.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
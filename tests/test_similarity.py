@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pytest
+
+from src import similarity
+from src.similarity import SimilarityIndex, jaccard, main, sketch_repo, sketch_source, winnow
+from src.tools.repo_tools import normalized_tokens
+
+ROOT = Path(__file__).resolve().parents[1]
+GRAPH = (ROOT / "src" / "graph.py").read_text(encoding="utf-8")
+JUDGES = (ROOT / "src" / "nodes" / "judges.py").read_text(encoding="utf-8")
+JUSTICE = (ROOT / "src" / "nodes" / "justice.py").read_text(encoding="utf-8")
+
+
+def _renamed(source):
+    for old, new in (("state", "st"), ("parser", "cli"), ("args", "opts"), ("report", "rep")):
+        source = source.replace(old, new)
+    return source
+
+
+def _submission(root, graph, nodes):
+    (root / "src" / "nodes").mkdir(parents=True)
+    (root / "src" / "graph.py").write_text(graph)
+    for name, source in nodes.items():
+        (root / "src" / "nodes" / name).write_text(source)
+    return root
+
+
+def test_normalized_tokens_ignore_identifiers_and_docstrings():
+    a = normalized_tokens('def f(x):\n    """Doc."""\n    return x + 1\n')
+    b = normalized_tokens("def total(value):\n    return value + 2\n")
+    assert a == b
+    assert a != normalized_tokens("def f(x):\n    return x * 1\n")
+
+
+def test_winnowing_survives_renames_not_rewrites():
+    original = winnow(normalized_tokens(GRAPH))
+    assert jaccard(original, winnow(normalized_tokens(_renamed(GRAPH)))) == 1.0
+    assert jaccard(original, winnow(normalized_tokens(GRAPH + "\n" + JUSTICE))) > 0.6
+    assert jaccard(original, winnow(normalized_tokens(JUDGES))) < 0.2
+    assert sketch_source("tiny.py", "x = 1\n") is None
+    assert sketch_source("broken.py", "def (:\n") is None
+
+
+def test_index_flags_renamed_copies_across_submissions(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "sim.sqlite"))
+    original = _submission(tmp_path / "a", GRAPH, {"judges.py": JUDGES})
+    copy = _submission(tmp_path / "b", _renamed(GRAPH), {"justice.py": JUSTICE})
+    moved = _submission(tmp_path / "c", JUSTICE, {})  # b's justice.py as its graph.py
+
+    assert index.index_repo("https://github.com/u/a", original) == []
+    matches = index.index_repo("https://github.com/u/b", copy)
+    assert [(m.path, m.other_repo, m.other_path) for m in matches] == [
+        ("src/graph.py", "https://github.com/u/a", "src/graph.py")]
+    assert matches[0].similarity == 1.0
+
+    assert [m.other_path for m in index.index_repo("https://github.com/u/c", moved)] == ["src/nodes/justice.py"]
+    # re-indexing a repository replaces its files and never matches itself
+    assert index.index_repo("https://github.com/u/a", original)[0].other_repo == "https://github.com/u/b"
+    assert {(p.path, p.other_repo) for p in index.pairs()} == {
+        ("https://github.com/u/a:src/graph.py", "https://github.com/u/b"),
+        ("https://github.com/u/c:src/graph.py", "https://github.com/u/b"),
+    }
+    assert [s.path for s in sketch_repo(original)] == ["src/graph.py", "src/nodes/judges.py"]
+
+
+def test_repo_investigator_records_similarity_evidence(tmp_path, monkeypatch):
+    from src.nodes import detectives
+
+    monkeypatch.setattr(similarity, "_configured", str(tmp_path / "sim.sqlite"))
+    clones = iter([_submission(tmp_path / "a", GRAPH, {}), _submission(tmp_path / "b", _renamed(GRAPH), {})])
+    monkeypatch.setattr(detectives.repo_tools, "safe_clone_repo", lambda url, timeout=None: (next(clones), True))
+    monkeypatch.setattr(detectives.repo_tools, "extract_git_history", lambda path, timeout=None: (0, []))
+
+    first = detectives.RepoInvestigator({"repo_url": "https://github.com/u/a"})["evidences"]["code_similarity"][0]
+    second = detectives.RepoInvestigator({"repo_url": "https://github.com/u/b"})["evidences"]["code_similarity"][0]
+    assert not first.found
+    assert second.found and "src/graph.py ~ https://github.com/u/a:src/graph.py" in second.content
+
+
+def test_similarity_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(similarity, "_configured", None)
+    monkeypatch.delenv("SIMILARITY_DB", raising=False)
+    assert similarity.active_index() is None
+
+
+def test_cli_index_and_pairs(tmp_path, capsys):
+    db = str(tmp_path / "sim.sqlite")
+    main(["--db", db, "index", "https://github.com/u/a", str(_submission(tmp_path / "a", GRAPH, {}))])
+    main(["--db", db, "index", "https://github.com/u/b", str(_submission(tmp_path / "b", GRAPH, {}))])
+    capsys.readouterr()
+    main(["--db", db, "pairs"])
+    assert "| https://github.com/u/b:src/graph.py | https://github.com/u/a | src/graph.py | 1.00 |" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["--db", db, "index", "https://github.com/u/c", str(tmp_path / "missing")])
+
+
+README = (ROOT / "README.md").read_text(encoding="utf-8")
+REPORT = README[:6000]
+OTHER_REPORT = README[-6000:]
+
+
+def _doc_analyst(monkeypatch, tmp_path, repo_url, text):
+    from src.nodes import detectives
+    from src.tools.doc_tools import chunk_text
+
+    pdf = tmp_path / f"{repo_url.rsplit('/', 1)[-1]}.pdf"
+    pdf.write_bytes(text.encode("utf-8"))
+    monkeypatch.setattr(detectives.doc_tools, "extract_pdf_content",
+                        lambda path: {"success": True, "chunks": chunk_text(path.read_text()), "image_paths": []})
+    return detectives.DocAnalyst({"repo_url": repo_url, "pdf_path": str(pdf)})["evidences"]
+
+
+def test_doc_analyst_flags_near_duplicate_reports(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "_configured", str(tmp_path / "sim.sqlite"))
+    reworded = REPORT.replace("audit", "review").replace("Audit", "Review") + "\n\nWritten by a different student."
+
+    assert not _doc_analyst(monkeypatch, tmp_path, "https://github.com/u/a", REPORT)["report_similarity"][0].found
+    assert not _doc_analyst(monkeypatch, tmp_path, "https://github.com/u/b", OTHER_REPORT)["report_similarity"][0].found
+    copied = _doc_analyst(monkeypatch, tmp_path, "https://github.com/u/c", reworded)["report_similarity"][0]
+    assert copied.found and copied.content.startswith("c.pdf ~ https://github.com/u/a:a.pdf (Jaccard ")
+
+    pairs = similarity.active_index().pairs(kind="report")
+    assert [(p.path, p.other_repo) for p in pairs] == [("https://github.com/u/c:c.pdf", "https://github.com/u/a")]
+    assert similarity.active_index().pairs(kind="code") == []
+    assert similarity.sketch_text("short.pdf", "too few words") is None
+
+
+def test_identical_pdf_reused_by_dedupe_is_still_flagged(tmp_path, monkeypatch):
+    from src import fingerprint
+
+    monkeypatch.setattr(similarity, "_configured", str(tmp_path / "sim.sqlite"))
+    monkeypatch.setattr(fingerprint, "_configured", True)
+    monkeypatch.setenv("AUDIT_DEDUPE_PATH", str(tmp_path / "dedupe"))
+
+    _doc_analyst(monkeypatch, tmp_path, "https://github.com/u/a", REPORT)
+    evidences = _doc_analyst(monkeypatch, tmp_path, "https://github.com/u/a2", REPORT)
+    assert evidences["report_similarity"][0].content == "a2.pdf ~ https://github.com/u/a (identical file)"
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.config import ConfigError, validate_environment
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cumulative import time of src.graph, in microseconds (measured ~0.25 s)
+IMPORT_BUDGET_US = 1_000_000
+
+HEAVY = ("langgraph", "langchain_core", "langchain_groq", "langchain_openai", "pypdf", "fitz", "numpy", "dotenv")
+
+
+def _importtime(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_graph_import_is_lazy_and_within_budget():
+    modules = _importtime("-c", "import src.graph")
+    loaded = sorted({name.split(".")[0] for name in modules} & set(HEAVY))
+    assert loaded == [], f"heavy modules imported eagerly: {loaded}"
+    assert modules["src.graph"] < IMPORT_BUDGET_US, f"src.graph took {modules['src.graph'] / 1e6:.2f}s to import"
+
+
+def test_cli_help_does_not_load_providers():
+    modules = _importtime("-m", "src.graph", "--help")
+    assert not {name.split(".")[0] for name in modules} & set(HEAVY)
+
+
+def test_validate_environment_warns_on_missing_keys():
+    warnings = validate_environment({"LANGCHAIN_TRACING_V2": "true"})
+    assert any("GROQ_API_KEY" in w for w in warnings)
+    assert any("OPENAI_API_KEY" in w for w in warnings)
+    assert any("LANGCHAIN_API_KEY" in w for w in warnings)
+    assert validate_environment({"GROQ_API_KEY": "x", "OPENAI_API_KEY": "y"}) == []
+
+
+def test_validate_environment_rejects_bad_settings():
+    with pytest.raises(ConfigError) as exc:
+        validate_environment({"VISION_MAX_IMAGES": "three", "VISION_MODE": "all", "GIT_CLONE_TIMEOUT": "0"})
+    message = str(exc.value)
+    assert "VISION_MAX_IMAGES" in message and "VISION_MODE" in message and "GIT_CLONE_TIMEOUT" in message
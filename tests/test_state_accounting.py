@@ -0,0 +1,43 @@
+from src.graph import JudgesBranchNode, EvidenceAggregator, build_auditor_graph, initial_state
+from src.state import Evidence, JudicialOpinion
+from src.state_accounting import count_objects, format_steps, run_with_accounting
+
+
+def _ev():
+    return Evidence(goal="g", found=True, content="c", location="l", rationale="r", confidence=1.0)
+
+
+def test_pass_through_nodes_return_empty_updates():
+    state = {"evidences": {"a": [_ev()]}, "opinions": []}
+    assert EvidenceAggregator(state) == {}
+    assert JudgesBranchNode(state) == {}
+
+
+def test_full_graph_does_not_duplicate_state(tmp_path, monkeypatch):
+    dims = [{"id": "graph_orchestration", "name": "Graph"}, {"id": "safe_tool_engineering", "name": "Tools"}]
+
+    monkeypatch.setattr("src.nodes.detectives.RepoInvestigator",
+                        lambda s: {"evidences": {"graph_orchestration": [_ev()], "general": [_ev()]}})
+    monkeypatch.setattr("src.nodes.detectives.DocAnalyst", lambda s: {"evidences": {"safe_tool_engineering": [_ev()]}})
+    monkeypatch.setattr("src.nodes.detectives.VisionInspector", lambda s: {"evidences": {}})
+    monkeypatch.setattr(
+        "src.nodes.judges.judge_criterion",
+        lambda s, name, prompt, dim: (JudicialOpinion(judge=name, criterion_id=dim["id"], score=4, argument="ok"), False),
+    )
+
+    graph = build_auditor_graph().compile()
+    state = initial_state("https://github.com/u/r", "r.pdf", str(tmp_path / "report.md"))
+    state["rubric_dimensions"] = dims
+    final, steps = run_with_accounting(graph, state)
+
+    assert len(final["opinions"]) == 6  # 3 judges x 2 dimensions, no re-appends
+    assert count_objects(final["evidences"]) == 3
+
+    by_nodes = {tuple(sorted(s["nodes"])): s for s in steps}
+    judge_step = by_nodes[("JudgeCriterion",)]
+    assert judge_step["nodes"]["JudgeCriterion"] == 6 and judge_step["merged_objects"] == 6
+    for passthrough in (("EvidenceAggregator",), ("JudgesBranchNode",), ("Cleanup",)):
+        step = by_nodes[passthrough]
+        assert step["update_objects"] == 0 and step["merged_objects"] == 0
+    assert steps[-1]["opinions"] == 6 and steps[-1]["state_bytes"] > 0
+    assert "JudgeCriterion×6" in format_steps(steps)
@@ -0,0 +1,159 @@
+import random
+
+import numpy as np
+
+from src.rubric import Rubric, SynthesisParameters
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+from src.synthesis import (
+    FACT_SUPREMACY, FUNCTIONALITY, NO_RULE, SECURITY, VARIANCE,
+    AuditOpinions, apply_rules, build_reports, main, synthesize,
+)
+
+DIMS = [
+    {"id": "safe_tool_engineering", "name": "Safe Tool Engineering"},
+    {"id": "graph_orchestration", "name": "Graph Orchestration"},
+    {"id": "report_accuracy", "name": "Report Accuracy"},
+]
+
+
+def _ev(found):
+    return Evidence(goal="g", found=found, location="l", rationale="r", confidence=1.0)
+
+
+def _random_audit(rng, i):
+    opinions = [
+        JudicialOpinion(judge=judge, criterion_id=dim["id"], score=rng.randint(1, 5), argument=f"{judge} {i}")
+        for dim in DIMS for judge in ("Prosecutor", "Defense", "TechLead") if rng.random() < 0.9
+    ]
+    evidences = {dim["id"]: [_ev(rng.random() < 0.7)] for dim in DIMS if rng.random() < 0.8}
+    return AuditOpinions(f"https://github.com/u/r{i}", opinions, evidences)
+
+
+def _reference_report(audit, dimensions, params):
+    """The Chief Justice's per-dimension rule loop as it was before vectorization."""
+    opinions_by_crit = {}
+    for op in audit.opinions:
+        opinions_by_crit.setdefault(op.criterion_id, []).append(op)
+
+    crit_results = []
+    total_score = 0
+    for dim in dimensions:
+        dim_id = dim["id"]
+        ops = opinions_by_crit.get(dim_id, [])
+        prosecutor_op = next((o for o in ops if o.judge == "Prosecutor"), None)
+        defense_op = next((o for o in ops if o.judge == "Defense"), None)
+        tech_lead_op = next((o for o in ops if o.judge == "TechLead"), None)
+
+        p_score = prosecutor_op.score if prosecutor_op else params.default_score
+        d_score = defense_op.score if defense_op else params.default_score
+        t_score = tech_lead_op.score if tech_lead_op else params.default_score
+
+        final_score = round((p_score + d_score + t_score) / 3)
+        dissent_summary = None
+
+        dim_evs = audit.evidences.get(dim_id, [])
+        all_found = all(e.found for e in dim_evs) if dim_evs else False
+
+        if dim_id in params.security_dimensions and p_score <= params.security_prosecutor_max:
+            final_score = min(final_score, params.security_score_cap)
+            dissent_summary = f"Security Rule Applied: Prosecutor identified flaws; score capped at {params.security_score_cap}."
+        if not all_found and d_score >= params.fact_supremacy_defense_min:
+            final_score = p_score
+            dissent_summary = "Fact Supremacy Rule Applied: Artifact missing but Defense gave high score. Overruled."
+        if dim_id in params.functionality_dimensions and t_score >= params.functionality_techlead_min:
+            final_score = t_score
+            dissent_summary = "Functionality Weight Rule Applied: Tech Lead confirmed modular workable architecture, carrying highest weight."
+        variance = max([p_score, d_score, t_score]) - min([p_score, d_score, t_score])
+        if variance > params.variance_threshold and not dissent_summary:
+            final_score = t_score
+            dissent_summary = f"High variance ({variance}) detected between Prosecutor ({p_score}) and Defense ({d_score}). TechLead ({t_score}) acts as tie-breaker."
+
+        final_score = max(1, min(final_score, 5))
+        total_score += final_score
+        crit_results.append(CriterionResult(
+            dimension_id=dim_id,
+            dimension_name=dim["name"],
+            final_score=final_score,
+            judge_opinions=ops,
+            dissent_summary=dissent_summary,
+            remediation=tech_lead_op.argument if tech_lead_op else "Please review this component thoroughly.",
+        ))
+
+    overall = total_score / len(dimensions) if dimensions else 0.0
+    return AuditReport(
+        repo_url=audit.repo_url,
+        executive_summary=f"Automated Audit Complete. Evaluated {len(dimensions)} dimensions. Overall synthesis resulted in a score of {overall:.2f}.",
+        overall_score=overall,
+        criteria=crit_results,
+        remediation_plan="Review the individual criterion remediations above, particularly prioritizing dimensions scoring 3 or below.",
+    )
+
+
+def test_apply_rules_masks():
+    ids = [d["id"] for d in DIMS]
+    # (p, d, t) per dimension for one audit
+    scores = np.array([[[1, 5, 2], [2, 2, 5], [1, 5, 3]]], dtype=np.int8)
+    all_found = np.array([[True, True, True]])
+    final, rule = apply_rules(scores, all_found, ids, SynthesisParameters())
+    assert rule.tolist() == [[SECURITY, FUNCTIONALITY, VARIANCE]]
+    assert final.tolist() == [[3, 5, 3]]
+
+    final, rule = apply_rules(scores, np.array([[True, True, False]]), ids, SynthesisParameters())
+    assert rule[0, 2] == FACT_SUPREMACY and final[0, 2] == 1
+
+    calm = np.full((2, 3, 3), 3, dtype=np.int8)
+    final, rule = apply_rules(calm, np.ones((2, 3), dtype=bool), ids, SynthesisParameters())
+    assert (rule == NO_RULE).all() and (final == 3).all()
+
+
+def test_cohort_matches_single_audit_synthesis(tmp_path):
+    from src.nodes.justice import ChiefJusticeNode
+
+    rng = random.Random(7)
+    audits = [_random_audit(rng, i) for i in range(40)]
+    reports = build_reports(audits, DIMS)
+    for audit, report in zip(audits, reports):
+        assert report == _reference_report(audit, DIMS, SynthesisParameters())
+        single = ChiefJusticeNode({
+            "repo_url": audit.repo_url,
+            "rubric_dimensions": DIMS,
+            "opinions": audit.opinions,
+            "evidences": audit.evidences,
+            "output_path": str(tmp_path / "report.md"),
+        })["final_report"]
+        assert report == single
+
+
+def test_vectorized_rules_match_the_reference_loop():
+    params = SynthesisParameters(variance_threshold=1, security_score_cap=2)
+    rng = random.Random(11)
+    audits = [_random_audit(rng, i) for i in range(200)]
+    for audit, report in zip(audits, build_reports(audits, DIMS, params)):
+        assert report == _reference_report(audit, DIMS, params)
+
+
+def test_missing_opinions_use_default_score():
+    audit = AuditOpinions("u", [JudicialOpinion(judge="TechLead", criterion_id="report_accuracy", score=5,
+                                                argument="-")], {"report_accuracy": [_ev(True)]})
+    cohort = synthesize([audit], ["report_accuracy"], SynthesisParameters(default_score=2))
+    assert cohort.scores[0, 0].tolist() == [2, 2, 5]
+    assert cohort.final[0, 0] == 5 and cohort.rule[0, 0] == VARIANCE
+
+
+def test_cli_rescores_stored_records(tmp_path, capsys):
+    from src.incremental import AuditRecord, record_path, save_record
+
+    rng = random.Random(3)
+    paths = []
+    for i in range(3):
+        audit = _random_audit(rng, i)
+        path = record_path(str(tmp_path / f"{i:03d}-r.md"))
+        save_record(path, AuditRecord(repo_url=audit.repo_url, evidences=audit.evidences, opinions=audit.opinions))
+        paths.append(path)
+    rubric = tmp_path / "rubric.json"
+    rubric.write_text(Rubric.model_validate({"dimensions": DIMS}).model_dump_json(), encoding="utf-8")
+
+    reports = main(paths + ["--rubric", str(rubric), "--write"])
+    assert [r.repo_url for r in reports] == [f"https://github.com/u/r{i}" for i in range(3)]
+    assert (tmp_path / "000-r.md").read_text(encoding="utf-8").startswith("# Audit Report for https://github.com/u/r0")
+    assert "https://github.com/u/r2" in capsys.readouterr().out
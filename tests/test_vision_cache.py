@@ -0,0 +1,123 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+from src.tools.vision_cache import BKTree, VisionCache, dhash, hamming_distance, phash
+
+
+def _diagram(path: Path, size=(400, 300), shift=0) -> Path:
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    draw.rectangle([w // 8 + shift, h // 8, w // 3 + shift, h // 3], fill="black")
+    draw.rectangle([w // 2, h // 2, 7 * w // 8, 7 * h // 8], fill="gray")
+    draw.line([0, h, w, 0], fill="black", width=6)
+    img.save(path)
+    return path
+
+
+def test_hashes_tolerate_rescaling(tmp_path):
+    original = _diagram(tmp_path / "a.png")
+    rescaled = _diagram(tmp_path / "b.png", size=(800, 600))
+    other = tmp_path / "c.png"
+    img = Image.new("RGB", (400, 300), "white")
+    ImageDraw.Draw(img).ellipse([50, 50, 350, 250], fill="black")
+    img.save(other)
+
+    for fn in (dhash, phash):
+        assert hamming_distance(fn(original), fn(rescaled)) <= 6
+        assert hamming_distance(fn(original), fn(other)) > 6
+
+
+def test_bktree_radius_search():
+    tree = BKTree()
+    for key in (0b0000, 0b0001, 0b0111, 0b1111):
+        tree.add(key, {"k": key})
+    found = tree.search(0b0000, 1)
+    assert [(d, k) for d, k, _ in found] == [(0, 0b0000), (1, 0b0001)]
+    assert len(tree) == 4
+
+
+def test_vision_cache_near_duplicate_roundtrip(tmp_path):
+    cache_file = tmp_path / "cache.jsonl"
+    cache = VisionCache(cache_file, max_distance=6)
+    original = _diagram(tmp_path / "a.png")
+    assert cache.lookup(original) is None
+
+    cache.store(original, {"classification": "Parallel StateGraph", "flow": "fan-out"})
+
+    # a reloaded cache serves a rescaled copy without recomputing anything
+    reloaded = VisionCache(cache_file, max_distance=6)
+    hit = reloaded.lookup(_diagram(tmp_path / "b.png", size=(800, 600)))
+    assert hit["classification"] == "Parallel StateGraph"
+    assert reloaded.hits == 1
+
+    # stores append a line each instead of rewriting the file
+    before = cache_file.read_text(encoding="utf-8")
+    reloaded.store(original, {"classification": "Linear pipeline", "flow": "-"})
+    after = cache_file.read_text(encoding="utf-8")
+    assert after.startswith(before) and after.count("\n") == before.count("\n") + 1
+    assert VisionCache(cache_file, max_distance=6).lookup(original)["classification"] == "Linear pipeline"
+
+
+def test_vision_cache_is_off_by_default(monkeypatch):
+    from src.tools.vision_cache import get_vision_cache
+
+    monkeypatch.delenv("VISION_CACHE", raising=False)
+    assert get_vision_cache() is None
+
+
+@patch("langchain_openai.ChatOpenAI")
+def test_vision_inspector_skips_model_on_cache_hit(mock_chat, tmp_path, monkeypatch):
+    from src.nodes.detectives import VisionInspector, _vision_llm
+
+    _vision_llm.cache_clear()  # the client is cached per process
+
+    image = _diagram(tmp_path / "page1_img0.png")
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n%%EOF")
+    monkeypatch.setattr(
+        "src.tools.doc_tools.extract_pdf_content",
+        lambda path: {"image_paths": [image], "temp_dir": None},
+    )
+    monkeypatch.setenv("VISION_CACHE", "true")
+    monkeypatch.setenv("VISION_CACHE_PATH", str(tmp_path / "cache.jsonl"))
+
+    reply = MagicMock()
+    reply.content = "CLASSIFICATION: Parallel StateGraph. FLOW: fan-out to detectives"
+    mock_chat.return_value.invoke.return_value = reply
+
+    first = VisionInspector({"pdf_path": str(pdf)})["evidences"]["swarm_visual"][0]
+    second = VisionInspector({"pdf_path": str(pdf)})["evidences"]["swarm_visual"][0]
+
+    assert mock_chat.return_value.invoke.call_count == 1
+    assert first.found and second.found
+    assert "cache" in second.rationale
+
+
+@patch("langchain_openai.ChatOpenAI")
+def test_single_image_mode_does_not_cache_unparsed_replies(mock_chat, tmp_path, monkeypatch):
+    from src.nodes.detectives import VisionInspector, _vision_llm
+
+    _vision_llm.cache_clear()
+
+    image = _diagram(tmp_path / "page1_img0.png")
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n%%EOF")
+    monkeypatch.setattr(
+        "src.tools.doc_tools.extract_pdf_content",
+        lambda path: {"image_paths": [image], "temp_dir": None},
+    )
+    monkeypatch.setenv("VISION_CACHE", "true")
+    monkeypatch.setenv("VISION_CACHE_PATH", str(tmp_path / "cache.jsonl"))
+    mock_chat.return_value.invoke.return_value = MagicMock(content="Sorry, I cannot see the image.")
+
+    VisionInspector({"pdf_path": str(pdf)})
+    VisionInspector({"pdf_path": str(pdf)})
+
+    assert mock_chat.return_value.invoke.call_count == 2
@@ -0,0 +1,91 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.tools import vision_tools
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _make_image(path: Path, size, color="blue") -> Path:
+    Image.new("RGB", size, color=color).save(path)
+    return path
+
+
+def test_image_page_from_extracted_name():
+    assert vision_tools.image_page(Path("/tmp/x/page3_img0.png")) == 3
+    assert vision_tools.image_page(Path("/tmp/x/diagram.png")) is None
+
+
+def test_rank_images_prefers_large_diagrams(tmp_path):
+    icon = _make_image(tmp_path / "page1_img0.png", (32, 32))
+    banner = _make_image(tmp_path / "page1_img1.png", (1000, 40))
+    diagram = _make_image(tmp_path / "page2_img0.png", (800, 600))
+    small = _make_image(tmp_path / "page3_img0.png", (200, 150))
+
+    ranked = vision_tools.rank_images([icon, banner, diagram, small], top_k=2)
+    assert ranked == [diagram, small]
+
+
+def test_contact_sheet_tiles_images(tmp_path):
+    paths = [_make_image(tmp_path / f"page{i}_img0.png", (300, 200)) for i in range(1, 4)]
+    data = vision_tools.build_contact_sheet(paths, cell_size=256, columns=2)
+
+    import io
+
+    sheet = Image.open(io.BytesIO(data))
+    assert sheet.size == (512, 512)
+
+
+def test_parse_batch_classification_json_and_missing():
+    reply = """Here you go:
+    [{"image": 1, "classification": "LangGraph StateGraph with parallel fan-out", "flow": "START -> detectives"},
+     {"image": 3, "classification": "generic flowchart", "flow": "linear"}]"""
+    results = vision_tools.parse_batch_classification(reply, 3)
+
+    assert [r["index"] for r in results] == [1, 2, 3]
+    assert results[0]["is_parallel"]
+    assert results[1]["classification"] == "UNKNOWN"
+    assert not results[2]["is_parallel"]
+
+
+def test_parse_batch_classification_line_format():
+    reply = "IMAGE 1: CLASSIFICATION: Parallel StateGraph. FLOW: fan-out\nIMAGE 2: CLASSIFICATION: Bar chart. FLOW: n/a"
+    results = vision_tools.parse_batch_classification(reply, 2)
+    assert results[0]["is_parallel"]
+    assert results[1]["classification"] == "Bar chart"
+
+
+@patch("langchain_openai.ChatOpenAI")
+def test_vision_inspector_batch_mode(mock_chat, tmp_path, monkeypatch):
+    from src.nodes.detectives import VisionInspector, _vision_llm
+
+    _vision_llm.cache_clear()  # the client is cached per process
+
+    images = [
+        _make_image(tmp_path / "page2_img0.png", (800, 600)),
+        _make_image(tmp_path / "page4_img0.png", (640, 480)),
+    ]
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n%%EOF")
+    monkeypatch.setattr(
+        "src.tools.doc_tools.extract_pdf_content",
+        lambda path: {"image_paths": images, "temp_dir": None},
+    )
+    monkeypatch.setenv("VISION_MODE", "batch")
+    monkeypatch.setenv("VISION_CACHE", "false")
+
+    reply = MagicMock()
+    reply.content = (
+        '[{"image": 1, "classification": "Parallel StateGraph", "flow": "fan-out"},'
+        ' {"image": 2, "classification": "generic flowchart", "flow": "linear"}]'
+    )
+    mock_chat.return_value.invoke.return_value = reply
+
+    evs = VisionInspector({"pdf_path": str(pdf)})["evidences"]["swarm_visual"]
+
+    assert mock_chat.return_value.invoke.call_count == 1
+    assert evs[0].found
+    assert "page 2" in evs[0].content
+    assert [ev.location for ev in evs[1:]] == [f"{pdf} (page 2)", f"{pdf} (page 4)"]